@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+批量签到内存基准：测量每个排队账号占用的字节数
+
+对比三种布局：
+- AccountState：排队账号的紧凑状态（当前批量签到使用的方式）
+- 旧版签到实例：改为紧凑状态之前的 HiFiNiCheckin 布局——实例字典、每个实例一份请求头、
+  构造时立即创建 HTTP 会话并派生加密密钥（旧方式下每个排队账号都常驻一个）
+- 当前签到实例 + Session：现在只有处理中的账号才有的 HiFiNiCheckin（共享请求头、按需创建会话）
+
+用法：python benchmarks/bench_account_memory.py [账号数量]
+"""
+
+import os
+import sys
+import gc
+import tracemalloc
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from hifini_checkin import (AccountState, HiFiNiCheckin, DEFAULT_BASE_URL, DEFAULT_HEADERS,  # noqa: E402
+                            get_account_paths, load_accounts)
+
+
+def _fake_accounts_env(count: int) -> str:
+    """生成 HIFINI_ACCOUNTS 格式的测试账号"""
+    return "\n".join(f"user{i:06d}@example.com:password-{i:06d}" for i in range(count))
+
+
+def measure(build, count: int) -> float:
+    """
+    测量 build(count) 返回的对象在内存中的增量
+    :return: 每个账号的字节数
+    """
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    objects = build(count)
+    gc.collect()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    assert len(objects) == count
+    return (after - before) / count
+
+
+def build_account_states(count: int):
+    """当前方式：从环境变量解析出的排队账号"""
+    os.environ["HIFINI_ACCOUNTS"] = _fake_accounts_env(count)
+    os.environ.pop("HIFINI_USERNAME", None)
+    os.environ.pop("HIFINI_COOKIE", None)
+    return load_accounts()
+
+
+class LegacyClient:
+    """
+    改为紧凑状态之前 HiFiNiCheckin 构造后的内存布局（只复现字段，不含方法）
+    加密密钥用等长的随机字节代替 PBKDF2 派生：只比较内存，派生的耗时不在本基准之内
+    """
+
+    def __init__(self, username: str, password: str, record_file: str, cookie_file: str):
+        self.username = username
+        self.password = password
+        self.cookie = None
+        self.session = requests.Session()
+        self.base_url = DEFAULT_BASE_URL
+        self.headers = dict(DEFAULT_HEADERS)
+        self.session.headers.update(self.headers)
+        self.login_method = "未知"
+        self.points_gained = ""
+        self.last_checkin_result = ""
+        self.current_total_coins = ""
+        self.checkin_method = "Cookie签到"
+        self.defer_relogin = False
+        self.checkin_record_file = record_file
+        self.encrypted_cookie_file = cookie_file
+        self.encryption_key = os.urandom(32)
+
+
+def build_legacy_clients(count: int):
+    """旧方式：每个账号常驻一个旧版签到实例"""
+    clients = []
+    for i in range(count):
+        username = f"user{i:06d}@example.com"
+        clients.append(LegacyClient(username, f"password-{i:06d}", **get_account_paths(username, primary=False)))
+    return clients
+
+
+def build_current_clients(count: int):
+    """当前的签到实例（处理中的账号才会创建），包含已创建的 HTTP 会话"""
+    clients = []
+    for i in range(count):
+        username = f"user{i:06d}@example.com"
+        client = HiFiNiCheckin(username=username, password=f"password-{i:06d}",
+                               **get_account_paths(username, primary=False))
+        client.session
+        clients.append(client)
+    return clients
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+
+    state_bytes = measure(build_account_states, count)
+    legacy_count = min(count, 2000)
+    legacy_bytes = measure(build_legacy_clients, legacy_count)
+    current_bytes = measure(build_current_clients, legacy_count)
+
+    print(f"账号数量: {count}")
+    print(f"AccountState（排队账号）:       {state_bytes:8.0f} 字节/账号")
+    print(f"旧版签到实例（排队账号，旧）:   {legacy_bytes:8.0f} 字节/账号（样本 {legacy_count} 个）")
+    print(f"当前签到实例 + Session（处理中）: {current_bytes:8.0f} 字节/账号（样本 {legacy_count} 个）")
+    print(f"AccountState 本身（不含字符串）: {sys.getsizeof(AccountState()):8d} 字节")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+HiFiNi 签到日历分析
+把账号的签到历史载入紧凑的日历：签到日期是一个整数位图（第 i 位表示起始日后第 i 天），
+每日金币是一个 array。连续签到、漏签区间、按星期/年份的汇总都用整数位运算和数组切片完成，
+不需要逐个比较日期字符串
+"""
+
+from array import array
+from datetime import date, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from hifini_records import RecordStore
+
+WEEKDAY_NAMES = ("一", "二", "三", "四", "五", "六", "日")
+
+
+def _window_mask(start: int, end: int) -> int:
+    """第 start 到第 end 位（含）全为 1 的掩码"""
+    if end < start:
+        return 0
+    return ((1 << (end - start + 1)) - 1) << start
+
+
+def _periodic_mask(offset: int, period: int, length: int) -> int:
+    """从 offset 开始每隔 period 位置 1 的掩码（通过倍增构造，不逐位循环）"""
+    if offset >= length:
+        return 0
+    mask = 1 << offset
+    span = period
+    while span < length:
+        mask |= mask << span
+        span *= 2
+    return mask & _window_mask(0, length - 1)
+
+
+def _runs(bits: int) -> List[Tuple[int, int]]:
+    """位图中所有连续为 1 的区间 [(起始位, 结束位)]，只遍历区间边界"""
+    runs = []
+    edges = bits ^ (bits << 1)
+    while edges:
+        low = edges & -edges
+        start = low.bit_length() - 1
+        edges ^= low
+        low = edges & -edges
+        end = low.bit_length() - 2
+        edges ^= low
+        runs.append((start, end))
+    return runs
+
+
+class CheckinCalendar:
+    """单个账号的紧凑签到日历"""
+    __slots__ = ("start", "length", "bits", "points", "total_points")
+
+    def __init__(self, start: date, length: int, bits: int = 0, points: array = None, total_points: int = 0):
+        """
+        :param start: 日历的第一天
+        :param length: 日历覆盖的天数
+        :param bits: 签到位图
+        :param points: 每日金币（按天索引；旧记录只有月度金币，对应的天为 0）
+        :param total_points: 累计金币（来自汇总文件）
+        """
+        self.start = start
+        self.length = length
+        self.bits = bits
+        self.points = points if points is not None else array('I', bytes(4 * length))
+        self.total_points = total_points
+
+    @classmethod
+    def from_store(cls, store: RecordStore, today: date) -> "CheckinCalendar":
+        """
+        从分片记录载入日历（覆盖第一次签到到今天）
+        :param store: 账号的签到记录
+        :param today: 今天（北京时间）
+        """
+        months = store.months()
+        summary = store.load_summary()
+        if not months:
+            return cls(today, 1, total_points=summary.get("total_points", 0))
+
+        start = date.fromisoformat(f"{months[0]}-01")
+        length = (today - start).days + 1
+        bits = 0
+        points = array('I', bytes(4 * length))
+        for month in months:
+            shard = store.load_month(month)
+            for day in shard.get("days", []):
+                index = (date.fromisoformat(day) - start).days
+                if 0 <= index < length:
+                    bits |= 1 << index
+            for day, value in shard.get("daily_points", {}).items():
+                index = (date.fromisoformat(day) - start).days
+                if 0 <= index < length:
+                    points[index] = int(value)
+
+        calendar = cls(start, length, bits, points, summary.get("total_points", 0))
+        # 从第一次签到开始计算，之前的月初几天不算漏签
+        first = calendar.first_day()
+        if first is not None and first > start:
+            calendar = calendar.slice(first, today)
+        return calendar
+
+    # ---- 基本换算 ----
+
+    def index_of(self, day: date) -> int:
+        return (day - self.start).days
+
+    def day_at(self, index: int) -> date:
+        return self.start + timedelta(days=index)
+
+    def first_day(self) -> Optional[date]:
+        """第一次签到的日期"""
+        if not self.bits:
+            return None
+        return self.day_at((self.bits & -self.bits).bit_length() - 1)
+
+    def slice(self, first: date, last: date) -> "CheckinCalendar":
+        """截取 [first, last] 区间的子日历"""
+        offset = self.index_of(first)
+        length = (last - first).days + 1
+        bits = (self.bits >> offset) & _window_mask(0, length - 1)
+        return CheckinCalendar(first, length, bits, self.points[offset:offset + length], self.total_points)
+
+    def _clip(self, first: Optional[date], last: Optional[date]) -> Tuple[int, int]:
+        lo = max(0, self.index_of(first)) if first else 0
+        hi = min(self.length - 1, self.index_of(last)) if last else self.length - 1
+        return lo, hi
+
+    def has_day(self, day: date) -> bool:
+        index = self.index_of(day)
+        return 0 <= index < self.length and bool(self.bits >> index & 1)
+
+    # ---- 统计 ----
+
+    def count(self, first: date = None, last: date = None) -> int:
+        """区间内的签到天数"""
+        lo, hi = self._clip(first, last)
+        return (self.bits & _window_mask(lo, hi)).bit_count()
+
+    def missed(self, first: date = None, last: date = None) -> int:
+        """区间内的漏签天数"""
+        lo, hi = self._clip(first, last)
+        if hi < lo:
+            return 0
+        return (hi - lo + 1) - (self.bits & _window_mask(lo, hi)).bit_count()
+
+    def gaps(self, first: date = None, last: date = None) -> List[Tuple[date, date]]:
+        """区间内的漏签区间 [(开始日期, 结束日期)]"""
+        lo, hi = self._clip(first, last)
+        missing = ~self.bits & _window_mask(lo, hi)
+        return [(self.day_at(start), self.day_at(end)) for start, end in _runs(missing)]
+
+    def current_streak(self, today: date) -> int:
+        """截至今天的连续签到天数（今天还没签到时从昨天算起）"""
+        end = self.index_of(today)
+        if not self.has_day(today):
+            end -= 1
+        if end < 0 or end >= self.length or not self.bits >> end & 1:
+            return 0
+        missing = ~self.bits & _window_mask(0, end)
+        return end + 1 if not missing else end - (missing.bit_length() - 1)
+
+    def longest_streak(self) -> Tuple[int, Optional[date], Optional[date]]:
+        """
+        最长连续签到：每次把位图与右移一位的自身相与，循环次数就是最长连续长度
+        :return: (天数, 开始日期, 结束日期)
+        """
+        bits = self.bits
+        length = 0
+        last = 0
+        while bits:
+            last = bits
+            bits &= bits >> 1
+            length += 1
+        if not length:
+            return 0, None, None
+        start = (last & -last).bit_length() - 1
+        return length, self.day_at(start), self.day_at(start + length - 1)
+
+    def weekday_stats(self) -> List[Tuple[int, int]]:
+        """按星期（一到日）汇总 [(签到天数, 金币)]"""
+        stats = []
+        for weekday in range(7):
+            offset = (weekday - self.start.weekday()) % 7
+            mask = _periodic_mask(offset, 7, self.length)
+            stats.append(((self.bits & mask).bit_count(), sum(self.points[offset::7])))
+        return stats
+
+    def year_stats(self, today: date = None) -> Dict[str, Tuple[int, int]]:
+        """
+        按年汇总 {年份: (签到天数, 漏签天数)}
+        :param today: 今天（今天还可以签到，不计入漏签）
+        """
+        stats = {}
+        last = self.day_at(self.length - 1)
+        for year in range(self.start.year, last.year + 1):
+            first = max(self.start, date(year, 1, 1))
+            end = min(last, date(year, 12, 31))
+            missed_end = min(end, today - timedelta(days=1)) if today else end
+            stats[str(year)] = (self.count(first, end), self.missed(first, missed_end))
+        return stats
+
+
+def summarize_calendar(calendar: CheckinCalendar, today: date) -> dict:
+    """生成 stats 子命令输出的统计数据"""
+    longest, longest_start, longest_end = calendar.longest_streak()
+    year_start = date(today.year, 1, 1)
+    recent_gaps = calendar.gaps(year_start, today - timedelta(days=1))[-3:]
+    return {
+        "first_day": calendar.first_day().isoformat() if calendar.first_day() else None,
+        "total_days": calendar.count(),
+        "total_points": calendar.total_points,
+        "current_streak": calendar.current_streak(today),
+        "longest_streak": longest,
+        "longest_streak_range": [longest_start.isoformat(), longest_end.isoformat()] if longest else None,
+        "missed_this_year": calendar.missed(year_start, today - timedelta(days=1)),
+        "recent_gaps": [[start.isoformat(), end.isoformat()] for start, end in recent_gaps],
+        "weekdays": {WEEKDAY_NAMES[index]: {"days": days, "points": points}
+                     for index, (days, points) in enumerate(calendar.weekday_stats())},
+        "years": {year: {"days": days, "missed": missed} for year, (days, missed) in calendar.year_stats(today).items()},
+    }
+
+
+def format_stats(label: str, stats: dict) -> List[str]:
+    """把统计数据格式化为文本行"""
+    lines = [f"📊 {label}"]
+    if not stats["total_days"]:
+        lines.append("   暂无签到记录")
+        return lines
+    lines.append(f"   首次签到: {stats['first_day']}，累计签到: {stats['total_days']} 天，累计金币: {stats['total_points']}")
+    streak = f"   当前连续: {stats['current_streak']} 天，最长连续: {stats['longest_streak']} 天"
+    if stats["longest_streak_range"]:
+        streak += f"（{stats['longest_streak_range'][0]} ~ {stats['longest_streak_range'][1]}）"
+    lines.append(streak)
+    missed = f"   今年漏签: {stats['missed_this_year']} 天"
+    if stats["recent_gaps"]:
+        missed += "，最近漏签: " + "、".join(start if start == end else f"{start} ~ {end}"
+                                          for start, end in stats["recent_gaps"])
+    lines.append(missed)
+    lines.append("   按星期: " + "  ".join(f"{name} {entry['days']}天/{entry['points']}金币"
+                                          for name, entry in stats["weekdays"].items()))
+    lines.append("   按年份: " + "  ".join(f"{year} 签到{entry['days']}天/漏签{entry['missed']}天"
+                                          for year, entry in stats["years"].items()))
+    return lines
@@ -0,0 +1,343 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+HiFiNi 批量签到执行器
+按账号类型分道执行：每条通道（lane）有独立大小的线程池，
+账号在某条通道失败后可以晋级到下一条更慢的通道继续处理；
+可选的 AIMD 控制器根据耗时、异常和人机验证自动调整同时处理的账号数
+"""
+
+import time
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+from hifini_logging import get_logger
+
+log = get_logger()
+
+# 通道名称：有效Cookie直接签到 / 需要HTTP登录 / 需要浏览器登录
+LANE_COOKIE = "cookie"
+LANE_HTTP = "http"
+LANE_BROWSER = "browser"
+
+DEFAULT_LANE_WORKERS = {
+    LANE_COOKIE: 8,
+    LANE_HTTP: 4,
+    LANE_BROWSER: 1,
+}
+
+# AIMD 并发控制的默认参数
+DEFAULT_CONCURRENCY_FLOOR = 1
+DEFAULT_CONCURRENCY_INITIAL = 4
+# 拥塞时并发上限乘以该系数；未拥塞时每完成“一轮”（上限个账号）上限加 1
+DECREASE_FACTOR = 0.5
+# 耗时超过该通道基线耗时的倍数（且至少多出 LATENCY_SLACK 秒）视为拥塞；
+# 基线取最近 BASELINE_WINDOW 个完成账号耗时的 BASELINE_PERCENTILE 分位数，样本少于 BASELINE_MIN_SAMPLES 时不判断
+LATENCY_TOLERANCE = 3.0
+LATENCY_SLACK = 0.5
+BASELINE_WINDOW = 50
+BASELINE_PERCENTILE = 0.1
+BASELINE_MIN_SAMPLES = 5
+# 人机验证按比例判断：最近完成的账号中人机验证比例（指数滑动平均）超过该值视为拥塞，
+# 偶发的、与并发无关的验证不会让并发一路降到下限
+CAPTCHA_RATE_THRESHOLD = 0.3
+CAPTCHA_RATE_ALPHA = 0.2
+
+# 拥塞信号：请求异常 / 超时 / 429 / 5xx，或出现人机验证
+SIGNAL_ERROR = "error"
+SIGNAL_CAPTCHA = "captcha"
+
+# 当前线程正在处理的任务占用的并发名额（见 release_slot）
+_slot = threading.local()
+
+
+def release_slot():
+    """
+    提前释放当前线程占用的并发名额，并按到此为止的耗时反馈给 AIMD 控制
+    处理函数在做完对站点的请求、开始发送通知之类与站点负载无关的工作前调用；没有占用名额时什么也不做
+    """
+    release = getattr(_slot, "release", None)
+    if release is not None:
+        _slot.release = None
+        release()
+
+
+class AimdController:
+    """
+    加性增、乘性减（AIMD）的并发上限（每条通道一个）
+
+    每个账号在通道中处理完成时调用 release() 反馈耗时和拥塞信号：
+    请求失败、耗时明显高于该通道的基线耗时、或最近的人机验证比例过高都视为拥塞；
+    未拥塞时上限增加 1/上限（每完成一轮约加 1），拥塞时上限减半；
+    同一次拥塞只减一次——在上次减小之前就已开始处理的账号不会再次触发减小。
+    上限始终在 [floor, ceiling] 之间。
+    """
+
+    def __init__(self, floor: int = DEFAULT_CONCURRENCY_FLOOR, ceiling: int = None,
+                 initial: int = DEFAULT_CONCURRENCY_INITIAL, on_change: Callable[[int], None] = None):
+        """
+        :param floor: 并发下限
+        :param ceiling: 并发上限（默认为通道的线程数，由 BatchRunner 设置）
+        :param initial: 初始并发
+        :param on_change: 并发上限变化时的回调（例如导出指标）
+        """
+        self.floor = max(1, floor)
+        self.ceiling = ceiling
+        self.initial = initial
+        self.on_change = on_change
+        self._limit = float(self.floor)
+        self._in_flight = 0
+        self._last_decrease = 0.0
+        self._latencies: deque = deque(maxlen=BASELINE_WINDOW)
+        self.captcha_rate = 0.0
+        self.completed = 0
+        self._cond = threading.Condition()
+        self.lowest = self.highest = None
+        if ceiling is not None:
+            self.set_ceiling(ceiling)
+
+    def set_ceiling(self, ceiling: int):
+        """设置并发上限的最大值，并把当前上限重置为初始值"""
+        with self._cond:
+            self.ceiling = max(self.floor, ceiling)
+            self._limit = float(min(self.ceiling, max(self.floor, self.initial)))
+            self.lowest = self.highest = self.limit
+        self._changed()
+
+    @property
+    def limit(self) -> int:
+        """当前允许同时处理的账号数"""
+        return int(self._limit)
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def acquire(self) -> float:
+        """
+        等待空位后占用一个名额
+        :return: 占用时刻（time.monotonic），release() 时传回
+        """
+        with self._cond:
+            while self._in_flight >= int(self._limit):
+                self._cond.wait()
+            self._in_flight += 1
+            return time.monotonic()
+
+    @property
+    def baseline(self) -> Optional[float]:
+        """基线耗时：最近完成账号耗时的低分位数（比历史最小值稳健，个别特别快的账号不会把基线压得过低）"""
+        if len(self._latencies) < BASELINE_MIN_SAMPLES:
+            return None
+        ordered = sorted(self._latencies)
+        return ordered[int(len(ordered) * BASELINE_PERCENTILE)]
+
+    def release(self, started: float, latency: Optional[float] = None, signal: Optional[str] = None):
+        """
+        释放名额并根据结果调整上限
+        :param started: acquire() 的返回值
+        :param latency: 处理耗时（秒）；为 None 时不参与耗时判断（例如晋级到下一条通道的账号）
+        :param signal: 拥塞信号 SIGNAL_ERROR / SIGNAL_CAPTCHA，没有时为 None
+        """
+        with self._cond:
+            self._in_flight -= 1
+            self.completed += 1
+            slow = False
+            if latency is not None:
+                baseline = self.baseline
+                slow = (baseline is not None and latency > baseline * LATENCY_TOLERANCE
+                        and latency - baseline > LATENCY_SLACK)
+                self._latencies.append(latency)
+            captcha = 1.0 if signal == SIGNAL_CAPTCHA else 0.0
+            self.captcha_rate += CAPTCHA_RATE_ALPHA * (captcha - self.captcha_rate)
+            congested = (signal == SIGNAL_ERROR or slow
+                         or (captcha and self.captcha_rate > CAPTCHA_RATE_THRESHOLD))
+
+            previous = int(self._limit)
+            if congested:
+                if started >= self._last_decrease:
+                    self._limit = max(float(self.floor), self._limit * DECREASE_FACTOR)
+                    self._last_decrease = time.monotonic()
+            elif self._in_flight + 1 >= int(self._limit):
+                # 只有上限被用满时才增加，避免账号不足时上限空涨
+                self._limit = min(float(self.ceiling), self._limit + 1.0 / self._limit)
+            changed = int(self._limit) != previous
+            if changed:
+                self.lowest = min(self.lowest, self.limit)
+                self.highest = max(self.highest, self.limit)
+            self._cond.notify_all()
+        if changed:
+            self._changed()
+
+    def _changed(self):
+        if self.on_change:
+            self.on_change(self.limit)
+
+
+class BatchRunner:
+    """
+    分道批量执行器
+
+    每条通道注册一个处理函数 handler(job) -> Optional[str]：
+    返回另一条通道的名称表示把该任务晋级到那条通道，返回 None 表示任务结束。
+    快速通道（Cookie签到）的线程不会被慢速任务（浏览器启动）占住；
+    启用并发控制时每条通道有各自的 AIMD 控制器，慢速通道降低并发不会让快速通道排队。
+    """
+
+    def __init__(self, lanes: Dict[str, Tuple[int, Callable[[Any], Optional[str]]]],
+                 on_error: Callable[[Any, BaseException], None] = None, inline: bool = False,
+                 concurrency: Optional[Tuple[int, Optional[int]]] = None,
+                 on_limit_change: Callable[[str, int], None] = None,
+                 congestion: Callable[[Any], Optional[str]] = None):
+        """
+        :param lanes: {通道名称: (线程数, 处理函数)}
+        :param on_error: 处理函数抛出异常时的回调，异常任务视为结束
+        :param inline: 在调用 run() 的线程中顺序执行所有任务（性能分析模式使用）
+        :param concurrency: 每条通道 AIMD 并发控制的 (下限, 上限)，上限为 None 或大于线程数时取该通道的线程数；
+                            为 None 时不控制
+        :param on_limit_change: 某条通道的并发上限变化时的回调 (通道名称, 上限)
+        :param congestion: 处理函数返回后取出该任务的拥塞信号（SIGNAL_ERROR / SIGNAL_CAPTCHA / None）
+        """
+        self._handlers = {name: handler for name, (_, handler) in lanes.items()}
+        self._inline = inline
+        self._executors = {} if inline else {
+            name: ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix=f"hifini-{name}")
+            for name, (workers, _) in lanes.items()
+        }
+        self._on_error = on_error
+        self._congestion = congestion
+        self.controllers: Dict[str, AimdController] = {}
+        if concurrency and not inline:
+            floor, ceiling = concurrency
+            for name, (workers, _) in lanes.items():
+                lane_ceiling = min(ceiling or workers, max(1, workers))
+                self.controllers[name] = AimdController(
+                    min(floor, lane_ceiling), lane_ceiling,
+                    on_change=(lambda limit, lane=name: on_limit_change(lane, limit)) if on_limit_change else None)
+
+        self._pending = 0
+        self._cond = threading.Condition()
+
+    def run(self, jobs: Iterable[Tuple[str, Any]]):
+        """
+        执行所有任务，直到每个任务都结束
+        :param jobs: (初始通道名称, 任务) 的序列
+        """
+        if self._inline:
+            self._run_inline(jobs)
+            return
+
+        try:
+            for lane, job in jobs:
+                self._submit(lane, job)
+
+            with self._cond:
+                while self._pending:
+                    self._cond.wait()
+        finally:
+            for executor in self._executors.values():
+                executor.shutdown(wait=True)
+
+    def _run_inline(self, jobs: Iterable[Tuple[str, Any]]):
+        """顺序执行：晋级的任务排到队尾，保持与分道执行相同的先快后慢顺序"""
+        queue = deque(jobs)
+        while queue:
+            lane, job = queue.popleft()
+            if lane not in self._handlers:
+                raise ValueError(f"未知的执行通道: {lane}")
+            try:
+                next_lane = self._handlers[lane](job)
+                if next_lane:
+                    queue.append((next_lane, job))
+            except Exception as e:
+                self._report_error(job, e)
+
+    def _report_error(self, job: Any, error: BaseException):
+        """调用 on_error；回调本身出错时记录日志，不影响其他任务"""
+        if not self._on_error:
+            return
+        try:
+            self._on_error(job, error)
+        except Exception as e:
+            log.error(f"❌ 处理任务异常时出错: {e.__class__.__name__}: {str(e)}（原异常: {str(error)}）")
+
+    def _submit(self, lane: str, job: Any):
+        """把任务放入指定通道"""
+        if lane not in self._executors:
+            raise ValueError(f"未知的执行通道: {lane}")
+        with self._cond:
+            self._pending += 1
+        self._executors[lane].submit(self._execute, lane, job)
+
+    def _execute(self, lane: str, job: Any):
+        """在通道线程中执行处理函数，并根据返回值晋级或结束任务"""
+        controller = self.controllers.get(lane)
+        if controller:
+            started = controller.acquire()
+            state = {"promoted": False, "failed": False}
+
+            def release():
+                signal = SIGNAL_ERROR if state["failed"] else (self._congestion(job) if self._congestion else None)
+                latency = None if state["promoted"] else time.monotonic() - started
+                controller.release(started, latency, signal)
+
+            _slot.release = release
+        try:
+            next_lane = self._handlers[lane](job)
+            if next_lane and controller:
+                state["promoted"] = True
+            if next_lane:
+                self._submit(next_lane, job)
+        except BaseException as e:
+            if controller:
+                state["failed"] = True
+            self._report_error(job, e)
+        finally:
+            # 处理函数没有提前释放名额时在这里释放
+            release_slot()
+            with self._cond:
+                self._pending -= 1
+                if not self._pending:
+                    self._cond.notify_all()
+
+
+def parse_lane_workers(spec: str) -> Dict[str, int]:
+    """
+    解析通道线程数配置，例如 "cookie=8,http=4,browser=1"
+    未配置的通道使用默认值
+    :param spec: 配置字符串
+    :return: {通道名称: 线程数}
+    """
+    workers = dict(DEFAULT_LANE_WORKERS)
+    for item in (spec or "").split(","):
+        item = item.strip()
+        if not item:
+            continue
+        name, _, value = item.partition("=")
+        name = name.strip()
+        if name not in workers:
+            raise ValueError(f"未知的执行通道: {name}")
+        workers[name] = max(1, int(value))
+    return workers
+
+
+def parse_concurrency(spec: str) -> Optional[Tuple[int, Optional[int]]]:
+    """
+    解析并发控制配置
+    :param spec: "off" 关闭（只按通道线程数执行）；"auto" 或空为默认范围；"2-12" 为下限和上限；"12" 只指定上限
+    :return: (下限, 上限或 None 表示每个通道以自己的线程数为上限)；关闭时返回 None
+    """
+    spec = (spec or "auto").strip().lower()
+    if spec == "off":
+        return None
+    if spec == "auto":
+        return DEFAULT_CONCURRENCY_FLOOR, None
+    low, sep, high = spec.partition("-")
+    if not sep:
+        return DEFAULT_CONCURRENCY_FLOOR, max(1, int(low))
+    floor, ceiling = max(1, int(low)), max(1, int(high))
+    if floor > ceiling:
+        raise ValueError(f"并发下限大于上限: {spec}")
+    return floor, ceiling
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+HiFiNi 浏览器模拟登录插件（可选）
+HTTP 登录已经覆盖表单字段、重定向和人机验证，浏览器登录只作为最后的备选：
+selenium 只在真正需要时才导入，未安装 selenium / Chrome 或被关闭时整个插件不可用，
+工作流因此不再需要安装 Chrome
+"""
+
+import os
+import time
+import shutil
+import importlib.util
+from typing import Dict, List, Optional
+
+from hifini_logging import get_logger
+
+log = get_logger()
+
+# HIFINI_BROWSER_LOGIN：auto 仅在本机已安装 selenium 和 Chrome 时启用，on 总是尝试（由 selenium 查找浏览器），off 关闭
+MODE_AUTO = "auto"
+MODE_ON = "on"
+MODE_OFF = "off"
+BROWSER_MODES = (MODE_AUTO, MODE_ON, MODE_OFF)
+
+# auto 模式下查找的浏览器可执行文件
+CHROME_BINARIES = ("google-chrome", "google-chrome-stable", "chromium", "chromium-browser", "chrome")
+
+USER_AGENT = ("Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+              "(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36")
+
+
+class BrowserLogin:
+    """浏览器模拟登录插件"""
+
+    def __init__(self, mode: str = MODE_AUTO):
+        """
+        :param mode: auto / on / off
+        """
+        if mode not in BROWSER_MODES:
+            raise ValueError(f"未知的浏览器登录模式: {mode}")
+        self.mode = mode
+        self._checked = False
+        self._unavailable_reason = None
+
+    @property
+    def unavailable_reason(self) -> Optional[str]:
+        """插件不可用的原因（None 表示可用），只检查一次且不导入 selenium"""
+        if not self._checked:
+            self._unavailable_reason = self._check()
+            self._checked = True
+        return self._unavailable_reason
+
+    @property
+    def available(self) -> bool:
+        return self.unavailable_reason is None
+
+    def _check(self) -> Optional[str]:
+        if self.mode == MODE_OFF:
+            return "已关闭（HIFINI_BROWSER_LOGIN=off）"
+        if importlib.util.find_spec("selenium") is None:
+            return "未安装 selenium（pip install selenium）"
+        if self.mode == MODE_AUTO and not any(shutil.which(name) for name in CHROME_BINARIES):
+            return "未找到 Chrome（设置 HIFINI_BROWSER_LOGIN=on 由 selenium 自动查找）"
+        return None
+
+    def login(self, base_url: str, username: str, password: str) -> List[Dict[str, str]]:
+        """
+        启动无头 Chrome 登录
+        :return: 登录后的 Cookie 列表 [{"name", "value", ...}]
+        :raises RuntimeError: 登录失败（插件不可用、仍停留在登录页或没有 Cookie）
+        """
+        if not self.available:
+            raise RuntimeError(f"浏览器登录不可用: {self.unavailable_reason}")
+
+        from selenium import webdriver
+        from selenium.webdriver.common.by import By
+        from selenium.webdriver.chrome.options import Options
+
+        # 配置 Chrome 选项 - 最简化配置，完全不使用用户数据目录
+        chrome_options = Options()
+
+        # 基础选项 - 无头模式 + 无痕模式
+        chrome_options.add_argument('--headless=new')  # 新版无头模式
+        chrome_options.add_argument('--no-sandbox')  # 沙箱模式
+        chrome_options.add_argument('--disable-dev-shm-usage')  # 共享内存
+        chrome_options.add_argument('--disable-gpu')  # GPU
+        chrome_options.add_argument('--window-size=1920,1080')  # 窗口大小
+        chrome_options.add_argument(f'--user-agent={USER_AGENT}')
+
+        # 禁用自动化特征
+        chrome_options.add_argument('--disable-blink-features=AutomationControlled')
+        chrome_options.add_experimental_option('excludeSwitches', ['enable-automation'])
+        chrome_options.add_experimental_option('useAutomationExtension', False)
+
+        log.detail(f"🔧 启动无头浏览器（独立进程，不影响您的浏览器）")
+
+        driver = webdriver.Chrome(options=chrome_options)
+        try:
+            driver.implicitly_wait(10)
+
+            # 访问首页和登录页面
+            driver.get(base_url)
+            time.sleep(1)
+            driver.get(f"{base_url}/user-login.htm")
+            time.sleep(1)
+
+            # 查找并填写表单
+            email_input = driver.find_element(By.NAME, "email")
+            password_input = driver.find_element(By.NAME, "password")
+
+            email_input.clear()
+            email_input.send_keys(username)
+            time.sleep(0.5)
+
+            password_input.clear()
+            password_input.send_keys(password)
+            time.sleep(0.5)
+
+            # 查找并点击登录按钮，找不到按钮时直接提交表单
+            try:
+                driver.find_element(By.CSS_SELECTOR, "button[type='submit']").click()
+            except Exception:
+                email_input.submit()
+
+            log.info("⏳ 等待登录响应...")
+            time.sleep(3)
+
+            if "user-login" in driver.current_url:
+                raise RuntimeError("仍停留在登录页面")
+            cookies = driver.get_cookies()
+            if not cookies:
+                raise RuntimeError("未获取到 Cookie")
+            return cookies
+        finally:
+            try:
+                driver.quit()
+                log.detail(f"🧹 浏览器已关闭")
+            except Exception:
+                pass
+
+
+def get_browser_mode(environ=os.environ) -> str:
+    """从环境变量读取浏览器登录模式（默认 auto）"""
+    mode = (environ.get("HIFINI_BROWSER_LOGIN") or MODE_AUTO).lower()
+    return mode if mode in BROWSER_MODES else MODE_AUTO
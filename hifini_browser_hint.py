@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+HiFiNi 批量签到的“需要浏览器登录”提示
+记录靠浏览器登录才成功的账号，下次预分类时直接分到浏览器通道，不再先走注定失败的 Cookie / HTTP 登录
+"""
+
+import os
+import json
+from datetime import date, timedelta
+from typing import Iterable
+
+from hifini_journal import OUTCOME_SUCCESS, PHASE_DONE, get_journal_path
+from hifini_storage import get_group_writer, read_json
+
+# 提示的有效天数：过期后账号重新从 Cookie / HTTP 通道开始尝试
+BROWSER_HINT_TTL_DAYS = 7
+
+
+def get_browser_hint_path(base_dir: str) -> str:
+    """
+    “需要浏览器登录”提示文件路径：{账号标识: 加入日期}
+    运行日志不提交到仓库，GitHub Actions 每次都是全新检出；这个小文件随签到记录一起提交，预分类因此在 Actions 中也有效
+    """
+    return os.path.join(base_dir, ".hifini_browser_accounts.json")
+
+
+def load_browser_hint(base_dir: str, today: str) -> set:
+    """
+    读取未过期的“需要浏览器登录”提示
+    :param base_dir: 程序目录
+    :param today: 日期（YYYY-MM-DD）
+    :return: 账号标识集合
+    """
+    cutoff = (date.fromisoformat(today) - timedelta(days=BROWSER_HINT_TTL_DAYS)).isoformat()
+    hint = read_json(get_browser_hint_path(base_dir), dict)
+    return {account_id for account_id, added in hint.items() if added > cutoff}
+
+
+def update_browser_hint(base_dir: str, today: str, added: Iterable[str], cleared: Iterable[str]):
+    """
+    更新“需要浏览器登录”提示：加入本次靠浏览器登录成功的账号（已有的保留原加入日期，到期后重新尝试快速通道），
+    去掉本次不需要浏览器就成功的账号和过期的条目
+    :param base_dir: 程序目录
+    :param today: 日期（YYYY-MM-DD）
+    :param added: 本次需要浏览器登录才成功的账号
+    :param cleared: 本次通过 Cookie / HTTP 登录成功的账号
+    """
+    added, cleared = set(added), set(cleared)
+    if not added and not cleared:
+        return
+    cutoff = (date.fromisoformat(today) - timedelta(days=BROWSER_HINT_TTL_DAYS)).isoformat()
+
+    def mutate(hint: dict):
+        for account_id in cleared:
+            hint.pop(account_id, None)
+        for account_id in [account_id for account_id, day in hint.items() if day <= cutoff]:
+            del hint[account_id]
+        for account_id in added:
+            hint.setdefault(account_id, today)
+
+    get_group_writer(get_browser_hint_path(base_dir), dict).submit(mutate)
+
+
+def get_browser_login_accounts(base_dir: str, before_date: str) -> set:
+    """
+    找出需要浏览器登录才成功的账号：提示文件中未过期的账号，加上最近一次（早于指定日期）运行日志中的账号
+    批量签到时这些账号会被直接分到浏览器通道
+    :param base_dir: 程序目录
+    :param before_date: 日期（YYYY-MM-DD），只查看更早的日志
+    :return: 账号标识集合
+    """
+    hinted = load_browser_hint(base_dir, before_date)
+    journal_dir = os.path.dirname(get_journal_path(base_dir, before_date))
+    if not os.path.isdir(journal_dir):
+        return hinted
+
+    candidates = sorted(
+        name for name in os.listdir(journal_dir)
+        if name.startswith("run-") and name.endswith(".jsonl") and name < f"run-{before_date}.jsonl"
+    )
+    if not candidates:
+        return hinted
+
+    browser_accounts = set()
+    finished = set()
+    with open(os.path.join(journal_dir, candidates[-1]), 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            account_id = entry.get("account")
+            if entry.get("phase") == "browser_login":
+                browser_accounts.add(account_id)
+            elif entry.get("phase") == PHASE_DONE and entry.get("outcome") == OUTCOME_SUCCESS:
+                finished.add(account_id)
+    return hinted | (browser_accounts & finished)
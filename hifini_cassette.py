@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+HiFiNi HTTP 录制/回放（cassette）
+在 requests 传输层录制与站点的真实交互（账号、密码、Cookie 脱敏后）写入夹具文件，
+回放模式按录制顺序返回这些响应，可按录制时的耗时或缩放后的耗时模拟延迟，
+用于离线、可复现地测试登录 / 签到 / 人机验证的解析逻辑和整体吞吐
+"""
+
+import io
+import os
+import json
+import time
+import base64
+import threading
+import http.client
+from typing import Dict, Iterable, List, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3 import HTTPResponse
+
+from hifini_storage import atomic_write_text, read_json
+
+MODE_RECORD = "record"
+MODE_REPLAY = "replay"
+
+CASSETTE_VERSION = 1
+
+# 表单和查询参数中需要脱敏的字段
+REDACT_FIELDS = frozenset({"email", "username", "password", "passwd", "pwd"})
+REDACTED = "<redacted>"
+
+# 录制时丢弃的响应头：回放时响应体已解码，且这些值每次都会变化
+_DROP_HEADERS = frozenset({"content-encoding", "transfer-encoding", "content-length", "connection",
+                           "keep-alive", "date"})
+
+
+class CassetteMiss(requests.ConnectionError):
+    """回放时找不到匹配的录制交互（按网络错误处理，与真实站点不可达时的行为一致）"""
+
+
+def _redact_pairs(pairs: Iterable, secrets: Iterable[str]) -> str:
+    """对 urlencoded 键值对脱敏"""
+    return urlencode([(key, REDACTED if key.lower() in REDACT_FIELDS else _redact_text(value, secrets))
+                      for key, value in pairs])
+
+
+def _redact_text(text: str, secrets: Iterable[str]) -> str:
+    """把文本中出现的账号、密码等替换为占位符"""
+    for secret in secrets:
+        if secret and len(secret) >= 3:
+            text = text.replace(secret, REDACTED)
+    return text
+
+
+def _request_target(url: str, secrets: Iterable[str]) -> str:
+    """去掉协议和主机，只保留脱敏后的路径和查询参数（回放时可指向任意站点地址）"""
+    parts = urlsplit(url)
+    target = parts.path or "/"
+    if parts.query:
+        target += "?" + _redact_pairs(parse_qsl(parts.query, keep_blank_values=True), secrets)
+    return target
+
+
+def _request_body(body, secrets: Iterable[str]) -> str:
+    """脱敏后的请求体（仅用于查看，不参与匹配）"""
+    if not body:
+        return ""
+    if isinstance(body, bytes):
+        body = body.decode("utf-8", errors="replace")
+    pairs = parse_qsl(body, keep_blank_values=True)
+    return _redact_pairs(pairs, secrets) if pairs else _redact_text(body, secrets)
+
+
+class Cassette:
+    """
+    一盒录制带：按轨道（每个账号一条）保存有序的请求/响应交互
+
+    同一个 Cassette 可以同时挂载到多个会话上（批量签到时每个账号一个会话），
+    录制和回放的游标都按轨道保存在这里，线程安全。
+    """
+
+    def __init__(self, path: str, mode: str = MODE_REPLAY, latency_scale: float = 0.0):
+        """
+        :param path: 夹具文件路径（JSON）
+        :param mode: record（访问真实站点并录制）或 replay（只从夹具返回）
+        :param latency_scale: 回放延迟 = 录制耗时 × 该系数（0 表示不等待，1 表示按录制耗时）
+        """
+        if mode not in (MODE_RECORD, MODE_REPLAY):
+            raise ValueError(f"未知的录制模式: {mode}")
+        self.path = path
+        self.mode = mode
+        self.latency_scale = latency_scale
+
+        self._lock = threading.Lock()
+        self._tracks: Dict[str, List[dict]] = {}
+        self._cursors: Dict[str, int] = {}
+        if mode == MODE_REPLAY:
+            if not os.path.exists(path):
+                raise FileNotFoundError(f"录制带不存在: {path}")
+            self._tracks = read_json(path, dict).get("tracks", {})
+
+    def mount(self, session: requests.Session, track: str, secrets: Iterable[str] = ()):
+        """
+        把录制/回放传输挂载到会话上
+        :param session: requests 会话
+        :param track: 轨道名称（账号ID），同一轨道的交互按顺序录制和回放
+        :param secrets: 需要在录制内容中脱敏的字符串（账号、密码）
+        """
+        adapter_class = _RecordingAdapter if self.mode == MODE_RECORD else _ReplayAdapter
+        adapter = adapter_class(self, track, tuple(secrets))
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+
+    def save(self):
+        """把录制内容原子写入夹具文件（回放模式下不做任何事）"""
+        if self.mode != MODE_RECORD:
+            return
+        with self._lock:
+            data = {"version": CASSETTE_VERSION, "tracks": self._tracks}
+            text = json.dumps(data, ensure_ascii=False, indent=2)
+        atomic_write_text(self.path, text + "\n")
+
+    @property
+    def interactions(self) -> int:
+        """已录制/已加载的交互总数"""
+        with self._lock:
+            return sum(len(items) for items in self._tracks.values())
+
+    # ---- 供传输适配器调用 ----
+
+    def _append(self, track: str, interaction: dict):
+        with self._lock:
+            self._tracks.setdefault(track, []).append(interaction)
+
+    def _next(self, track: str, method: str, target: str) -> dict:
+        """
+        取出该轨道下一条匹配的交互：优先按录制顺序，顺序不一致时取第一条未使用的同名请求
+        """
+        with self._lock:
+            items = self._tracks.get(track)
+            if not items:
+                raise CassetteMiss(f"录制带中没有轨道 {track}")
+            cursor = self._cursors.get(track, 0)
+            for index in range(cursor, len(items)):
+                item = items[index]
+                if item.get("used") or item["method"] != method or item["target"] != target:
+                    continue
+                item["used"] = True
+                if index == cursor:
+                    while cursor < len(items) and items[cursor].get("used"):
+                        cursor += 1
+                    self._cursors[track] = cursor
+                return item
+        raise CassetteMiss(f"录制带中没有匹配的请求: {method} {target}")
+
+
+class _RecordingAdapter(HTTPAdapter):
+    """访问真实站点，并把脱敏后的交互追加到录制带"""
+
+    def __init__(self, cassette: Cassette, track: str, secrets: tuple):
+        super().__init__()
+        self.cassette = cassette
+        self.track = track
+        self.secrets = secrets
+
+    def send(self, request, **kwargs):
+        start = time.perf_counter()
+        response = super().send(request, **kwargs)
+        content = response.content
+        elapsed = time.perf_counter() - start
+
+        headers = []
+        for key, value in response.raw.headers.items():
+            if key.lower() in _DROP_HEADERS:
+                continue
+            if key.lower() == "set-cookie":
+                name, _, rest = value.partition("=")
+                _, sep, attributes = rest.partition(";")
+                value = f"{name}={REDACTED}{sep}{attributes}"
+            headers.append([key, _redact_text(value, self.secrets)])
+
+        try:
+            body = {"text": _redact_text(content.decode("utf-8"), self.secrets)}
+        except UnicodeDecodeError:
+            body = {"base64": base64.b64encode(content).decode("ascii")}
+
+        self.cassette._append(self.track, {
+            "method": request.method,
+            "target": _request_target(request.url, self.secrets),
+            "request_body": _request_body(request.body, self.secrets),
+            "status": response.status_code,
+            "reason": response.reason,
+            "headers": headers,
+            "body": body,
+            "elapsed": round(elapsed, 4),
+        })
+        return response
+
+
+class _ReplayAdapter(HTTPAdapter):
+    """不访问网络，按顺序从录制带返回响应"""
+
+    # 连接预热（hifini_warmup）跳过不访问网络的传输
+    offline = True
+
+    def __init__(self, cassette: Cassette, track: str, secrets: tuple):
+        super().__init__()
+        self.cassette = cassette
+        self.track = track
+        self.secrets = secrets
+
+    def send(self, request, **kwargs):
+        item = self.cassette._next(self.track, request.method, _request_target(request.url, self.secrets))
+        if self.cassette.latency_scale > 0:
+            time.sleep(item.get("elapsed", 0) * self.cassette.latency_scale)
+
+        body = item["body"]
+        content = base64.b64decode(body["base64"]) if "base64" in body else body["text"].encode("utf-8")
+
+        # 构造与真实连接相同的 urllib3 响应，Set-Cookie 和重定向都走 requests 的正常流程
+        message = http.client.HTTPMessage()
+        for key, value in item["headers"]:
+            message[key] = value
+        message["Content-Length"] = str(len(content))
+        raw = HTTPResponse(
+            body=io.BytesIO(content),
+            headers=list(message.items()),
+            status=item["status"],
+            reason=item.get("reason"),
+            preload_content=False,
+            decode_content=False,
+            original_response=_ReplayedMessage(message),
+        )
+        return self.build_response(request, raw)
+
+
+class _ReplayedMessage:
+    """requests 从 _original_response.msg 中提取 Set-Cookie"""
+
+    def __init__(self, message: http.client.HTTPMessage):
+        self.msg = message
+
+    def isclosed(self) -> bool:
+        return True
+
+    def close(self):
+        pass
+
+
+def open_cassette(path: Optional[str], mode: str = MODE_REPLAY, latency_scale: float = 0.0) -> Optional[Cassette]:
+    """
+    打开录制带
+    :param path: 夹具文件路径（为空时返回 None）
+    :param mode: record 或 replay
+    :param latency_scale: 回放延迟系数
+    :return: Cassette 实例
+    """
+    if not path:
+        return None
+    return Cassette(path, mode, latency_scale)
@@ -7,15 +7,45 @@ HiFiNi 自动签到脚本
 
 import os
 import re
+import html
+import argparse
+import functools
+from concurrent.futures import ThreadPoolExecutor
 import hashlib
 import requests
-from typing import Optional, Dict
+from typing import Optional, Dict, List
 import json
 import sys
 import time
 import random
 import base64
 from datetime import datetime, timedelta, timezone
+from types import MappingProxyType
+from urllib.parse import urljoin, urlsplit
+
+from hifini_storage import locked_atomic_write_text
+from hifini_records import RecordStore
+from hifini_analytics import CheckinCalendar, summarize_calendar, format_stats
+from hifini_notify import Notification, NotificationDispatcher, load_notifiers
+from hifini_journal import (RunJournal, NULL_JOURNAL, OUTCOME_SUCCESS, OUTCOME_FAILED, OUTCOME_SKIPPED,
+                            get_finished_accounts, get_journal_path)
+from hifini_browser_hint import get_browser_login_accounts, update_browser_hint
+from hifini_metrics import (OUTCOMES, CHECKIN_EVENTS, AUTH_METHODS, VERIFICATIONS, SIGN_ATTEMPTS,
+                            REQUEST_DURATION, REQUEST_ERRORS, ACCOUNT_DURATION, BROWSER_FALLBACK, WARMUP_SAVED,
+                            CONCURRENCY_LIMIT, SHARD, serve_metrics, write_textfile)
+from hifini_logging import get_logger, setup_logging, log_context, set_phase
+from hifini_profile import PhaseProfiler
+from hifini_cassette import MODE_RECORD, MODE_REPLAY, open_cassette
+from hifini_status import serve_status
+from hifini_warmup import Warmup
+from hifini_quotes import QuoteCache, BUILTIN_QUOTES, get_quotes_path
+from hifini_results import ResultsWriter, ResultSummary, read_results, last_run_id, format_summary_lines
+from hifini_browser import BrowserLogin, BROWSER_MODES, MODE_OFF as BROWSER_MODE_OFF, get_browser_mode
+from hifini_schedule import (get_schedule_path, load_history, record_samples, recommend_window, format_report,
+                             next_midnight, slot_label, to_utc_cron)
+from hifini_batch import (BatchRunner, release_slot, LANE_COOKIE, LANE_HTTP, LANE_BROWSER,
+                          DEFAULT_LANE_WORKERS, SIGNAL_ERROR, SIGNAL_CAPTCHA, parse_lane_workers,
+                          parse_concurrency)
 
 # AES加密相关
 try:
@@ -26,18 +56,22 @@ try:
 except ImportError:
     AES_AVAILABLE = False
 
-# Selenium 相关（可选依赖）
-try:
-    from selenium import webdriver
-    from selenium.webdriver.common.by import By
-    from selenium.webdriver.chrome.options import Options
-    from selenium.webdriver.chrome.service import Service
-    SELENIUM_AVAILABLE = True
-except ImportError:
-    SELENIUM_AVAILABLE = False
+log = get_logger()
 
-# 每日一言API
-DAILY_QUOTES_API = "https://v1.hitokoto.cn/?encode=json&c=k"
+# 站点地址与所有账号共享的只读请求头（HIFINI_BASE_URL 可指向本地替身站点 hifini_standin.py）
+DEFAULT_BASE_URL = "https://www.hifiti.com"
+BASE_URL = os.environ.get("HIFINI_BASE_URL", DEFAULT_BASE_URL).rstrip("/")
+DEFAULT_HEADERS = MappingProxyType({
+    "accept": "text/plain, */*; q=0.01",
+    "accept-language": "zh-CN,zh;q=0.9,en-US;q=0.8,en;q=0.7",
+    "cache-control": "no-cache",
+    "dnt": "1",
+    "origin": BASE_URL,
+    "pragma": "no-cache",
+    "referer": f"{BASE_URL}/",
+    "user-agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+    "x-requested-with": "XMLHttpRequest",
+})
 
 
 def get_beijing_time():
@@ -45,35 +79,90 @@ def get_beijing_time():
     return datetime.now(timezone(timedelta(hours=8)))
 
 
+def get_app_dir() -> str:
+    """获取程序所在目录（兼容打包后的可执行文件）"""
+    if getattr(sys, 'frozen', False):
+        return os.path.dirname(os.path.abspath(sys.executable))
+    return os.path.dirname(os.path.abspath(__file__))
+
+
+def get_account_id(username: Optional[str]) -> str:
+    """
+    生成账号标识（账号名的哈希前缀），用于按账号区分本地文件
+    不直接使用账号名，避免在仓库文件名中暴露账号
+    """
+    return hashlib.sha256((username or "cookie").encode('utf-8')).hexdigest()[:12]
+
+
+def get_account_paths(username: Optional[str] = None, primary: bool = True) -> Dict[str, str]:
+    """
+    获取账号对应的签到记录文件和加密Cookie文件路径
+    :param username: 账号
+    :param primary: 是否为主账号（主账号沿用仓库根目录下的文件，保持兼容）
+    :return: {"record_file": ..., "cookie_file": ...}
+    """
+    app_dir = get_app_dir()
+    if primary:
+        return {
+            "record_file": os.path.join(app_dir, "hifini_checkin_record.json"),
+            "cookie_file": os.path.join(app_dir, ".hifini_session.enc"),
+        }
+    
+    account_dir = os.path.join(app_dir, "accounts", get_account_id(username))
+    return {
+        "record_file": os.path.join(account_dir, "hifini_checkin_record.json"),
+        "cookie_file": os.path.join(account_dir, ".hifini_session.enc"),
+    }
+
+
+def has_checked_in_today(record_file: str) -> bool:
+    """
+    根据本地签到记录判断今天是否已经签到成功
+    只读取当月的记录分片，不派生密钥、不解密Cookie、不发起网络请求
+    :param record_file: 账号的签到记录文件
+    """
+    try:
+        return RecordStore(record_file).has_day(get_beijing_time())
+    except Exception as e:
+        log.warning(f"⚠️  读取本地签到记录失败，继续签到: {str(e)}")
+        return False
+
+
 class HiFiNiCheckin:
-    def __init__(self, username: str = None, password: str = None, cookie: str = None):
+    # 大批量账号时每个实例都常驻内存，使用 __slots__ 去掉实例字典
+    __slots__ = (
+        "username", "password", "cookie", "_cookie_header", "_session", "_encryption_key",
+        "login_method", "points_gained", "last_checkin_result", "current_total_coins",
+        "checkin_method", "defer_relogin", "checkin_record_file", "encrypted_cookie_file",
+        "sign_latency", "captcha_seen", "request_failures", "captcha_count",
+    )
+    
+    base_url = BASE_URL
+    headers = DEFAULT_HEADERS
+    # HTTP 录制/回放（hifini_cassette.Cassette），为 None 时直接访问站点
+    cassette = None
+    # 浏览器模拟登录插件（hifini_browser.BrowserLogin），由 --browser-login 决定是否启用
+    browser = BrowserLogin(get_browser_mode())
+    
+    def __init__(self, username: str = None, password: str = None, cookie: str = None,
+                 record_file: str = None, cookie_file: str = None):
         """
         初始化签到类
         :param username: 登录账号（邮箱/手机号/用户名）
         :param password: 登录密码
         :param cookie: 登录后的cookie（可选，如果提供则优先使用）
+        :param record_file: 签到记录文件（可选，默认使用主账号的记录文件）
+        :param cookie_file: 加密Cookie文件（可选，默认使用主账号的Cookie文件）
         """
         self.username = username
         self.password = password
         self.cookie = cookie
-        self.session = requests.Session()
-        self.base_url = "https://www.hifiti.com"
-        self.headers = {
-            "accept": "text/plain, */*; q=0.01",
-            "accept-language": "zh-CN,zh;q=0.9,en-US;q=0.8,en;q=0.7",
-            "cache-control": "no-cache",
-            "dnt": "1",
-            "origin": self.base_url,
-            "pragma": "no-cache",
-            "referer": f"{self.base_url}/",
-            "user-agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-            "x-requested-with": "XMLHttpRequest",
-        }
-        self.session.headers.update(self.headers)
-        
-        # 如果提供了 cookie，则设置
-        if self.cookie:
-            self.session.headers.update({"cookie": self.cookie})
+        # 构造时提供的 cookie 以请求头方式发送（创建 session 时设置）
+        self._cookie_header = cookie
+        # session 在第一次发请求时创建，用完通过 close() 释放
+        self._session = None
+        # 加密密钥在第一次加解密Cookie时派生（PBKDF2 较慢，跳过的账号不需要）
+        self._encryption_key = None
         
         # 签到相关属性
         self.login_method = "未知"
@@ -81,18 +170,69 @@ class HiFiNiCheckin:
         self.last_checkin_result = ""
         self.current_total_coins = ""  # 当前总金币数
         self.checkin_method = "Cookie签到"  # 签到方式
+        self.defer_relogin = False  # Cookie失效时不在签到内重新登录，而是交给调用方（批量签到的登录通道）
+        self.sign_latency = None  # 签到请求耗时（秒），用于选择签到时段
+        self.captcha_seen = False  # 签到时是否触发了人机验证
+        # AIMD 并发控制的拥塞信号：请求异常、429/5xx 的次数，人机验证的次数
+        self.request_failures = 0
+        self.captcha_count = 0
         
         # 文件路径
-        if getattr(sys, 'frozen', False):
-            app_dir = os.path.dirname(os.path.abspath(sys.executable))
-        else:
-            app_dir = os.path.dirname(os.path.abspath(__file__))
-        
-        self.checkin_record_file = os.path.join(app_dir, "hifini_checkin_record.json")
-        self.encrypted_cookie_file = os.path.join(app_dir, ".hifini_session.enc")
+        default_paths = get_account_paths(primary=True)
+        self.checkin_record_file = record_file or default_paths["record_file"]
+        self.encrypted_cookie_file = cookie_file or default_paths["cookie_file"]
         
-        # 加密密钥（基于账号生成，确保每个账号的密钥不同）
-        self.encryption_key = self._generate_encryption_key()
+    @property
+    def session(self) -> requests.Session:
+        """按需创建的 HTTP 会话"""
+        if self._session is None:
+            session = requests.Session()
+            session.headers.update(self.headers)
+            
+            # 如果提供了 cookie，则设置
+            if self._cookie_header:
+                session.headers.update({"cookie": self._cookie_header})
+            
+            # 录制/回放模式：每个账号一条轨道，账号、密码和Cookie在录制内容中脱敏
+            if self.cassette is not None:
+                track = get_account_id(self.username) if self.username else "cookie"
+                self.cassette.mount(session, track, secrets=(self.username, self.password, self.cookie))
+            self._session = session
+        return self._session
+    
+    @property
+    def encryption_key(self) -> bytes:
+        """加密密钥（基于账号生成，确保每个账号的密钥不同）"""
+        if self._encryption_key is None:
+            self._encryption_key = self._generate_encryption_key()
+        return self._encryption_key
+    
+    def _request(self, phase: str, method: str, url: str, **kwargs) -> requests.Response:
+        """
+        通过会话发送请求，并按阶段记录耗时和异常
+        :param phase: 阶段名称（home / login / sign / captcha_verify 等）
+        :param method: 请求方法
+        :param url: 请求地址
+        """
+        start = time.perf_counter()
+        try:
+            response = self.session.request(method, url, **kwargs)
+        except Exception:
+            REQUEST_ERRORS.inc(phase=phase, shard=SHARD)
+            self.request_failures += 1
+            raise
+        else:
+            if response.status_code == 429 or response.status_code >= 500:
+                self.request_failures += 1
+            return response
+        finally:
+            REQUEST_DURATION.observe(time.perf_counter() - start, phase=phase, shard=SHARD)
+    
+    def close(self):
+        """释放 HTTP 会话（连接池）"""
+        if self._session is not None:
+            self._session.close()
+            self._session = None
     
     def _generate_encryption_key(self) -> bytes:
         """
@@ -107,10 +247,10 @@ class HiFiNiCheckin:
         pepper = os.environ.get("HIFINI_ENCRYPTION_KEY", "")
         
         if not pepper:
-            print("⚠️  未设置 HIFINI_ENCRYPTION_KEY，使用默认加密方式")
-            print("💡 强烈建议设置固定密钥以增强安全性！")
-            print("   请在 GitHub Secrets 中添加 HIFINI_ENCRYPTION_KEY")
-            print("   可以使用任意32位以上的随机字符串")
+            log.warning("⚠️  未设置 HIFINI_ENCRYPTION_KEY，使用默认加密方式")
+            log.detail("💡 强烈建议设置固定密钥以增强安全性！")
+            log.detail("   请在 GitHub Secrets 中添加 HIFINI_ENCRYPTION_KEY")
+            log.detail("   可以使用任意32位以上的随机字符串")
         
         # 使用账号和固定盐生成基础密钥材料
         salt = b'HiFiNi_Auto_Checkin_Salt_2025'
@@ -134,7 +274,7 @@ class HiFiNiCheckin:
         :return: 加密后的Base64字符串
         """
         if not AES_AVAILABLE:
-            print("⚠️ pycryptodome未安装，无法加密Cookie")
+            log.warning("⚠️ pycryptodome未安装，无法加密Cookie")
             return ""
         
         try:
@@ -158,11 +298,11 @@ class HiFiNiCheckin:
             # 将IV和加密数据拼接，然后Base64编码
             result = base64.b64encode(iv + encrypted_data).decode('utf-8')
             
-            print(f"🔒 Cookie加密成功，密文长度: {len(result)}")
+            log.info(f"🔒 Cookie加密成功，密文长度: {len(result)}")
             return result
             
         except Exception as e:
-            print(f"❌ Cookie加密失败: {str(e)}")
+            log.error(f"❌ Cookie加密失败: {str(e)}")
             return ""
     
     def _decrypt_cookie(self, encrypted_str: str) -> Optional[dict]:
@@ -172,7 +312,7 @@ class HiFiNiCheckin:
         :return: Cookie字典
         """
         if not AES_AVAILABLE:
-            print("⚠️ pycryptodome未安装，无法解密Cookie")
+            log.warning("⚠️ pycryptodome未安装，无法解密Cookie")
             return None
         
         try:
@@ -197,11 +337,11 @@ class HiFiNiCheckin:
             cookie_json = decrypted_data.decode('utf-8')
             cookie_dict = json.loads(cookie_json)
             
-            print(f"🔓 Cookie解密成功，包含 {len(cookie_dict)} 个字段")
+            log.info(f"🔓 Cookie解密成功，包含 {len(cookie_dict)} 个字段")
             return cookie_dict
             
         except Exception as e:
-            print(f"❌ Cookie解密失败: {str(e)}")
+            log.error(f"❌ Cookie解密失败: {str(e)}")
             return None
     
     def _save_encrypted_cookie(self, cookie_dict: dict) -> bool:
@@ -209,7 +349,10 @@ class HiFiNiCheckin:
         保存加密的Cookie到文件
         """
         if not AES_AVAILABLE:
-            print("⚠️ 跳过Cookie加密保存（需要安装 pycryptodome）")
+            log.warning("⚠️ 跳过Cookie加密保存（需要安装 pycryptodome）")
+            return False
+        if is_simulated_traffic():
+            log.detail("📼 回放或替身站点得到的Cookie不保存，本地的加密Cookie保持不变")
             return False
         
         try:
@@ -217,14 +360,14 @@ class HiFiNiCheckin:
             if not encrypted:
                 return False
             
-            with open(self.encrypted_cookie_file, 'w', encoding='utf-8') as f:
-                f.write(encrypted)
+            # 加锁 + 临时文件rename，并发写入时不会留下截断的密文
+            locked_atomic_write_text(self.encrypted_cookie_file, encrypted)
             
-            print(f"💾 加密Cookie已保存到: {self.encrypted_cookie_file}")
+            log.info(f"💾 加密Cookie已保存到: {self.encrypted_cookie_file}")
             return True
             
         except Exception as e:
-            print(f"❌ 保存加密Cookie失败: {str(e)}")
+            log.error(f"❌ 保存加密Cookie失败: {str(e)}")
             return False
     
     def _load_encrypted_cookie(self) -> Optional[dict]:
@@ -233,10 +376,15 @@ class HiFiNiCheckin:
         """
         if not AES_AVAILABLE:
             return None
+        # 回放和替身站点不读取真实Cookie（也不会把它发给替身站点）；
+        # 录制时同样从登录开始，录下的交互在回放时能完整重放
+        if is_simulated_traffic() or self.cassette is not None:
+            log.detail("📼 录制带或替身站点模式下不使用本地加密Cookie")
+            return None
         
         try:
             if not os.path.exists(self.encrypted_cookie_file):
-                print("📝 未找到加密Cookie文件")
+                log.info("📝 未找到加密Cookie文件")
                 return None
             
             with open(self.encrypted_cookie_file, 'r', encoding='utf-8') as f:
@@ -249,30 +397,94 @@ class HiFiNiCheckin:
             return cookie_dict
             
         except Exception as e:
-            print(f"❌ 加载加密Cookie失败: {str(e)}")
+            log.error(f"❌ 加载加密Cookie失败: {str(e)}")
             return None
     
+    def _parse_login_form(self, content: str) -> Optional[Dict[str, any]]:
+        """
+        从登录页面解析登录表单（包含密码框的 form），与浏览器提交时的字段一致
+        :param content: 登录页面 HTML
+        :return: {"action": 提交地址, "fields": 需要一并提交的隐藏字段, "email_field", "password_field"}
+        """
+        for form_match in re.finditer(r'<form\b([^>]*)>(.*?)</form>', content, re.S | re.I):
+            form_attrs, form_body = form_match.groups()
+            fields = {}
+            email_field = password_field = None
+            for input_match in re.finditer(r'<input\b([^>]*)>', form_body, re.I):
+                attrs = dict((key.lower(), value) for key, _, value in
+                             re.findall(r'([\w-]+)\s*=\s*(["\'])(.*?)\2', input_match.group(1)))
+                name = attrs.get("name")
+                input_type = attrs.get("type", "text").lower()
+                if not name:
+                    continue
+                if input_type == "password":
+                    password_field = password_field or name
+                elif input_type in ("text", "email", "tel") and email_field is None:
+                    email_field = name
+                elif input_type == "hidden" or (input_type == "checkbox" and "checked" in input_match.group(1)):
+                    fields[name] = html.unescape(attrs.get("value", "on" if input_type == "checkbox" else ""))
+            if password_field:
+                action = re.search(r'action\s*=\s*(["\'])(.*?)\1', form_attrs, re.I)
+                return {
+                    "action": html.unescape(action.group(2)) if action and action.group(2) else "user-login.htm",
+                    "fields": fields,
+                    "email_field": email_field or "email",
+                    "password_field": password_field,
+                }
+        return None
+    
+    def _follow_client_redirect(self, response: requests.Response) -> requests.Response:
+        """
+        跟随页面中的 meta refresh / location 跳转（HTTP 重定向已由 requests 处理），
+        登录成功后站点可能通过这类跳转设置 Cookie
+        """
+        content = response.text
+        match = (re.search(r'<meta[^>]+http-equiv=["\']?refresh["\']?[^>]+url=([^"\'>\s]+)', content, re.I)
+                 or re.search(r'(?:window\.)?location(?:\.href)?\s*=\s*["\']([^"\']+)["\']', content))
+        if not match:
+            return response
+        target = urljoin(response.url, html.unescape(match.group(1)))
+        if urlsplit(target).netloc != urlsplit(self.base_url).netloc:
+            return response
+        log.detail(f"↪️  跟随页面跳转: {urlsplit(target).path}")
+        return self._request(
+            "login_redirect", "GET", target,
+            headers={
+                "accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
+                "referer": response.url,
+            },
+            timeout=30
+        )
+    
+    @staticmethod
+    def _needs_verification(content: str) -> bool:
+        return "人机身份验证" in content or "进行人机识别" in content
+    
     def login(self) -> Dict[str, any]:
         """
-        使用账号密码登录
-        :return: 登录结果
+        使用账号密码登录（纯 HTTP）
+        按登录页面的表单提交（包含隐藏字段），跟随重定向，遇到人机验证时先完成验证再继续
+        :return: 登录结果；账号或密码被拒绝时带 credentials_rejected，浏览器登录也无济于事
         """
         if not self.username or not self.password:
-            return {"success": False, "message": "未提供账号或密码"}
+            return {"success": False, "message": "未提供账号或密码", "credentials_rejected": True}
+        
+        page_headers = {
+            "accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
+            "upgrade-insecure-requests": "1",
+        }
         
         try:
-            print(f"🔐 开始登录，账号: {self.username}")
+            log.info(f"🔐 开始登录，账号: {self.username}")
             
             # 清除之前的 cookies
             self.session.cookies.clear()
             
             # 先访问首页，建立 session
-            home_response = self.session.get(
+            home_response = self._request(
+                "home", "GET",
                 f"{self.base_url}/",
-                headers={
-                    "accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
-                    "upgrade-insecure-requests": "1",
-                },
+                headers=page_headers,
                 timeout=30
             )
             
@@ -281,60 +493,87 @@ class HiFiNiCheckin:
             
             time.sleep(0.5)  # 稍微等待
             
-            # 访问登录页面
-            login_page_response = self.session.get(
-                f"{self.base_url}/user-login.htm",
-                headers={
-                    "accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
-                    "referer": f"{self.base_url}/",
-                    "upgrade-insecure-requests": "1",
-                },
-                timeout=30
-            )
+            # 访问登录页面（触发人机验证时先验证，再重新打开登录页）
+            for attempt in range(2):
+                login_page_response = self._request(
+                    "login_page", "GET",
+                    f"{self.base_url}/user-login.htm",
+                    headers={**page_headers, "referer": f"{self.base_url}/"},
+                    timeout=30
+                )
+                if login_page_response.status_code != 200:
+                    return {"success": False, "message": f"访问登录页面失败: {login_page_response.status_code}"}
+                if attempt or not self._needs_verification(login_page_response.text):
+                    break
+                log.warning("⚠️  登录页面要求人机验证，开始处理...")
+                verify_result = self._handle_verification(login_page_response.text)
+                VERIFICATIONS.inc(result="passed" if verify_result["success"] else "failed", shard=SHARD)
+                if not verify_result["success"]:
+                    return verify_result
             
-            if login_page_response.status_code != 200:
-                return {"success": False, "message": f"访问登录页面失败: {login_page_response.status_code}"}
+            form = self._parse_login_form(login_page_response.text)
+            if form is None:
+                # 登录表单由脚本渲染等情况：按原来的固定字段提交
+                log.warning("⚠️  登录页面中未找到登录表单，按默认字段（email / password）提交")
+                form = {"action": "user-login.htm", "fields": {}, "email_field": "email", "password_field": "password"}
             
             time.sleep(0.5)  # 稍微等待
             
-            # 构建登录数据（密码需要 MD5 加密）
+            # 构建登录数据：隐藏字段原样提交，密码与页面脚本一样进行 MD5 加密
             password_md5 = hashlib.md5(self.password.encode()).hexdigest()
-            login_data = {
-                "email": self.username,  # 网站使用 email 字段
-                "password": password_md5,  # 密码需要 MD5 加密
-            }
-            
-            print(f"🔐 密码已进行 MD5 加密")
-            
-            # 发送登录请求
-            login_response = self.session.post(
-                f"{self.base_url}/user-login.htm",
-                data=login_data,
-                headers={
-                    "accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
-                    "content-type": "application/x-www-form-urlencoded",
-                    "referer": f"{self.base_url}/user-login.htm",
-                    "upgrade-insecure-requests": "1",
-                },
-                allow_redirects=True,  # 允许跟随重定向
-                timeout=30
-            )
+            login_data = dict(form["fields"])
+            login_data[form["email_field"]] = self.username
+            login_data[form["password_field"]] = password_md5
+            login_url = urljoin(login_page_response.url, form["action"])
+            
+            log.detail(f"🔐 密码已进行 MD5 加密，表单字段: {list(login_data.keys())}")
+            
+            # 发送登录请求（触发人机验证时验证后重新提交一次）
+            for attempt in range(2):
+                login_response = self._request(
+                    "login", "POST",
+                    login_url,
+                    data=login_data,
+                    headers={
+                        **page_headers,
+                        "content-type": "application/x-www-form-urlencoded",
+                        "referer": login_page_response.url,
+                    },
+                    allow_redirects=True,  # 允许跟随重定向
+                    timeout=30
+                )
+                if attempt or not self._needs_verification(login_response.text):
+                    break
+                log.warning("⚠️  登录请求触发人机验证，开始处理...")
+                verify_result = self._handle_verification(login_response.text)
+                VERIFICATIONS.inc(result="passed" if verify_result["success"] else "failed", shard=SHARD)
+                if not verify_result["success"]:
+                    return verify_result
             
             # 检查登录是否成功
             content = login_response.text
             
+            # 站点以 AJAX 方式登录时返回 JSON：code 为 0 表示成功
+            ajax_match = re.search(r'"code"\s*:\s*"?(-?\d+)"?', content[:200])
+            if ajax_match and ajax_match.group(1) != "0":
+                message_match = re.search(r'"message"\s*:\s*"([^"]+)"', content)
+                error_msg = message_match.group(1) if message_match else "用户名或密码错误"
+                return {"success": False, "message": f"登录失败: {error_msg}", "credentials_rejected": True}
+            
             # 检查是否包含登录失败的标志
             if "用户名或密码错误" in content or "账号不存在" in content or "密码错误" in content:
-                error_match = re.search(r'class="[^"]*error[^"]*">([^<]+)<', content)
-                error_msg = error_match.group(1) if error_match else "用户名或密码错误"
-                return {"success": False, "message": f"登录失败: {error_msg}"}
-            
-            # 检查是否还在登录页面（登录失败的标志）
-            if "user-login" in login_response.url or "登录" in content[:500]:
-                # 尝试提取错误信息
-                error_match = re.search(r'<div[^>]*class="[^"]*alert[^"]*"[^>]*>([^<]+)<', content)
-                error_msg = error_match.group(1).strip() if error_match else "登录失败，请检查账号密码"
-                return {"success": False, "message": error_msg}
+                error_match = re.search(r'class="[^"]*(?:error|alert)[^"]*">([^<]+)<', content)
+                error_msg = error_match.group(1).strip() if error_match else "用户名或密码错误"
+                return {"success": False, "message": f"登录失败: {error_msg}", "credentials_rejected": True}
+            
+            if not ajax_match:
+                # 检查是否还在登录页面（登录失败的标志）
+                if urlsplit(login_response.url).path.endswith("/user-login.htm") or "登录" in content[:500]:
+                    # 尝试提取错误信息
+                    error_match = re.search(r'<div[^>]*class="[^"]*alert[^"]*"[^>]*>([^<]+)<', content)
+                    error_msg = error_match.group(1).strip() if error_match else "登录失败，请检查账号密码"
+                    return {"success": False, "message": error_msg}
+                self._follow_client_redirect(login_response)
             
             # 获取所有 cookies
             cookies = self.session.cookies.get_dict()
@@ -345,7 +584,8 @@ class HiFiNiCheckin:
                 self.cookie = cookie_str
                 
                 # 验证登录是否真正成功，访问个人页面或签到页面
-                verify_response = self.session.get(
+                verify_response = self._request(
+                    "verify_login", "GET",
                     f"{self.base_url}/sg_sign.htm",
                     headers={
                         "accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
@@ -360,8 +600,8 @@ class HiFiNiCheckin:
                 if "user-login.htm" in verify_content or "请先登录" in verify_content:
                     return {"success": False, "message": "登录验证失败，Cookie 无效"}
                 
-                print(f"✅ 登录成功！Cookie 长度: {len(cookie_str)}")
-                print(f"🔍 Cookies 内容: {list(cookies.keys())}")
+                log.info(f"✅ 登录成功！Cookie 长度: {len(cookie_str)}")
+                log.info(f"🔍 Cookies 内容: {list(cookies.keys())}")
                 self.login_method = "账号密码"
                 
                 # 保存加密的 Cookie
@@ -373,116 +613,42 @@ class HiFiNiCheckin:
                 
         except Exception as e:
             error_msg = f"登录过程发生错误: {str(e)}"
-            print(f"❌ {error_msg}")
+            log.error(f"❌ {error_msg}")
             return {"success": False, "message": error_msg}
     
     def login_with_selenium(self) -> Dict[str, any]:
         """
-        使用 Selenium 浏览器模拟登录（作为 fallback）
+        使用浏览器插件模拟登录（HTTP 登录失败时的可选备选方案）
         :return: 登录结果
         """
-        if not SELENIUM_AVAILABLE:
-            return {"success": False, "message": "Selenium 未安装，无法使用浏览器登录"}
-        
         if not self.username or not self.password:
             return {"success": False, "message": "未提供账号或密码"}
         
-        driver = None
         try:
-            print(f"🌐 使用浏览器模拟登录，账号: {self.username}")
-            
-            # 配置 Chrome 选项 - 最简化配置，完全不使用用户数据目录
-            chrome_options = Options()
-            
-            # 基础选项 - 无头模式 + 无痕模式
-            chrome_options.add_argument('--headless=new')  # 新版无头模式
-            chrome_options.add_argument('--no-sandbox')  # 沙箱模式
-            chrome_options.add_argument('--disable-dev-shm-usage')  # 共享内存
-            chrome_options.add_argument('--disable-gpu')  # GPU
-            chrome_options.add_argument('--window-size=1920,1080')  # 窗口大小
-            
-            # 用户代理
-            chrome_options.add_argument('--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36')
-            
-            # 禁用自动化特征
-            chrome_options.add_argument('--disable-blink-features=AutomationControlled')
-            chrome_options.add_experimental_option('excludeSwitches', ['enable-automation'])
-            chrome_options.add_experimental_option('useAutomationExtension', False)
-            
-            print(f"🔧 启动无头浏览器（独立进程，不影响您的浏览器）")
-            
-            # 启动浏览器
-            driver = webdriver.Chrome(options=chrome_options)
-            driver.implicitly_wait(10)
-            
-            # 访问首页
-            driver.get(self.base_url)
-            time.sleep(1)
-            
-            # 访问登录页面
-            driver.get(f"{self.base_url}/user-login.htm")
-            time.sleep(1)
-            
-            # 查找并填写表单
-            email_input = driver.find_element(By.NAME, "email")
-            password_input = driver.find_element(By.NAME, "password")
-            
-            email_input.clear()
-            email_input.send_keys(self.username)
-            time.sleep(0.5)
-            
-            password_input.clear()
-            password_input.send_keys(self.password)
-            time.sleep(0.5)
-            
-            # 查找并点击登录按钮
-            try:
-                login_button = driver.find_element(By.CSS_SELECTOR, "button[type='submit']")
-                login_button.click()
-            except:
-                # 如果找不到按钮，直接提交表单
-                email_input.submit()
-            
-            print("⏳ 等待登录响应...")
-            time.sleep(3)
-            
-            # 检查是否登录成功
-            current_url = driver.current_url
-            
-            if "user-login" not in current_url:
-                # 获取 Cookies
-                cookies = driver.get_cookies()
-                if cookies:
-                    cookie_str = "; ".join([f"{c['name']}={c['value']}" for c in cookies])
-                    self.cookie = cookie_str
-                    
-                    # 更新 session 的 cookie
-                    cookie_dict = {}
-                    for cookie in cookies:
-                        self.session.cookies.set(cookie['name'], cookie['value'])
-                        cookie_dict[cookie['name']] = cookie['value']
-                    
-                    print(f"✅ 浏览器登录成功！Cookie 长度: {len(cookie_str)}")
-                    self.login_method = "浏览器模拟登录"
-                    
-                    # 保存加密的 Cookie
-                    self._save_encrypted_cookie(cookie_dict)
-                    
-                    return {"success": True, "message": "浏览器登录成功", "cookie": cookie_str}
-            
-            return {"success": False, "message": "浏览器登录失败"}
+            log.info(f"🌐 使用浏览器模拟登录，账号: {self.username}")
+            cookies = self.browser.login(self.base_url, self.username, self.password)
+            
+            cookie_str = "; ".join([f"{c['name']}={c['value']}" for c in cookies])
+            self.cookie = cookie_str
+            
+            # 更新 session 的 cookie
+            cookie_dict = {}
+            for cookie in cookies:
+                self.session.cookies.set(cookie['name'], cookie['value'])
+                cookie_dict[cookie['name']] = cookie['value']
+            
+            log.info(f"✅ 浏览器登录成功！Cookie 长度: {len(cookie_str)}")
+            self.login_method = "浏览器模拟登录"
+            
+            # 保存加密的 Cookie
+            self._save_encrypted_cookie(cookie_dict)
+            
+            return {"success": True, "message": "浏览器登录成功", "cookie": cookie_str}
             
         except Exception as e:
             error_msg = f"浏览器登录过程发生错误: {str(e)}"
-            print(f"❌ {error_msg}")
+            log.error(f"❌ {error_msg}")
             return {"success": False, "message": error_msg}
-        finally:
-            if driver:
-                try:
-                    driver.quit()
-                    print(f"🧹 浏览器已关闭")
-                except:
-                    pass
 
     def checkin(self, retry_on_failure: bool = True) -> Dict[str, any]:
         """
@@ -492,11 +658,16 @@ class HiFiNiCheckin:
         """
         try:
             # 第一次尝试签到
-            print("🚀 开始签到...")
-            response = self.session.post(
+            log.info("🚀 开始签到...")
+            sign_started = time.perf_counter()
+            response = self._request(
+                "sign", "POST",
                 f"{self.base_url}/sg_sign.htm",
                 timeout=30
             )
+            self.sign_latency = time.perf_counter() - sign_started
+            
+            SIGN_ATTEMPTS.inc(shard=SHARD)
             
             if response.status_code != 200:
                 return {"success": False, "message": f"请求失败，状态码: {response.status_code}"}
@@ -505,13 +676,17 @@ class HiFiNiCheckin:
             
             # 检查是否因为 Cookie 失效需要重新登录
             if ("请登录" in content or "user-login" in content or "登录" in content) and retry_on_failure:
-                print("⚠️  Cookie 可能已失效，尝试重新登录...")
+                CHECKIN_EVENTS.inc(event="relogin", shard=SHARD)
                 self.checkin_method = "Cookie失效，重新登录后签到"
+                if self.defer_relogin and self.username and self.password:
+                    log.warning("⚠️  Cookie 可能已失效，转交登录流程...")
+                    return {"success": False, "message": "Cookie 已失效，需要重新登录", "need_login": True}
                 
+                log.warning("⚠️  Cookie 可能已失效，尝试重新登录...")
                 if self.username and self.password:
                     login_result = self.login()
                     if login_result["success"]:
-                        print("🔄 重新登录成功，再次尝试签到...")
+                        log.info("🔄 重新登录成功，再次尝试签到...")
                         time.sleep(1)  # 等待1秒
                         return self.checkin(retry_on_failure=False)  # 重试一次，不再重复
                     else:
@@ -521,15 +696,19 @@ class HiFiNiCheckin:
             
             # 检查是否需要人机验证
             if "人机身份验证" in content or "进行人机识别" in content:
-                print("⚠️  检测到人机验证，开始处理...")
+                log.warning("⚠️  检测到人机验证，开始处理...")
+                CHECKIN_EVENTS.inc(event="captcha", shard=SHARD)
+                self.captcha_seen = True
                 verify_result = self._handle_verification(content)
+                VERIFICATIONS.inc(result="passed" if verify_result["success"] else "failed", shard=SHARD)
                 
                 if not verify_result["success"]:
                     return verify_result
                 
                 # 验证通过后重新签到
-                print("✅ 人机验证通过，重新签到...")
-                response = self.session.post(
+                log.info("✅ 人机验证通过，重新签到...")
+                response = self._request(
+                    "sign", "POST",
                     f"{self.base_url}/sg_sign.htm",
                     timeout=30
                 )
@@ -550,7 +729,7 @@ class HiFiNiCheckin:
                 coins_match = re.search(pattern, content)
                 if coins_match:
                     self.current_total_coins = coins_match.group(1)
-                    print(f"💰 当前总金币: {self.current_total_coins}")
+                    log.info(f"💰 当前总金币: {self.current_total_coins}")
                     break
             
             # 解析签到结果
@@ -563,22 +742,23 @@ class HiFiNiCheckin:
                 points_match = re.search(r'(\d+)\s*(?:金币|积分|点)', message)
                 if points_match:
                     self.points_gained = points_match.group(1)
-                    print(f"💎 本次获得: +{self.points_gained} 金币")
+                    log.info(f"💎 本次获得: +{self.points_gained} 金币")
                 
-                print(f"✨ {message}")
+                log.info(f"✨ {message}")
                 
                 # 保存签到记录（耗时稍后在main中统一记录）
                 is_new_checkin = "成功" in message or "获得" in message or "领取" in message
-                self._save_checkin_record(status="success" if is_new_checkin else "already")
+                status = "success" if is_new_checkin else "already"
+                self._save_checkin_record(status=status)
                 
-                return {"success": True, "message": message}
+                return {"success": True, "message": message, "status": status}
             else:
-                print(f"⚠️  签到响应: {content[:200]}")
+                log.warning(f"⚠️  签到响应: {content[:200]}")
                 return {"success": True, "message": "签到完成（未解析到具体信息）"}
                 
         except Exception as e:
             error_msg = f"签到过程发生错误: {str(e)}"
-            print(f"❌ {error_msg}")
+            log.error(f"❌ {error_msg}")
             return {"success": False, "message": error_msg}
 
     def _handle_verification(self, content: str) -> Dict[str, any]:
@@ -587,6 +767,7 @@ class HiFiNiCheckin:
         :param content: 包含验证信息的响应内容
         :return: 验证结果
         """
+        self.captcha_count += 1
         try:
             # 提取验证脚本URL
             js_url_match = re.search(r'type="text/javascript"\s+src="([^"]+)"', content)
@@ -594,10 +775,11 @@ class HiFiNiCheckin:
                 return {"success": False, "message": "未找到验证脚本URL"}
             
             js_url = js_url_match.group(1)
-            print(f"📥 获取验证脚本: {js_url}")
+            log.info(f"📥 获取验证脚本: {js_url}")
             
             # 获取验证脚本
-            js_response = self.session.get(
+            js_response = self._request(
+                "captcha_script", "GET",
                 f"{self.base_url}{js_url}",
                 headers={
                     "accept": "*/*",
@@ -623,7 +805,7 @@ class HiFiNiCheckin:
             yz_value = value_match.group(1)
             yz_type = type_match.group(1)
             
-            print(f"🔑 验证参数: key={yz_key[:20]}..., type={yz_type}")
+            log.info(f"🔑 验证参数: key={yz_key[:20]}..., type={yz_type}")
             
             # 转换验证值
             dec_value = self._convert_verification_value(yz_value)
@@ -636,13 +818,14 @@ class HiFiNiCheckin:
             # 判断验证类型（滑动验证或IP验证）
             if "人机身份验证" in content:
                 verify_url = f"{self.base_url}/a20be899_96a6_40b2_88ba_32f1f75f1552_yanzheng_huadong.php"
-                print("🔄 使用滑动验证...")
+                log.info("🔄 使用滑动验证...")
             else:
                 verify_url = f"{self.base_url}/a20be899_96a6_40b2_88ba_32f1f75f1552_yanzheng_ip.php"
-                print("🔄 使用IP验证...")
+                log.info("🔄 使用IP验证...")
             
             # 发送验证请求
-            verify_response = self.session.get(
+            verify_response = self._request(
+                "captcha_verify", "GET",
                 f"{verify_url}?type={yz_type}&key={yz_key}&value={md5_value}",
                 headers={
                     "accept": "*/*",
@@ -681,139 +864,39 @@ class HiFiNiCheckin:
             
             return result
         except Exception as e:
-            print(f"⚠️  转换验证值时出错: {str(e)}")
+            log.warning(f"⚠️  转换验证值时出错: {str(e)}")
             return None
     
     def _save_checkin_record(self, status="success"):
-        """保存签到记录"""
+        """保存签到记录（只改写当月分片和汇总文件）"""
+        if status != "success":
+            return
+        if is_simulated_traffic():
+            log.detail("📼 录制带或替身站点的签到不写入签到记录")
+            return
         try:
-            beijing_time = get_beijing_time()
-            today = beijing_time.strftime('%Y-%m-%d')
-            month = beijing_time.strftime('%Y-%m')
-            year = beijing_time.strftime('%Y')
-            
-            # 加载现有记录
-            if os.path.exists(self.checkin_record_file):
-                with open(self.checkin_record_file, 'r', encoding='utf-8') as f:
-                    try:
-                        record = json.load(f)
-                    except json.JSONDecodeError:
-                        record = {"total": 0, "years": {}, "total_points": 0}
-            else:
-                record = {"total": 0, "years": {}, "total_points": 0}
-            
-            # 确保总金币字段存在
-            if "total_points" not in record:
-                record["total_points"] = 0
-            
-            # 确保年份存在
-            if year not in record["years"]:
-                record["years"][year] = {"total": 0, "months": {}, "points": 0}
-            elif "points" not in record["years"][year]:
-                record["years"][year]["points"] = 0
-            
-            # 确保月份存在
-            if month not in record["years"][year]["months"]:
-                record["years"][year]["months"][month] = {"total": 0, "days": [], "points": 0}
-            elif "points" not in record["years"][year]["months"][month]:
-                record["years"][year]["months"][month]["points"] = 0
-            
-            # 检查今天是否已经签到
-            days = record["years"][year]["months"][month]["days"]
-            
-            # 计算本月总天数
-            current_date = beijing_time
-            days_in_month = (current_date.replace(month=current_date.month % 12 + 1, day=1) - timedelta(days=1)).day
-            record["years"][year]["months"][month]["days_in_month"] = days_in_month
-            
-            # 新签到情况下处理金币和天数
-            if today not in days and status == "success":
-                # 今天首次签到，更新计数
-                days.append(today)
-                record["total"] += 1
-                record["years"][year]["total"] += 1
-                record["years"][year]["months"][month]["total"] += 1
-                
-                # 保存金币信息
-                if self.points_gained:
-                    try:
-                        points = int(self.points_gained)
-                        # 添加到本月金币
-                        record["years"][year]["months"][month]["points"] += points
-                        # 添加到年度金币
-                        record["years"][year]["points"] += points
-                        # 添加到总金币
-                        record["total_points"] += points
-                        print(f"💰 记录本次签到金币: +{points} 金币")
-                    except Exception as e:
-                        print(f"⚠️  保存金币信息失败: {str(e)}")
-                
-                # 保存记录
-                record["years"][year]["months"][month]["days"] = days
-                print(f"📊 签到记录已更新: 总计{record['total']}天，本月{len(days)}/{days_in_month}天")
-            
-            # 保存记录文件
-            with open(self.checkin_record_file, 'w', encoding='utf-8') as f:
-                json.dump(record, f, ensure_ascii=False, indent=2)
-            
-            return record
+            points = None
+            if self.points_gained:
+                try:
+                    points = int(self.points_gained)
+                except ValueError as e:
+                    log.warning(f"⚠️  保存金币信息失败: {str(e)}")
+            
+            added, month, summary = RecordStore(self.checkin_record_file).add_day(get_beijing_time(), points)
+            if added:
+                if points:
+                    log.info(f"💰 记录本次签到金币: +{points} 金币")
+                log.info(f"📊 签到记录已更新: 总计{summary['total']}天，"
+                         f"本月{len(month['days'])}/{month['days_in_month']}天")
         except Exception as e:
-            print(f"❌ 保存签到记录失败: {str(e)}")
-            return {"total": 0, "years": {}, "total_points": 0}
+            log.error(f"❌ 保存签到记录失败: {str(e)}")
     
     def _get_checkin_statistics(self):
-        """获取签到统计信息"""
+        """获取签到统计信息（只读取汇总文件和当月分片）"""
         try:
-            if os.path.exists(self.checkin_record_file):
-                with open(self.checkin_record_file, 'r', encoding='utf-8') as f:
-                    try:
-                        record = json.load(f)
-                        
-                        # 获取当前年月（使用北京时间）
-                        beijing_time = get_beijing_time()
-                        current_year = beijing_time.strftime('%Y')
-                        current_month = beijing_time.strftime('%Y-%m')
-                        today = beijing_time.strftime('%Y-%m-%d')
-                        
-                        # 获取总签到天数
-                        total_days = record.get("total", 0)
-                        
-                        # 获取本月签到天数
-                        month_data = record.get("years", {}).get(current_year, {}).get("months", {}).get(current_month, {})
-                        month_days = len(month_data.get("days", []))
-                        days_in_month = month_data.get("days_in_month", 30)
-                        
-                        # 获取金币信息
-                        month_points = month_data.get("points", 0)
-                        year_points = record.get("years", {}).get(current_year, {}).get("points", 0)
-                        total_points = record.get("total_points", 0)
-                        
-                        # 判断今日是否首次签到
-                        is_first_today = today in month_data.get("days", [])
-                        
-                        return {
-                            "total_days": total_days,
-                            "month_days": month_days,
-                            "days_in_month": days_in_month,
-                            "month_points": month_points,
-                            "year_points": year_points,
-                            "total_points": total_points,
-                            "is_first_today": is_first_today
-                        }
-                    except json.JSONDecodeError:
-                        pass
-            
-            return {
-                "total_days": 0,
-                "month_days": 0,
-                "days_in_month": 30,
-                "month_points": 0,
-                "year_points": 0,
-                "total_points": 0,
-                "is_first_today": False
-            }
+            return RecordStore(self.checkin_record_file).statistics(get_beijing_time())
         except Exception as e:
-            print(f"❌ 获取签到统计信息失败: {str(e)}")
+            log.error(f"❌ 获取签到统计信息失败: {str(e)}")
             return {
                 "total_days": 0,
                 "month_days": 0,
@@ -824,12 +907,13 @@ class HiFiNiCheckin:
                 "is_first_today": False
             }
     
-    def send_telegram_notification(self, tg_bot_token: str, tg_chat_id: str, message: str):
-        """发送Telegram通知"""
-        if not tg_bot_token or not tg_chat_id:
-            print("⚠️  Telegram Bot Token或Chat ID为空，跳过通知")
-            return
-        
+    def build_notification(self, message: str, success: bool = True, quote: str = None) -> Notification:
+        """
+        构建签到通知（发送由 NotificationDispatcher 并发完成）
+        :param message: 签到结果消息
+        :param success: 签到是否成功
+        :param quote: 每日一言（为空时使用内置格言）
+        """
         try:
             # 获取当前日期和时间（北京时间）
             now = get_beijing_time()
@@ -872,28 +956,8 @@ class HiFiNiCheckin:
             ]
             motto = random.choice(mottos)
             
-            # 获取每日一言
-            try:
-                direct_session = requests.Session()
-                response = direct_session.get(DAILY_QUOTES_API, timeout=5, verify=False, proxies={})
-                if response.status_code == 200:
-                    hitokoto_data = response.json()
-                    quote = f"{hitokoto_data.get('hitokoto', '')} —— {hitokoto_data.get('from_who', '佚名') or '佚名'}"
-                else:
-                    raise Exception(f"API返回状态码: {response.status_code}")
-            except Exception as e:
-                print(f"⚠️  获取每日一言失败: {str(e)}，使用备用格言")
-                quotes = [
-                    "音乐是比一切智慧、一切哲学更高的启示。 —— 贝多芬",
-                    "音乐表达的是无法用语言描述，却又不可能对其保持沉默的东西。 —— 维克多·雨果",
-                    "没有音乐，生命是没有价值的。 —— 尼采",
-                    "音乐是人类的第二语言。 —— 马克思",
-                    "音乐应当使人类的精神爆发出火花。 —— 贝多芬",
-                    "不要等待，时机永远不会恰到好处。 —— 拿破仑·希尔",
-                    "合理安排时间，就等于节约时间。 —— 培根",
-                    "行动是治愈恐惧的良药。 —— 戴尔·卡耐基"
-                ]
-                quote = random.choice(quotes)
+            # 每日一言（由批量签到共用的缓存提供，不在这里请求外部 API）
+            quote = quote or random.choice(BUILTIN_QUOTES)
             
             # 获取签到状态
             status = "未知"
@@ -958,162 +1022,950 @@ class HiFiNiCheckin:
 
 📝 每日一言: {quote}"""
             
-            # 检查消息长度
-            max_length = 4096
-            if len(formatted_message) > max_length:
-                formatted_message = formatted_message.split("📝 每日一言:")[0].strip()
-            
-            url = f"https://api.telegram.org/bot{tg_bot_token}/sendMessage"
-            data = {
-                "chat_id": tg_chat_id,
-                "text": formatted_message,
-                "parse_mode": "Markdown"
-            }
-            
-            response = requests.post(url, data=data, verify=False, timeout=10)
-            
-            if response.status_code == 200:
-                print("✅ Telegram通知发送成功")
+            return Notification("HiFiNi音乐磁场每日签到", formatted_message, account=self.username,
+                                success=success, stats=stats)
+        except Exception as e:
+            log.error(f"❌ 构建通知出错: {str(e)}")
+            return Notification("HiFiNi音乐磁场每日签到", message, account=self.username, success=success)
+
+
+class AccountState:
+    """
+    批量签到中单个账号的状态
+    
+    排队中的账号只保存账号、密码和少量状态（__slots__，无实例字典）；
+    请求头、通知配置、运行日志等在 BatchContext 中共享，
+    HTTP 会话所在的 HiFiNiCheckin 实例在开始处理时才创建，结束后立即释放。
+    """
+    __slots__ = ("username", "password", "cookie", "primary", "relogin", "result", "client", "context",
+                 "lane", "started_at", "failures", "captchas")
+    
+    def __init__(self, username: str = None, password: str = None, cookie: str = None, primary: bool = True):
+        self.username = username
+        self.password = password
+        self.cookie = cookie
+        self.primary = primary
+        self.relogin = False  # 是否由Cookie通道晋级而来（Cookie失效后的重新登录）
+        self.result: Optional[Dict[str, any]] = None  # 处理中的结果，写入结果文件和汇总后清除
+        self.client: Optional[HiFiNiCheckin] = None
+        self.context: Optional["BatchContext"] = None
+        self.lane: Optional[str] = None  # 当前（最后）所在的执行通道
+        self.started_at = 0.0  # 开始处理的时间（time.perf_counter）
+        # 已释放的签到实例遇到的请求失败和人机验证次数（见 _take_congestion）
+        self.failures = 0
+        self.captchas = 0
+    
+    def reset(self, context: "BatchContext"):
+        """
+        开始新一次批量签到：守护模式下同一批 AccountState 每天复用，上次运行留下的状态全部清除
+        :param context: 本次批量签到的共享配置
+        """
+        self.release()
+        self.context = context
+        self.relogin = False
+        self.lane = None
+        self.started_at = 0.0
+        self.failures = 0
+        self.captchas = 0
+    
+    @property
+    def account_id(self) -> str:
+        return get_account_id(self.username)
+    
+    @property
+    def paths(self) -> Dict[str, str]:
+        return get_account_paths(self.username, primary=self.primary)
+    
+    def get_client(self) -> HiFiNiCheckin:
+        """按需创建签到实例（会话和密钥派生都推迟到真正需要时）"""
+        if self.client is None:
+            if self.username and self.password:
+                log.info(f"📝 账号配置: {self.username}")
+                self.client = HiFiNiCheckin(username=self.username, password=self.password, **self.paths)
             else:
-                print(f"❌ Telegram通知发送失败: {response.status_code} - {response.text}")
+                log.info(f"📝 使用 Cookie 登录")
+                log.info(f"🍪 Cookie 长度: {len(self.cookie)}")
+                self.client = HiFiNiCheckin(cookie=self.cookie, **self.paths)
+                self.client.login_method = "Cookie令牌"
+        return self.client
+    
+    def release(self):
+        """账号处理结束后释放签到实例和 HTTP 会话，结果已写入运行日志和汇总，也一并释放"""
+        if self.client is not None:
+            self.failures += self.client.request_failures
+            self.captchas += self.client.captcha_count
+            self.client.close()
+            self.client = None
+        self.result = None
+
+
+def is_simulated_traffic() -> bool:
+    """
+    本次请求是否发往真实站点以外：回放录制带，或 HIFINI_BASE_URL 指向替身站点
+    这时不写入签到记录、签到时段样本和加密Cookie，回放的耗时和模拟的签到不会污染本地数据（也不会被工作流提交）；
+    录制模式访问的是真实站点，签到是真实的，照常记录
+    """
+    cassette = HiFiNiCheckin.cassette
+    if cassette is not None and cassette.mode == MODE_REPLAY:
+        return True
+    return HiFiNiCheckin.base_url.rstrip("/") != DEFAULT_BASE_URL
+
+
+class BatchContext:
+    """一次批量签到中所有账号共享的只读配置"""
+    __slots__ = ("journal", "notifier", "profiler", "quotes", "results", "summary", "schedule_samples",
+                 "browser_accounts", "browser_added", "browser_cleared")
+    
+    def __init__(self, journal=NULL_JOURNAL, notifier: NotificationDispatcher = None,
+                 profiler: PhaseProfiler = None, quotes: QuoteCache = None, results: ResultsWriter = None):
+        self.journal = journal
+        self.notifier = notifier
+        self.profiler = profiler
+        self.quotes = quotes  # 所有账号共用的每日一言缓存（只在发送通知时需要）
+        self.results = results  # 结果文件（为 None 时只做汇总）
+        # 本次运行的增量汇总，不保存单个账号的结果
+        self.summary = results.summary if results else ResultSummary()
+        # 本次运行的签到时段样本：(签到时间, 签到请求耗时, 是否触发人机验证)
+        self.schedule_samples = []
+        # 预分类到浏览器通道的账号，以及本次需要更新的“需要浏览器登录”提示（只记录变化的账号）
+        self.browser_accounts = frozenset()
+        self.browser_added = set()
+        self.browser_cleared = set()
+
+
+def load_accounts() -> List[AccountState]:
+    """
+    从环境变量读取账号配置
+    - HIFINI_USERNAME / HIFINI_PASSWORD：主账号
+    - HIFINI_COOKIE：未配置主账号密码时使用Cookie签到
+    - HIFINI_ACCOUNTS：额外账号，每行一个，格式为 账号:密码
+    账号去掉首尾空白后去重（包括 HIFINI_ACCOUNTS 内部的重复），重复的账号只保留第一次出现的配置
+    :return: 账号列表
+    """
+    accounts = []
+    seen = set()
+    
+    username = (os.environ.get("HIFINI_USERNAME") or "").strip()
+    password = os.environ.get("HIFINI_PASSWORD")
+    cookie = os.environ.get("HIFINI_COOKIE")
+    
+    if username and password:
+        accounts.append(AccountState(username=username, password=password, primary=True))
+        seen.add(username)
+    elif cookie:
+        accounts.append(AccountState(cookie=cookie, primary=True))
+    
+    for line in os.environ.get("HIFINI_ACCOUNTS", "").splitlines():
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        if ":" not in line:
+            log.warning("⚠️  HIFINI_ACCOUNTS 中存在格式错误的行（应为 账号:密码），已跳过")
+            continue
+        extra_username, extra_password = (part.strip() for part in line.split(":", 1))
+        if not extra_username or extra_username == username:
+            continue
+        if extra_username in seen:
+            log.warning("⚠️  HIFINI_ACCOUNTS 中存在重复的账号，已跳过")
+            continue
+        seen.add(extra_username)
+        accounts.append(AccountState(username=extra_username, password=extra_password, primary=False))
+    
+    return accounts
+
+
+def classify_account(run: AccountState, force: bool = False, browser_accounts: set = frozenset()) -> Optional[str]:
+    """
+    签到前对账号分类（只检查本地文件，不做网络请求）
+    :param run: 账号执行状态
+    :param force: 是否忽略本地记录强制签到
+    :param browser_accounts: 上次需要浏览器登录的账号
+    :return: 初始通道名称；None 表示今天已签到、无需处理
+    """
+    # 本地预检：今天已经签到成功的账号直接跳过，不做任何网络请求
+    if not force and has_checked_in_today(run.paths["record_file"]):
+        log.info(f"⏭️  {run.username or '使用Cookie'}: 本地记录显示今日已签到，跳过（使用 --force 强制签到）")
+        run.result = {"success": True, "message": "今日已签到（本地记录）", "skipped": True}
+        return None
+    
+    # 只有Cookie的账号只能走Cookie签到
+    if not run.password:
+        return LANE_COOKIE
+    
+    if AES_AVAILABLE and os.path.exists(run.paths["cookie_file"]):
+        return LANE_COOKIE
+    
+    # 上次需要浏览器登录的账号：插件可用时直接走浏览器通道，否则先用 HTTP 登录
+    if run.account_id in browser_accounts:
+        if HiFiNiCheckin.browser.available:
+            return LANE_BROWSER
+        log.detail(f"💡 {run.username}: 上次使用浏览器登录，浏览器插件不可用（{HiFiNiCheckin.browser.unavailable_reason}），改用HTTP登录")
+    
+    return LANE_HTTP
+
+
+def _switch_phase(run: AccountState, phase: str):
+    """更新日志上下文中的阶段，性能分析模式下同时切换分析器的阶段"""
+    set_phase(phase)
+    if run.context.profiler:
+        run.context.profiler.switch(phase)
+
+
+def _enter_phase(run: AccountState, phase: str, **fields):
+    """账号进入新阶段：写入运行日志，并切换日志/分析器的阶段"""
+    run.context.journal.record(run.account_id, phase, **fields)
+    _switch_phase(run, phase)
+
+
+def _with_log_context(handler):
+    """通道处理函数装饰器：处理期间日志自动带上账号、阶段和耗时"""
+    @functools.wraps(handler)
+    def wrapper(run: AccountState, *args) -> Optional[str]:
+        with log_context(run.username or "cookie", started=run.started_at):
+            return handler(run, *args)
+    return wrapper
+
+
+@_with_log_context
+def _lane_cookie(run: AccountState) -> Optional[str]:
+    """Cookie通道：用已保存的加密Cookie直接签到，Cookie失效则晋级到HTTP登录通道"""
+    run.lane = LANE_COOKIE
+    _switch_phase(run, run.lane)
+    checkin = run.get_client()
+    
+    # 🎯 优先Cookie策略：先尝试使用已保存的加密Cookie签到
+    if checkin.username and checkin.password:
+        log.info("🔍 检查是否存在加密Cookie...")
+        _enter_phase(run, "cookie_load")
+        # 密钥派生（PBKDF2）和解密期间在后台建立到站点的连接，签到请求直接复用
+        warmup = Warmup([("site", checkin.session, checkin.base_url)]).start()
+        load_started = time.perf_counter()
+        encrypted_cookie_dict = checkin._load_encrypted_cookie()
+        _report_warmup(run, warmup, time.perf_counter() - load_started)
         
-        except Exception as e:
-            print(f"❌ 发送Telegram通知出错: {str(e)}")
+        if not encrypted_cookie_dict:
+            log.info("📝 未找到加密Cookie，需要先登录获取Cookie")
+            return LANE_HTTP
+        
+        # 找到了加密Cookie，先尝试用它签到
+        log.info("✅ 找到加密Cookie，优先使用Cookie签到")
+        cookie_str = "; ".join([f"{key}={value}" for key, value in encrypted_cookie_dict.items()])
+        checkin.cookie = cookie_str
+        
+        # 更新session的cookie
+        for key, value in encrypted_cookie_dict.items():
+            checkin.session.cookies.set(key, value)
+        
+        checkin.login_method = "加密Cookie"
+        log.info(f"📦 已加载加密Cookie (长度: {len(cookie_str)})")
+        
+        # Cookie失效时不占用Cookie通道重新登录，交给登录通道处理
+        checkin.defer_relogin = True
+    
+    _enter_phase(run, "checkin", login_method=checkin.login_method)
+    result = checkin.checkin()
+    checkin.defer_relogin = False
+    
+    if result.get("need_login"):
+        run.relogin = True
+        return LANE_HTTP
+    
+    _finish_account(run, result)
+    return None
 
 
-def main():
+def _report_warmup(run: AccountState, warmup: Warmup, overlapped: float):
     """
-    主函数
+    等待连接预热完成，记录预热耗时和与本地计算重叠而节省的时间
+    :param overlapped: 与预热并行的本地计算（密钥派生、解密）耗时（秒）
     """
-    print("=" * 50)
-    print("HiFiNi 自动签到脚本")
-    print("=" * 50)
+    connect = warmup.join().get("site")
+    if connect is None:
+        return
+    REQUEST_DURATION.observe(connect, phase="warmup", shard=SHARD)
+    saved = min(connect, overlapped)
+    WARMUP_SAVED.inc(saved, shard=SHARD)
+    run.context.journal.record(run.account_id, "warmup", connect_ms=round(connect * 1000, 1),
+                               overlapped_ms=round(overlapped * 1000, 1), saved_ms=round(saved * 1000, 1))
+    log.detail(f"🔥 连接预热 {connect * 1000:.0f} ms，与密钥派生/解密 {overlapped * 1000:.0f} ms 并行，"
+               f"节省约 {saved * 1000:.0f} ms")
+
+
+@_with_log_context
+def _lane_http(run: AccountState) -> Optional[str]:
+    """HTTP登录通道：账号密码登录后签到，登录失败则晋级到浏览器通道"""
+    run.lane = LANE_HTTP
+    _switch_phase(run, run.lane)
+    checkin = run.get_client()
     
-    # 检查是否自动运行（定时任务）
-    is_auto_run = os.environ.get("IS_AUTO_RUN", "false").lower() in ["true", "1", "yes"]
+    log.info("🔐 开始账号密码登录...")
+    _enter_phase(run, "login")
+    login_result = checkin.login()
+    
+    if not login_result["success"]:
+        log.warning(f"⚠️  常规登录失败: {login_result['message']}")
+        
+        # 是否转入浏览器通道：记录决策，便于确认是否还需要在工作流中安装 Chrome
+        decision = _browser_fallback_decision(login_result)
+        BROWSER_FALLBACK.inc(decision=decision, shard=SHARD)
+        if decision == "used":
+            log.info("🔄 转入浏览器模拟登录通道...")
+            return LANE_BROWSER
+        
+        if decision == "not_applicable":
+            log.info("🚫 账号或密码被拒绝，不尝试浏览器登录")
+        else:
+            log.info(f"🚫 不尝试浏览器登录: {HiFiNiCheckin.browser.unavailable_reason}")
+        _finish_account(run, {"success": False, "message": f"登录失败: {login_result['message']}"})
+        return None
+    
+    if run.relogin:
+        log.info("🔄 重新登录成功，再次尝试签到...")
+    time.sleep(1)  # 等待1秒
+    
+    _checkin_after_login(run)
+    return None
+
+
+def _browser_fallback_decision(login_result: Dict[str, any]) -> str:
+    """
+    HTTP登录失败后是否使用浏览器登录
+    :return: used / not_applicable（账号密码被拒绝）/ disabled（已关闭）/ unavailable（未安装 selenium 或 Chrome）
+    """
+    if login_result.get("credentials_rejected"):
+        return "not_applicable"
+    if HiFiNiCheckin.browser.available:
+        return "used"
+    return "disabled" if HiFiNiCheckin.browser.mode == BROWSER_MODE_OFF else "unavailable"
+
+
+@_with_log_context
+def _lane_browser(run: AccountState) -> Optional[str]:
+    """浏览器通道：浏览器插件模拟登录后签到（插件可用时才会进入该通道）"""
+    run.lane = LANE_BROWSER
+    _switch_phase(run, run.lane)
+    checkin = run.get_client()
+    
+    log.info("🔄 尝试使用浏览器模拟登录...")
+    _enter_phase(run, "browser_login")
+    selenium_result = checkin.login_with_selenium()
+    
+    if not selenium_result["success"]:
+        log.error(f"❌ 浏览器登录也失败: {selenium_result['message']}")
+        _finish_account(run, {"success": False, "message": f"登录失败: {selenium_result['message']}"})
+        return None
     
-    # 如果是自动运行，添加随机延迟（1-180秒）
-    if is_auto_run:
+    time.sleep(1)  # 等待1秒
+    
+    _checkin_after_login(run)
+    return None
+
+
+def _checkin_after_login(run: AccountState):
+    """登录成功后签到；Cookie失效后重新登录的账号只重试一次，不再重复登录"""
+    checkin = run.client
+    _enter_phase(run, "checkin", login_method=checkin.login_method)
+    result = checkin.checkin(retry_on_failure=not run.relogin)
+    _finish_account(run, result)
+
+
+def _finish_account(run: AccountState, result: Dict[str, any]):
+    """输出账号签到结果、发送通知并写入运行日志"""
+    run.result = result
+    
+    # 输出结果
+    log.detail("=" * 50)
+    log.info(f"签到结果: {'✅ 成功' if result['success'] else '❌ 失败'}，{result['message']}")
+    log.detail("=" * 50)
+    
+    # 通知交给各渠道的后台发送队列，通道线程不等待发送（先释放并发名额，通知耗时不计入站点的拥塞判断）；
+    # 性能分析模式下账号顺序执行，直接发送，发送耗时计入 notify 阶段
+    release_slot()
+    context = run.context
+    if context.notifier and run.client:
+        _enter_phase(run, "notify")
+        quote = context.quotes.take() if context.quotes else None
+        notification = run.client.build_notification(result['message'], success=result['success'], quote=quote)
+        if context.profiler:
+            log.info(f"📱 正在发送通知（{'、'.join(context.notifier.names)}）...")
+            context.notifier.dispatch(notification)
+        else:
+            log.info(f"📱 通知已加入发送队列（{'、'.join(context.notifier.names)}）")
+            context.notifier.submit(notification)
+    
+    _journal_outcome(run)
+    _record_metrics(run)
+    _note_browser_hint(run)
+    if run.client is not None and run.client.sign_latency is not None:
+        run.context.schedule_samples.append((get_beijing_time(), run.client.sign_latency, run.client.captcha_seen))
+    run.release()
+
+
+def _note_browser_hint(run: AccountState):
+    """记录签到成功的账号是否需要浏览器登录（运行结束时写入提示文件，下次直接分到浏览器通道）"""
+    if not run.result["success"] or run.client is None:
+        return
+    context = run.context
+    if run.client.login_method == "浏览器模拟登录":
+        context.browser_added.add(run.account_id)
+    elif run.account_id in context.browser_accounts:
+        context.browser_cleared.add(run.account_id)
+
+
+def _journal_outcome(run: AccountState):
+    """把账号的最终结果写入运行日志和结果文件"""
+    if run.result.get("skipped"):
+        outcome = OUTCOME_SKIPPED
+    else:
+        outcome = OUTCOME_SUCCESS if run.result["success"] else OUTCOME_FAILED
+    run.context.journal.finish(run.account_id, outcome, run.result["message"])
+    _write_result(run, outcome)
+
+
+def _write_result(run: AccountState, outcome: str):
+    """账号结束时立即追加一行结果（结果文件未启用时只累加到本次汇总）"""
+    client = run.client
+    fields = {
+        "account": run.account_id,
+        "outcome": outcome,
+        "status": run.result.get("status", ""),
+        "message": run.result["message"],
+        "lane": run.lane or "",
+        "login_method": _AUTH_METHOD_LABELS.get(client.login_method, "") if client else "",
+        "duration_ms": round((time.perf_counter() - run.started_at) * 1000, 1) if run.started_at else None,
+        "sign_ms": round(client.sign_latency * 1000, 1) if client and client.sign_latency is not None else None,
+        "points": _to_points(client.points_gained) if client else None,
+        "total_coins": _to_points(client.current_total_coins) if client else None,
+        "captcha": bool(client and client.captcha_seen),
+    }
+    if run.context.results:
+        run.context.results.write(**fields)
+    else:
+        run.context.summary.add(fields)
+
+
+def _to_points(value: str) -> Optional[int]:
+    """页面解析到的金币数（字符串）转为整数，没有时返回 None"""
+    return int(value) if value and str(value).isdigit() else None
+
+
+# 登录方式（HiFiNiCheckin.login_method）到认证方式指标标签的映射
+_AUTH_METHOD_LABELS = {
+    "加密Cookie": "cookie",
+    "账号密码": "http_login",
+    "浏览器模拟登录": "browser_login",
+    "Cookie令牌": "cookie_token",
+}
+
+
+def _record_metrics(run: AccountState):
+    """记录账号的最终结果、认证方式和端到端耗时"""
+    if run.result["success"]:
+        outcome = run.result.get("status", "success")
+    else:
+        outcome = "failed"
+    OUTCOMES.inc(outcome=outcome, shard=SHARD)
+    
+    if run.client is not None:
+        method = _AUTH_METHOD_LABELS.get(run.client.login_method, "unknown")
+        AUTH_METHODS.inc(method=method, shard=SHARD)
+    
+    if run.started_at:
+        ACCOUNT_DURATION.observe(time.perf_counter() - run.started_at, lane=run.lane or "", shard=SHARD)
+
+
+def _take_congestion(run: AccountState) -> Optional[str]:
+    """取出账号在本次通道处理中遇到的拥塞信号（请求失败优先于人机验证），供 AIMD 并发控制使用"""
+    failures, captchas = run.failures, run.captchas
+    if run.client is not None:
+        failures += run.client.request_failures
+        captchas += run.client.captcha_count
+        run.client.request_failures = run.client.captcha_count = 0
+    run.failures = run.captchas = 0
+    if failures:
+        return SIGNAL_ERROR
+    return SIGNAL_CAPTCHA if captchas else None
+
+
+@_with_log_context
+def _on_account_error(run: AccountState, error: BaseException):
+    """通道处理函数异常时，记为该账号签到失败"""
+    message = f"签到流程发生错误: {str(error)}"
+    log.error(f"❌ {message}")
+    run.result = {"success": False, "message": message}
+    _journal_outcome(run)
+    _record_metrics(run)
+    run.release()
+
+
+def run_batch(accounts: List[AccountState], notifier: NotificationDispatcher = None,
+              force: bool = False, journal=NULL_JOURNAL,
+              lane_workers: Dict[str, int] = None, profiler: PhaseProfiler = None,
+              concurrency: Optional[tuple] = None, results: ResultsWriter = None) -> ResultSummary:
+    """
+    批量签到：先按本地状态给账号分类，再按通道并行执行
+    - cookie：已有加密Cookie，一次POST即可完成
+    - http：需要账号密码登录
+    - browser：需要浏览器模拟登录（最慢，单独的小线程池）
+    :param accounts: 账号列表
+    :param notifier: 通知渠道（为 None 时不发送通知）
+    :param force: 是否忽略本地记录强制签到
+    :param journal: 运行日志
+    :param lane_workers: 各通道线程数
+    :param profiler: 性能分析器（提供时所有账号在当前线程中顺序执行，便于按阶段分析）
+    :param concurrency: 每条通道 AIMD 并发控制的 (下限, 上限)，上限为 None 时取该通道的线程数；为 None 时不控制
+    :param results: 结果文件（每个账号结束时立即追加一行）
+    :return: 本次运行的增量汇总（不保留单个账号的结果）
+    """
+    lane_workers = lane_workers or DEFAULT_LANE_WORKERS
+    today = get_beijing_time().strftime('%Y-%m-%d')
+    browser_accounts = get_browser_login_accounts(get_app_dir(), today)
+    
+    quotes = QuoteCache(get_quotes_path(get_app_dir())) if notifier else None
+    context = BatchContext(journal, notifier, profiler, quotes, results)
+    context.browser_accounts = browser_accounts
+    jobs = []
+    for run in accounts:
+        run.reset(context)
+        journal.record(run.account_id, "start")
+        if profiler:
+            profiler.switch("classify")
+        with log_context(run.username or "cookie", phase="classify"):
+            lane = classify_account(run, force=force, browser_accounts=browser_accounts)
+        if lane is None:
+            _journal_outcome(run)
+            OUTCOMES.inc(outcome="skipped", shard=SHARD)
+            run.release()
+        else:
+            run.started_at = time.perf_counter()
+            jobs.append((lane, run))
+    
+    if jobs:
+        # Telegram / Webhook 的连接在签到期间后台预热，发送通知时直接复用；每日一言不足时后台补充
+        if notifier:
+            Warmup(notifier.warmup_targets()).start()
+            if quotes.refill_async():
+                log.detail(f"💬 每日一言缓存剩余 {quotes.unused} 条未使用，后台补充中")
+        
+        lane_counts = {lane: sum(1 for job_lane, _ in jobs if job_lane == lane) for lane in lane_workers}
+        log.info(f"🚦 账号分类: Cookie {lane_counts[LANE_COOKIE]} / HTTP登录 {lane_counts[LANE_HTTP]} / "
+              f"浏览器 {lane_counts[LANE_BROWSER]}")
+        
+        runner = BatchRunner({
+            LANE_COOKIE: (lane_workers[LANE_COOKIE], _lane_cookie),
+            LANE_HTTP: (lane_workers[LANE_HTTP], _lane_http),
+            LANE_BROWSER: (lane_workers[LANE_BROWSER], _lane_browser),
+        }, on_error=_on_account_error, inline=profiler is not None,
+            concurrency=concurrency, congestion=_take_congestion,
+            on_limit_change=lambda lane, limit: CONCURRENCY_LIMIT.set(limit, lane=lane, shard=SHARD))
+        runner.run(jobs)
+        if notifier:
+            notifier.flush()
+        for lane, controller in runner.controllers.items():
+            if controller.completed:
+                log.detail(f"🎚️  {lane} 通道并发上限: {controller.floor}-{controller.ceiling}，"
+                           f"本次在 {controller.lowest}-{controller.highest} 之间调整，最终 {controller.limit}")
+        
+        if not is_simulated_traffic():
+            record_samples(get_schedule_path(get_app_dir()), context.schedule_samples)
+            update_browser_hint(get_app_dir(), today, context.browser_added, context.browser_cleared)
+            if quotes:
+                quotes.save()
+    
+    if len(accounts) > 1:
+        log.info(f"📊 {context.summary.format()}")
+    return context.summary
+
+
+def _pending_accounts(accounts: List[AccountState], force: bool) -> List[AccountState]:
+    """今天尚未签到的账号（只读取本地签到记录）"""
+    if force:
+        return accounts
+    return [account for account in accounts if not has_checked_in_today(account.paths["record_file"])]
+
+
+def _wait_for_window(max_wait: Optional[timedelta] = None):
+    """
+    自适应调度：等待到当天历史耗时最低、人机验证最少的签到时段
+    :param max_wait: 最长等待时间（None 表示可以等到当天结束）
+    """
+    now = get_beijing_time()
+    history = load_history(get_schedule_path(get_app_dir()))
+    window = recommend_window(history, now, max_wait=max_wait)
+    start_at = window.pick_time(now)
+    delay_seconds = max(0, int((start_at - now).total_seconds()))
+    log.info(f"🗓️  自适应调度：选择时段 {slot_label(window.slot)}（{window.reason}）")
+    log.info(f"⏰ 预计开始时间: {start_at.strftime('%Y-%m-%d %H:%M:%S')}，等待 {delay_seconds} 秒")
+    time.sleep(delay_seconds)
+    log.info(f"✅ 等待结束，开始执行签到")
+    log.detail("-" * 50)
+
+
+def show_schedule_recommendation():
+    """输出各时段的历史统计和推荐的签到时段"""
+    now = get_beijing_time()
+    history = load_history(get_schedule_path(get_app_dir()))
+    report = format_report(history, now)
+    if len(report) == 1:
+        log.info("📭 暂无签到时段历史，运行几次签到后再查看推荐")
+        return
+    
+    log.info("📊 各时段签到统计（北京时间）：")
+    for line in report:
+        log.info(line)
+    
+    # 推荐时不限于当天剩余时间，从 0 点开始在全天中选择，且不做随机探索
+    midnight = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    window = recommend_window(history, midnight, explore_rate=0)
+    log.info(f"💡 推荐签到时段: {slot_label(window.slot)}（{window.reason}）")
+    log.info(f"   GitHub Actions 定时任务（UTC）: cron: '{to_utc_cron(window.slot)}'")
+
+
+def _delay_before_checkin(args: argparse.Namespace, is_auto_run: bool, pending_accounts: List[AccountState]):
+    """签到前的延迟：自动运行时随机延迟或自适应等待，手动运行立即开始"""
+    if is_auto_run and pending_accounts and args.schedule == "adaptive":
+        # 自适应调度：等待到历史表现最好的时段（受 --max-wait 限制）
+        _wait_for_window(timedelta(minutes=args.max_wait))
+    elif is_auto_run and pending_accounts:
+        # 如果是自动运行，添加随机延迟（1-180秒）
         delay_seconds = random.randint(1, 180)
-        print(f"🕒 自动运行模式，随机延迟 {delay_seconds} 秒后开始签到...")
+        log.info(f"🕒 自动运行模式，随机延迟 {delay_seconds} 秒后开始签到...")
         beijing_time = get_beijing_time()
-        print(f"⏰ 预计开始时间: {(beijing_time + timedelta(seconds=delay_seconds)).strftime('%Y-%m-%d %H:%M:%S')}")
+        log.info(f"⏰ 预计开始时间: {(beijing_time + timedelta(seconds=delay_seconds)).strftime('%Y-%m-%d %H:%M:%S')}")
         time.sleep(delay_seconds)
-        print(f"✅ 延迟结束，开始执行签到")
-        print("-" * 50)
+        log.info(f"✅ 延迟结束，开始执行签到")
+        log.detail("-" * 50)
+    elif is_auto_run:
+        log.info("⏭️  所有账号今日均已签到，跳过随机延迟")
+        log.detail("-" * 50)
     else:
-        print("🖐️  手动运行模式，立即开始签到")
-        print("-" * 50)
+        log.info("🖐️  手动运行模式，立即开始签到")
+        log.detail("-" * 50)
+
+
+def run_checkin(args: argparse.Namespace, accounts: List[AccountState], notifier: Optional[NotificationDispatcher],
+                is_auto_run: bool, profiler: PhaseProfiler = None, wait: bool = True) -> bool:
+    """
+    执行当天的签到：断点续签、随机延迟（或自适应等待）、批量签到
+    :param wait: 是否在签到前延迟（常驻模式已经自行等待到签到时段）
+    :return: 是否所有账号都成功
+    """
+    # 断点续签：跳过今天运行日志中已成功完成的账号
+    journal_path = get_journal_path(get_app_dir(), get_beijing_time().strftime('%Y-%m-%d'))
+    if args.resume:
+        finished = get_finished_accounts(journal_path)
+        accounts = [account for account in accounts if account.account_id not in finished]
+        log.info(f"♻️  断点续签：运行日志中已完成 {len(finished)} 个账号，剩余 {len(accounts)} 个账号")
+    
+    # 所有账号今天都已签到时，连随机延迟也不需要
+    pending_accounts = _pending_accounts(accounts, args.force)
+    
+    if wait:
+        _delay_before_checkin(args, is_auto_run, pending_accounts)
+    
+    with RunJournal(journal_path) as journal:
+        results = ResultsWriter(args.results, run_id=journal.run_id) if args.results else None
+        try:
+            summary = run_batch(accounts, notifier, force=args.force, journal=journal,
+                                lane_workers=parse_lane_workers(args.lanes), profiler=profiler,
+                                concurrency=parse_concurrency(args.concurrency), results=results)
+        finally:
+            if results:
+                results.close()
+    # 每个账号都已计入汇总且没有失败
+    return summary.total == len(accounts) and summary.count(OUTCOME_FAILED) == 0
+
+
+def run_daemon(args: argparse.Namespace, accounts: List[AccountState], notifier: Optional[NotificationDispatcher]):
+    """
+    常驻模式：每个北京日在自适应选择的时段签到一次，然后休眠到第二天
+    """
+    log.info("🛰️  常驻模式：每天自动选择签到时段")
+    last_run_day = None
+    while True:
+        now = get_beijing_time()
+        today = now.strftime('%Y-%m-%d')
+        if last_run_day == today or not _pending_accounts(accounts, args.force):
+            wake_at = next_midnight(now) + timedelta(seconds=random.randint(1, 60))
+            log.info(f"💤 今日签到已完成，下次检查时间: {wake_at.strftime('%Y-%m-%d %H:%M:%S')}")
+            time.sleep(max(1, (wake_at - now).total_seconds()))
+            continue
+        
+        _wait_for_window()
+        try:
+            run_checkin(args, accounts, notifier, is_auto_run=True, wait=False)
+        except Exception as e:
+            log.error(f"❌ 签到流程发生错误: {str(e)}")
+        last_run_day = today
+
+
+def find_record_stores() -> List[tuple]:
+    """
+    本地所有账号的签到记录：主账号在程序目录，其他账号在 accounts/<账号哈希>/ 下
+    :return: [(账号名称, 账号哈希, RecordStore)]，未配置的账号以哈希作为名称
+    """
+    configured = {account.account_id: account for account in load_accounts()}
+    primary = next((account for account in configured.values() if account.primary), None)
+    stores = [(
+        (primary.username or "Cookie账号") if primary else "主账号",
+        primary.account_id if primary else "",
+        RecordStore(get_account_paths(primary=True)["record_file"]),
+    )]
+    
+    accounts_dir = os.path.join(get_app_dir(), "accounts")
+    if os.path.isdir(accounts_dir):
+        for account_id in sorted(os.listdir(accounts_dir)):
+            account = configured.get(account_id)
+            if account is not None and account.primary:
+                continue
+            record_file = os.path.join(accounts_dir, account_id, "hifini_checkin_record.json")
+            stores.append((account.username if account else account_id, account_id, RecordStore(record_file)))
+    return stores
+
+
+def show_stats(args: argparse.Namespace):
+    """stats 子命令：载入各账号的签到日历并输出统计"""
+    today = get_beijing_time().date()
+    stores = find_record_stores()
+    if args.account:
+        stores = [entry for entry in stores if args.account in (entry[0], entry[1])]
+        if not stores:
+            log.error(f"❌ 未找到账号 {args.account} 的签到记录")
+            sys.exit(1)
+    
+    # 各账号互不相关，并行读取分片文件
+    with ThreadPoolExecutor(max_workers=min(8, len(stores))) as executor:
+        calendars = list(executor.map(lambda entry: CheckinCalendar.from_store(entry[2], today), stores))
+    
+    results = {label: summarize_calendar(calendar, today) for (label, _, _), calendar in zip(stores, calendars)}
+    if args.json:
+        sys.stdout.write(json.dumps(results, ensure_ascii=False, indent=2) + "\n")
+        return
+    for label, stats in results.items():
+        for line in format_stats(label, stats):
+            log.info(line)
+
+
+def show_results(args: argparse.Namespace):
+    """results 子命令：逐行汇总结果文件（签到仍在运行时得到已完成账号的部分结果）"""
+    if not os.path.exists(args.file):
+        log.error(f"❌ 结果文件不存在: {args.file}")
+        sys.exit(1)
+    run = None if args.all else last_run_id(args.file)
+    summary = ResultSummary.from_rows(read_results(args.file), run=run)
+    if args.json:
+        sys.stdout.write(json.dumps({"run": run, **summary.as_dict()}, ensure_ascii=False, indent=2) + "\n")
+        return
+    for line in format_summary_lines(summary):
+        log.info(line)
+
+
+def repair_records(args: argparse.Namespace):
+    """repair 子命令：拆分尚未迁移的旧版签到记录，并根据月度分片重新生成各账号的汇总文件"""
+    for label, _, store in find_record_stores():
+        if not store.months():
+            continue
+        migrated = store.migrate()
+        summary = store.rebuild_summary()
+        log.info(f"🔧 {label}: {'已拆分旧版记录，' if migrated else ''}"
+                 f"汇总已重新生成（{summary['total']} 天，{summary['total_points']} 金币）")
+
+
+def run_status_server(args: argparse.Namespace):
+    """status 子命令：在前台提供只读状态接口，直到按 Ctrl+C"""
+    server = serve_status(args.port, find_record_stores, host=args.host)
+    log.info(f"📋 状态接口: http://{args.host}:{args.port}/status（单个账号: /status/<账号名称或哈希>）")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.service.detach()
+        server.shutdown()
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """解析命令行参数"""
+    parser = argparse.ArgumentParser(description="HiFiNi 自动签到脚本")
+    parser.add_argument("--force", action="store_true",
+                        default=os.environ.get("HIFINI_FORCE_CHECKIN", "false").lower() in ["true", "1", "yes"],
+                        help="忽略本地签到记录，强制重新签到（也可设置 HIFINI_FORCE_CHECKIN=true）")
+    parser.add_argument("--resume", action="store_true",
+                        help="断点续签：回放今天的运行日志，只处理尚未成功完成的账号")
+    parser.add_argument("--schedule", default=os.environ.get("HIFINI_SCHEDULE") or "fixed",
+                        choices=["fixed", "adaptive"],
+                        help="自动运行时的签到时机：fixed 随机延迟 1-180 秒，adaptive 等待到历史耗时最低、"
+                             "人机验证最少的时段（也可设置 HIFINI_SCHEDULE）")
+    parser.add_argument("--max-wait", type=int, default=int(os.environ.get("HIFINI_MAX_WAIT") or 300),
+                        help="adaptive 调度最长等待的分钟数，默认 300（也可设置 HIFINI_MAX_WAIT）")
+    parser.add_argument("--recommend", action="store_true",
+                        help="只输出各时段的签到耗时/人机验证统计和推荐的签到时段，不执行签到")
+    parser.add_argument("--daemon", action="store_true",
+                        help="常驻模式：每天在自动选择的时段签到一次")
+    parser.add_argument("--browser-login", default=get_browser_mode(), choices=BROWSER_MODES,
+                        help="HTTP登录失败时的浏览器模拟登录：auto 仅在已安装 selenium 和 Chrome 时使用，"
+                             "on 总是尝试，off 关闭（也可设置 HIFINI_BROWSER_LOGIN）")
+    parser.add_argument("--lanes", default=os.environ.get("HIFINI_LANE_WORKERS", ""),
+                        help="各执行通道的线程数，例如 cookie=8,http=4,browser=1（也可设置 HIFINI_LANE_WORKERS）")
+    parser.add_argument("--concurrency", default=os.environ.get("HIFINI_CONCURRENCY") or "auto",
+                        help="各通道同时处理的账号数由 AIMD 根据耗时、请求失败和人机验证分别调整：auto 为 1 到该通道的线程数，"
+                             "2-12 指定下限和上限（不超过通道线程数），off 关闭（只按通道线程数执行；"
+                             "也可设置 HIFINI_CONCURRENCY）")
+    parser.add_argument("--log-level", default=os.environ.get("HIFINI_LOG_LEVEL", "DETAIL"),
+                        choices=["DEBUG", "DETAIL", "INFO", "WARNING", "ERROR"], type=str.upper,
+                        help="日志级别，INFO 会去掉分隔线和提示语（也可设置 HIFINI_LOG_LEVEL）")
+    parser.add_argument("--log-format", default=os.environ.get("HIFINI_LOG_FORMAT", "text"),
+                        choices=["text", "json"],
+                        help="日志格式：text 为纯文本，json 为带账号/阶段/耗时字段的 JSON Lines（也可设置 HIFINI_LOG_FORMAT）")
+    parser.add_argument("--profile", metavar="DIR", default=os.environ.get("HIFINI_PROFILE_DIR"),
+                        help="性能分析模式：按阶段收集 cProfile 和 tracemalloc 数据并写入该目录，"
+                             "账号改为顺序执行（也可设置 HIFINI_PROFILE_DIR）")
+    parser.add_argument("--cassette", metavar="FILE", default=os.environ.get("HIFINI_CASSETTE"),
+                        help="HTTP 录制带文件：配合 --cassette-mode 录制真实交互或离线回放（也可设置 HIFINI_CASSETTE）")
+    parser.add_argument("--cassette-mode", default=os.environ.get("HIFINI_CASSETTE_MODE", MODE_REPLAY),
+                        choices=[MODE_RECORD, MODE_REPLAY],
+                        help="record 访问站点并录制（脱敏），replay 只从录制带返回响应（也可设置 HIFINI_CASSETTE_MODE）")
+    parser.add_argument("--replay-latency", type=float, default=float(os.environ.get("HIFINI_REPLAY_LATENCY") or 0),
+                        help="回放延迟系数：0 不等待，1 按录制时的耗时，2 为两倍（也可设置 HIFINI_REPLAY_LATENCY）")
+    parser.add_argument("--metrics-port", type=int, default=int(os.environ.get("HIFINI_METRICS_PORT") or 0),
+                        help="在本机该端口提供 OpenMetrics 指标（/metrics，也可设置 HIFINI_METRICS_PORT）")
+    parser.add_argument("--status-port", type=int, default=int(os.environ.get("HIFINI_STATUS_PORT") or 0),
+                        help="运行期间在本机该端口提供只读状态接口（/status，也可设置 HIFINI_STATUS_PORT），"
+                             "常驻模式下一直可用")
+    parser.add_argument("--results", metavar="FILE", default=os.environ.get("HIFINI_RESULTS"),
+                        help="每个账号结束时把结果（状态、耗时、金币、登录方式）追加写入该文件，"
+                             ".csv 为 CSV，其余为 JSON Lines（也可设置 HIFINI_RESULTS）")
+    parser.add_argument("--metrics-file", default=os.environ.get("HIFINI_METRICS_FILE"),
+                        help="运行结束时把指标写入该文件（textfile 格式，也可设置 HIFINI_METRICS_FILE）")
+    
+    subcommands = parser.add_subparsers(dest="command", metavar="命令")
+    stats_parser = subcommands.add_parser("stats", help="输出连续签到、漏签、按星期/年份汇总等统计，不执行签到")
+    stats_parser.add_argument("--account", help="只统计该账号（账号名或账号哈希）")
+    stats_parser.add_argument("--json", action="store_true", help="以 JSON 格式输出")
+    status_parser = subcommands.add_parser("status", help="启动本地只读状态接口（/status、/status/<账号>），不执行签到")
+    status_parser.add_argument("--port", type=int, default=int(os.environ.get("HIFINI_STATUS_PORT") or 8765),
+                               help="监听端口，默认 8765（也可设置 HIFINI_STATUS_PORT）")
+    status_parser.add_argument("--host", default="127.0.0.1", help="监听地址，默认只监听本机")
+    subcommands.add_parser("repair", help="拆分旧版签到记录，并根据 records/ 月度分片重新生成汇总文件，不执行签到")
+    results_parser = subcommands.add_parser("results", help="汇总 --results 写入的结果文件（运行中也可以查看），不执行签到")
+    results_parser.add_argument("file", help="结果文件（.jsonl 或 .csv）")
+    results_parser.add_argument("--all", action="store_true", help="汇总文件中的所有运行（默认只汇总最后一次）")
+    results_parser.add_argument("--json", action="store_true", help="以 JSON 格式输出")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None):
+    """
+    主函数
+    """
+    args = parse_args(argv)
+    setup_logging(args.log_level, args.log_format)
+    
+    if args.command == "stats":
+        show_stats(args)
+        return
+    if args.command == "status":
+        run_status_server(args)
+        return
+    if args.command == "results":
+        show_results(args)
+        return
+    if args.command == "repair":
+        repair_records(args)
+        return
+    
+    log.detail("=" * 50)
+    log.detail("HiFiNi 自动签到脚本")
+    log.detail("=" * 50)
+    
+    if args.recommend:
+        show_schedule_recommendation()
+        return
+    
+    # 只输出推荐时段时不签到，也就不需要性能分析
+    profiler = PhaseProfiler(args.profile) if args.profile else None
+    if profiler:
+        profiler.start("startup")
+    
+    # 检查是否自动运行（定时任务）
+    is_auto_run = os.environ.get("IS_AUTO_RUN", "false").lower() in ["true", "1", "yes"]
     
     # 从环境变量获取配置（支持账号密码或Cookie）
-    username = os.environ.get("HIFINI_USERNAME")
-    password = os.environ.get("HIFINI_PASSWORD")
-    cookie = os.environ.get("HIFINI_COOKIE")
+    accounts = load_accounts()
     
-    # 获取Telegram配置
-    tg_bot_token = os.environ.get("TG_BOT_TOKEN")
-    tg_chat_id = os.environ.get("TG_CHAT_ID")
+    # 通知渠道（Telegram / Webhook / SMTP）
+    notifiers = load_notifiers()
+    notifier = NotificationDispatcher(notifiers) if notifiers else None
     
     # 检查配置
-    if not username and not cookie:
-        print("❌ 错误: 未设置登录配置")
-        print("\n请选择以下方式之一进行配置：")
-        print("\n方式一（推荐）：使用账号密码登录")
-        print("  在 GitHub Secrets 中添加：")
-        print("  - HIFINI_USERNAME: 你的账号（邮箱/手机号/用户名）")
-        print("  - HIFINI_PASSWORD: 你的密码")
-        print("\n方式二：使用 Cookie")
-        print("  在 GitHub Secrets 中添加：")
-        print("  - HIFINI_COOKIE: 你的 Cookie")
-        print("\n可选：Telegram通知")
-        print("  - TG_BOT_TOKEN: Telegram Bot Token")
-        print("  - TG_CHAT_ID: Telegram Chat ID")
+    if not accounts:
+        if os.environ.get("HIFINI_USERNAME"):
+            log.error("❌ 错误: 提供了用户名但未提供密码")
+            sys.exit(1)
+        log.error("❌ 错误: 未设置登录配置")
+        log.info("请选择以下方式之一进行配置：")
+        log.info("方式一（推荐）：使用账号密码登录")
+        log.info("  在 GitHub Secrets 中添加：")
+        log.info("  - HIFINI_USERNAME: 你的账号（邮箱/手机号/用户名）")
+        log.info("  - HIFINI_PASSWORD: 你的密码")
+        log.info("方式二：使用 Cookie")
+        log.info("  在 GitHub Secrets 中添加：")
+        log.info("  - HIFINI_COOKIE: 你的 Cookie")
+        log.info("可选：多账号")
+        log.info("  - HIFINI_ACCOUNTS: 每行一个 账号:密码")
+        log.info("可选：Telegram通知")
+        log.info("  - TG_BOT_TOKEN: Telegram Bot Token")
+        log.info("  - TG_CHAT_ID: Telegram Chat ID")
+        log.info("可选：Webhook / 邮件通知")
+        log.info("  - HIFINI_WEBHOOK_URL: 接收 JSON 的地址")
+        log.info("  - HIFINI_SMTP_HOST / HIFINI_SMTP_USER / HIFINI_SMTP_PASSWORD / HIFINI_SMTP_TO: 邮件通知")
         sys.exit(1)
     
-    # 创建签到实例
-    if username and password:
-        print(f"📝 账号配置: {username}")
-        checkin = HiFiNiCheckin(username=username, password=password)
-        
-        # 🎯 优先Cookie策略：先尝试使用已保存的加密Cookie签到
-        cookie_loaded = False
-        if AES_AVAILABLE:
-            print("\n🔍 检查是否存在加密Cookie...")
-            encrypted_cookie_dict = checkin._load_encrypted_cookie()
-            
-            if encrypted_cookie_dict:
-                # 找到了加密Cookie，先尝试用它签到
-                print("✅ 找到加密Cookie，优先使用Cookie签到")
-                cookie_str = "; ".join([f"{key}={value}" for key, value in encrypted_cookie_dict.items()])
-                checkin.cookie = cookie_str
-                
-                # 更新session的cookie
-                for key, value in encrypted_cookie_dict.items():
-                    checkin.session.cookies.set(key, value)
-                
-                checkin.login_method = "加密Cookie"
-                print(f"📦 已加载加密Cookie (长度: {len(cookie_str)})")
-                cookie_loaded = True
-            else:
-                print("📝 未找到加密Cookie，需要先登录获取Cookie")
-        else:
-            print("⚠️  pycryptodome未安装，无法使用加密Cookie功能")
-            print("💡 提示: 运行 pip install pycryptodome 启用Cookie加密")
-        
-        # 如果没有加载到Cookie，先执行一次登录
-        if not cookie_loaded:
-            print("🔐 开始账号密码登录...")
-            login_result = checkin.login()
-            
-            if not login_result["success"]:
-                print(f"⚠️  常规登录失败: {login_result['message']}")
-                
-                # 如果 requests 登录失败，尝试使用 Selenium
-                if SELENIUM_AVAILABLE:
-                    print("🔄 尝试使用浏览器模拟登录...")
-                    selenium_result = checkin.login_with_selenium()
-                    
-                    if not selenium_result["success"]:
-                        print(f"❌ 浏览器登录也失败: {selenium_result['message']}")
-                        sys.exit(1)
-                else:
-                    print("💡 提示: 安装 selenium 可以使用浏览器模拟登录作为备选方案")
-                    print("   运行: pip install selenium")
-                    sys.exit(1)
-            
-            time.sleep(1)  # 等待1秒
-        
-        # 注意：如果Cookie加载成功，直接进入签到流程
-        # checkin()方法内部会处理Cookie失效的情况（自动重新登录）
-    elif cookie:
-        print(f"📝 使用 Cookie 登录")
-        print(f"🍪 Cookie 长度: {len(cookie)}")
-        checkin = HiFiNiCheckin(cookie=cookie)
-        checkin.login_method = "Cookie令牌"
-    else:
-        print("❌ 错误: 提供了用户名但未提供密码")
+    try:
+        HiFiNiCheckin.cassette = open_cassette(args.cassette, args.cassette_mode, args.replay_latency)
+    except FileNotFoundError as e:
+        log.error(f"❌ {e}")
         sys.exit(1)
+    if HiFiNiCheckin.cassette:
+        log.info(f"📼 HTTP {'录制' if args.cassette_mode == MODE_RECORD else '回放'}模式: {args.cassette}")
     
-    # 执行签到
-    result = checkin.checkin()
+    HiFiNiCheckin.browser = BrowserLogin(args.browser_login)
+    if any(account.password for account in accounts):
+        if HiFiNiCheckin.browser.available:
+            log.detail("🌐 浏览器登录插件可用（仅在HTTP登录失败时使用）")
+        else:
+            log.detail(f"🌐 浏览器登录插件未启用: {HiFiNiCheckin.browser.unavailable_reason}")
     
-    # 输出结果
-    print("\n" + "=" * 50)
-    print("签到结果:")
-    print(f"状态: {'✅ 成功' if result['success'] else '❌ 失败'}")
-    print(f"信息: {result['message']}")
-    print("=" * 50)
+    metrics_server = serve_metrics(args.metrics_port) if args.metrics_port else None
+    if metrics_server:
+        log.info(f"📈 指标端点: http://127.0.0.1:{args.metrics_port}/metrics")
+    status_server = serve_status(args.status_port, find_record_stores) if args.status_port else None
+    if status_server:
+        log.info(f"📋 状态接口: http://127.0.0.1:{args.status_port}/status")
     
-    # 发送Telegram通知
-    if tg_bot_token and tg_chat_id:
-        print("\n📱 正在发送Telegram通知...")
-        checkin.send_telegram_notification(tg_bot_token, tg_chat_id, result['message'])
+    all_success = True
+    try:
+        if args.daemon:
+            run_daemon(args, accounts, notifier)
+        else:
+            all_success = run_checkin(args, accounts, notifier, is_auto_run, profiler=profiler)
+    finally:
+        if profiler:
+            log.info(f"🔬 性能分析报告已写入: {profiler.stop()}")
+        if HiFiNiCheckin.cassette:
+            HiFiNiCheckin.cassette.save()
+        write_textfile(args.metrics_file)
+        if metrics_server:
+            metrics_server.shutdown()
+        if status_server:
+            status_server.service.detach()
+            status_server.shutdown()
     
     # 如果失败，退出码为1
-    if not result["success"]:
+    if not all_success:
         sys.exit(1)
 
 
 if __name__ == "__main__":
     main()
-
@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+HiFiNi 批量签到运行日志（journal）
+以追加方式记录每个账号的阶段变化和最终结果，进程中途退出后可据此断点续签
+"""
+
+import os
+import json
+import time
+import uuid
+import threading
+from typing import Dict, List
+
+# 账号的最终状态
+OUTCOME_SUCCESS = "success"
+OUTCOME_FAILED = "failed"
+OUTCOME_SKIPPED = "skipped"
+
+# 表示账号流程已结束的阶段
+PHASE_DONE = "done"
+
+class RunJournal:
+    """
+    追加写入的运行日志（JSON Lines）
+
+    record() 只把一行放进内存缓冲区并唤醒后台线程，不在调用线程上做文件I/O；
+    后台线程把积攒的多行一次写入并只 fsync 一次（批量 fsync），
+    因此签到线程的开销只有一次加锁和一次 list.append。
+    """
+
+    def __init__(self, path: str, flush_interval: float = 0.2, run_id: str = None):
+        """
+        :param path: 日志文件路径
+        :param flush_interval: 后台刷盘的最长间隔（秒）
+        :param run_id: 本次运行标识（默认随机生成）
+        """
+        self.path = path
+        self.flush_interval = flush_interval
+        self.run_id = run_id or uuid.uuid4().hex[:8]
+
+        self._buffer: List[str] = []
+        self._cond = threading.Condition()
+        self._closed = False
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._file = open(path, 'a', encoding='utf-8')
+        # 上次运行被杀时最后一行可能没有换行符，补上换行避免和新记录粘在一起
+        if self._file.tell() > 0:
+            with open(path, 'rb') as f:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b"\n":
+                    self._file.write("\n")
+        self._thread = threading.Thread(target=self._flush_loop, name="hifini-journal", daemon=True)
+        self._thread.start()
+
+    def record(self, account_id: str, phase: str, **fields):
+        """
+        记录账号进入某个阶段
+        :param account_id: 账号标识
+        :param phase: 阶段名称（如 login / checkin / done）
+        :param fields: 附加字段（如 outcome / message）
+        """
+        entry = {"ts": round(time.time(), 3), "run": self.run_id, "account": account_id, "phase": phase}
+        entry.update(fields)
+        line = json.dumps(entry, ensure_ascii=False)
+        with self._cond:
+            if self._closed:
+                return
+            self._buffer.append(line)
+            self._cond.notify()
+
+    def finish(self, account_id: str, outcome: str, message: str = ""):
+        """
+        记录账号的最终结果
+        :param account_id: 账号标识
+        :param outcome: success / failed / skipped
+        :param message: 结果信息
+        """
+        self.record(account_id, PHASE_DONE, outcome=outcome, message=message)
+
+    def _flush_loop(self):
+        """后台线程：等待缓冲区有数据或超时，然后批量写入并 fsync"""
+        while True:
+            with self._cond:
+                if not self._buffer and not self._closed:
+                    self._cond.wait(self.flush_interval)
+                lines = self._buffer
+                self._buffer = []
+                closed = self._closed
+
+            if lines:
+                self._file.write("\n".join(lines) + "\n")
+                self._file.flush()
+                os.fsync(self._file.fileno())
+
+            if closed:
+                return
+
+    def close(self):
+        """写入剩余缓冲并关闭文件"""
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify()
+        self._thread.join()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def replay_journal(path: str) -> Dict[str, Dict[str, any]]:
+    """
+    回放运行日志，得到每个账号最后一条记录
+    进程被杀时最后一行可能写了一半，解析失败的行直接忽略
+    :param path: 日志文件路径
+    :return: {account_id: 最后一条记录}
+    """
+    states = {}
+    if not os.path.exists(path):
+        return states
+
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            account_id = entry.get("account")
+            if account_id:
+                states[account_id] = entry
+    return states
+
+
+def get_finished_accounts(path: str) -> Dict[str, Dict[str, any]]:
+    """
+    获取日志中已成功结束的账号（断点续签时跳过这些账号）
+    失败或中途中断的账号不算完成，续签时会重新调度
+    :param path: 日志文件路径
+    :return: {account_id: 最终记录}
+    """
+    return {
+        account_id: entry
+        for account_id, entry in replay_journal(path).items()
+        if entry.get("phase") == PHASE_DONE and entry.get("outcome") in (OUTCOME_SUCCESS, OUTCOME_SKIPPED)
+    }
+
+
+def get_journal_path(base_dir: str, date_str: str) -> str:
+    """
+    获取某一天（北京时间）的运行日志路径
+    :param base_dir: 程序目录
+    :param date_str: 日期（YYYY-MM-DD）
+    """
+    return os.path.join(base_dir, ".hifini_journal", f"run-{date_str}.jsonl")
+
+
+class _NullJournal:
+    """未启用日志时的空实现，避免调用方到处判断"""
+
+    run_id = None
+
+    def record(self, account_id: str, phase: str, **fields):
+        pass
+
+    def finish(self, account_id: str, outcome: str, message: str = ""):
+        pass
+
+    def close(self):
+        pass
+
+
+NULL_JOURNAL = _NullJournal()
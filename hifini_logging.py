@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+HiFiNi 签到结构化日志
+日志在工作线程中只放入队列，由后台线程统一写到标准输出；
+支持纯文本（与原来的 print 输出一致）和 JSON Lines 两种格式
+"""
+
+import sys
+import json
+import time
+import atexit
+import logging
+import logging.handlers
+import queue
+import contextvars
+from contextlib import contextmanager
+from typing import Optional
+
+LOGGER_NAME = "hifini"
+
+# 介于 DEBUG 和 INFO 之间的级别：装饰性分隔线、提示语等，生产环境可设为 INFO 直接丢弃
+DETAIL = 15
+logging.addLevelName(DETAIL, "DETAIL")
+
+# 当前线程正在处理的账号和阶段（线程池复用线程，因此进入/退出时要显式设置和还原）
+_context: contextvars.ContextVar = contextvars.ContextVar("hifini_log_context", default=None)
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+class HiFiNiLogger(logging.Logger):
+    """增加 detail() 方法的 Logger"""
+
+    def detail(self, msg, *args, **kwargs):
+        if self.isEnabledFor(DETAIL):
+            self._log(DETAIL, msg, args, **kwargs)
+
+
+def get_logger() -> HiFiNiLogger:
+    """获取签到日志器"""
+    logging_class = logging.getLoggerClass()
+    logging.setLoggerClass(HiFiNiLogger)
+    try:
+        return logging.getLogger(LOGGER_NAME)
+    finally:
+        logging.setLoggerClass(logging_class)
+
+
+class _ContextFilter(logging.Filter):
+    """在产生日志的线程上把账号、阶段和耗时写进日志记录（放入队列之前）"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        context = _context.get()
+        if context:
+            record.account = context["account"]
+            record.phase = context["phase"]
+            record.elapsed = round(time.perf_counter() - context["started"], 3)
+        else:
+            record.account = None
+            record.phase = None
+            record.elapsed = None
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """JSON Lines 格式：每条日志一行"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": round(record.created, 3),
+            "level": record.levelname.lower(),
+            "account": getattr(record, "account", None),
+            "phase": getattr(record, "phase", None),
+            "elapsed": getattr(record, "elapsed", None),
+            "msg": record.getMessage().strip(),
+        }
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False)
+
+
+class TextFormatter(logging.Formatter):
+    """纯文本格式：账号上下文中的日志加上 [账号] 前缀，批量签到时多个账号交错的输出也能区分"""
+
+    def __init__(self):
+        super().__init__("[%(account)s] %(message)s")
+        self._plain = logging.Formatter("%(message)s")
+
+    def format(self, record: logging.LogRecord) -> str:
+        if not getattr(record, "account", None):
+            return self._plain.format(record)
+        # 以换行开头的提示（原来 print 的空行）保留空行，前缀放在正文前
+        text = super().format(record)
+        prefix = f"[{record.account}] "
+        body = text[len(prefix):]
+        stripped = body.lstrip("\n")
+        return body[:len(body) - len(stripped)] + prefix + stripped
+
+
+@contextmanager
+def log_context(account: Optional[str], phase: str = None, started: float = None):
+    """
+    在当前线程上设置日志的账号上下文
+    :param account: 账号
+    :param phase: 初始阶段
+    :param started: 账号开始处理的时间（time.perf_counter），用于计算 elapsed
+    """
+    token = _context.set({
+        "account": account,
+        "phase": phase,
+        "started": started or time.perf_counter(),
+    })
+    try:
+        yield
+    finally:
+        _context.reset(token)
+
+
+def set_phase(phase: str):
+    """更新当前线程日志上下文中的阶段"""
+    context = _context.get()
+    if context:
+        context["phase"] = phase
+
+
+def setup_logging(level: str = "DETAIL", fmt: str = "text", stream=None):
+    """
+    配置日志：工作线程只把记录放进队列，后台 QueueListener 线程负责格式化和写出
+    :param level: 日志级别（DEBUG / DETAIL / INFO / WARNING / ERROR）
+    :param fmt: text（纯文本，账号处理期间的日志带 [账号] 前缀）或 json（JSON Lines）
+    :param stream: 输出流（默认标准输出）
+    """
+    global _listener
+    shutdown_logging()
+
+    handler = logging.StreamHandler(stream or sys.stdout)
+    handler.setFormatter(JsonFormatter() if fmt == "json" else TextFormatter())
+
+    log_queue = queue.SimpleQueue()
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+    queue_handler.addFilter(_ContextFilter())
+
+    logger = get_logger()
+    logger.handlers[:] = [queue_handler]
+    logger.setLevel(logging.getLevelName(level.upper()) if isinstance(level, str) else level)
+    logger.propagate = False
+
+    _listener = logging.handlers.QueueListener(log_queue, handler)
+    _listener.start()
+
+
+def shutdown_logging():
+    """停止后台日志线程并写出队列中剩余的日志"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+atexit.register(shutdown_logging)
@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+HiFiNi 签到指标（OpenMetrics 文本格式）
+提供计数器、直方图和仪表盘，可通过本地HTTP端点抓取，或写入 textfile 供 node_exporter 收集
+"""
+
+import os
+import bisect
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from hifini_storage import atomic_write_text
+
+CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+
+# 单次HTTP请求耗时的桶（秒）
+REQUEST_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+# 单个账号端到端耗时的桶（秒）
+ACCOUNT_BUCKETS = (0.5, 1.0, 2.0, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+
+
+def _escape(value: str) -> str:
+    """转义标签值"""
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: Tuple[str, str] = None) -> str:
+    """格式化标签 {a="1",b="2"}"""
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(f'{extra[0]}="{extra[1]}"')
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    """格式化数值（整数不带小数点）"""
+    if value == int(value):
+        return str(int(value))
+    return repr(value)
+
+
+class _Metric:
+    """指标基类：按标签值保存序列"""
+    metric_type = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._series: Dict[Tuple[str, ...], object] = {}
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def expose(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """单调递增计数器"""
+    metric_type = "counter"
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._series[key] = self._series.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        with self._lock:
+            return self._series.get(self._key(labels), 0)
+
+    def expose(self) -> List[str]:
+        with self._lock:
+            series = sorted(self._series.items())
+        return [f"{self.name}_total{_format_labels(self.labelnames, key)} {_format_value(value)}"
+                for key, value in series]
+
+
+class Gauge(_Metric):
+    """可增可减的当前值"""
+    metric_type = "gauge"
+
+    def set(self, value: float, **labels):
+        with self._lock:
+            self._series[self._key(labels)] = value
+
+    def value(self, **labels) -> float:
+        with self._lock:
+            return self._series.get(self._key(labels), 0)
+
+    def expose(self) -> List[str]:
+        with self._lock:
+            series = sorted(self._series.items())
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+                for key, value in series]
+
+
+class Histogram(_Metric):
+    """累积直方图（固定桶）"""
+    metric_type = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = REQUEST_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                # [各桶计数（最后一个是 +Inf）, 总和, 次数]
+                series = [[0] * (len(self.buckets) + 1), 0.0, 0]
+                self._series[key] = series
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def expose(self) -> List[str]:
+        with self._lock:
+            series = sorted((key, ([*counts], total, count)) for key, (counts, total, count) in self._series.items())
+        lines = []
+        for key, (counts, total, count) in series:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                le = "+Inf" if bound == float("inf") else _format_value(bound)
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, ('le', le))} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    """指标注册表"""
+
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        """渲染为 OpenMetrics 文本"""
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# TYPE {metric.name} {metric.metric_type}")
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.extend(metric.expose())
+        lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+# 分片标签：多个工作流/进程分担账号时用于区分来源
+SHARD = os.environ.get("HIFINI_SHARD", "0")
+
+OUTCOMES = REGISTRY.register(Counter(
+    "hifini_checkin_outcomes", "每个账号的最终签到结果（success/already/failed/skipped），总和等于账号数",
+    ("outcome", "shard")))
+CHECKIN_EVENTS = REGISTRY.register(Counter(
+    "hifini_checkin_events", "签到过程中的事件次数（relogin：Cookie失效重新登录，captcha：签到时遇到人机验证）",
+    ("event", "shard")))
+AUTH_METHODS = REGISTRY.register(Counter(
+    "hifini_auth", "账号最终使用的认证方式（cookie/http_login/browser_login/cookie_token）",
+    ("method", "shard")))
+VERIFICATIONS = REGISTRY.register(Counter(
+    "hifini_verifications", "人机验证处理次数（passed/failed）", ("result", "shard")))
+SIGN_ATTEMPTS = REGISTRY.register(Counter(
+    "hifini_sign_attempts", "签到请求次数（用于计算人机验证比例）", ("shard",)))
+REQUEST_DURATION = REGISTRY.register(Histogram(
+    "hifini_request_duration_seconds", "单次HTTP请求耗时", ("phase", "shard"), REQUEST_BUCKETS))
+REQUEST_ERRORS = REGISTRY.register(Counter(
+    "hifini_request_errors", "HTTP请求异常次数（超时、连接失败等）", ("phase", "shard")))
+BROWSER_FALLBACK = REGISTRY.register(Counter(
+    "hifini_browser_fallback", "HTTP登录失败后的浏览器登录决策（used/not_applicable/disabled/unavailable）",
+    ("decision", "shard")))
+NOTIFICATIONS = REGISTRY.register(Counter(
+    "hifini_notifications", "通知发送结果（sent/failed/timeout）", ("channel", "result", "shard")))
+WARMUP_SAVED = REGISTRY.register(Counter(
+    "hifini_warmup_saved_seconds", "连接预热与密钥派生/解密重叠而节省的启动时间", ("shard",)))
+CONCURRENCY_LIMIT = REGISTRY.register(Gauge(
+    "hifini_concurrency_limit", "各通道 AIMD 并发控制的当前上限（同时处理的账号数）", ("lane", "shard")))
+ACCOUNT_DURATION = REGISTRY.register(Histogram(
+    "hifini_account_duration_seconds", "单个账号从开始处理到结束的耗时", ("lane", "shard"), ACCOUNT_BUCKETS))
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    """只提供 /metrics 的请求处理器"""
+
+    def do_GET(self):
+        if self.path.split("?", 1)[0] not in ("/metrics", "/"):
+            self.send_error(404)
+            return
+        body = REGISTRY.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve_metrics(port: int, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+    """
+    在后台线程启动指标HTTP端点
+    :param port: 端口
+    :param host: 监听地址（默认只监听本机）
+    :return: 服务器实例，调用 shutdown() 停止
+    """
+    server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    thread = threading.Thread(target=server.serve_forever, name="hifini-metrics", daemon=True)
+    thread.start()
+    return server
+
+
+def write_textfile(path: Optional[str]):
+    """
+    把当前指标原子写入文本文件（node_exporter textfile collector 格式）
+    :param path: 文件路径
+    """
+    if path:
+        atomic_write_text(path, REGISTRY.render())
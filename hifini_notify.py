@@ -0,0 +1,369 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+HiFiNi 签到通知
+通知渠道（Telegram / Webhook / SMTP 邮件）实现统一的 Notifier 接口，接收已经构建好的消息和统计；
+NotificationDispatcher 并发发送到所有渠道，每个渠道有独立的超时，慢渠道不会拖长签到；
+批量签到时通知交给各渠道的后台发送队列，签到线程不等待，批量结束时统一等待一次
+"""
+
+import os
+import queue
+import smtplib
+import threading
+import time
+from email.header import Header
+from email.mime.text import MIMEText
+from typing import Dict, List, Optional, Tuple
+
+import requests
+
+from hifini_logging import get_logger, log_context
+from hifini_metrics import NOTIFICATIONS, SHARD
+
+log = get_logger()
+
+DEFAULT_TIMEOUT = 10.0
+
+# Telegram 单条消息的最大长度
+TELEGRAM_MAX_LENGTH = 4096
+
+
+class Notification:
+    """一条待发送的签到通知"""
+    __slots__ = ("title", "text", "account", "success", "stats")
+
+    def __init__(self, title: str, text: str, account: str = None, success: bool = True, stats: dict = None):
+        """
+        :param title: 标题
+        :param text: 正文（Telegram Markdown，粗体用 *...*）
+        :param account: 账号
+        :param success: 签到是否成功
+        :param stats: 签到统计（总天数、本月天数、金币等）
+        """
+        self.title = title
+        self.text = text
+        self.account = account
+        self.success = success
+        self.stats = stats or {}
+
+    @property
+    def plain_text(self) -> str:
+        """去掉 Markdown 标记的正文（Webhook / 邮件使用）"""
+        return self.text.replace("*", "")
+
+
+class Notifier:
+    """通知渠道基类：send() 失败时抛出异常"""
+    name = "notifier"
+
+    def __init__(self, timeout: float = DEFAULT_TIMEOUT):
+        self.timeout = timeout
+
+    def send(self, notification: Notification):
+        raise NotImplementedError
+
+    def warmup_targets(self) -> List[Tuple[str, requests.Session, str]]:
+        """可以提前建立连接的目标 [(名称, 会话, 地址)]（见 hifini_warmup）"""
+        return []
+
+
+class TelegramNotifier(Notifier):
+    """Telegram Bot 通知"""
+    name = "Telegram"
+
+    def __init__(self, bot_token: str, chat_id: str, api_base: str = "https://api.telegram.org",
+                 timeout: float = DEFAULT_TIMEOUT):
+        """
+        :param bot_token: Bot Token
+        :param chat_id: Chat ID
+        :param api_base: API 地址（可指向本地替身站点）
+        """
+        super().__init__(timeout)
+        self.bot_token = bot_token
+        self.chat_id = chat_id
+        self.api_base = api_base.rstrip("/")
+        # 复用连接：启动时预热，批量签到的多条通知共用
+        self.session = requests.Session()
+        self.session.verify = False
+
+    def warmup_targets(self) -> List[Tuple[str, requests.Session, str]]:
+        return [(self.name, self.session, self.api_base)]
+
+    def send(self, notification: Notification):
+        text = notification.text
+        # 超长时去掉每日一言
+        if len(text) > TELEGRAM_MAX_LENGTH:
+            text = text.split("📝 每日一言:")[0].strip()[:TELEGRAM_MAX_LENGTH]
+
+        response = self.session.post(
+            f"{self.api_base}/bot{self.bot_token}/sendMessage",
+            data={"chat_id": self.chat_id, "text": text, "parse_mode": "Markdown"},
+            timeout=self.timeout,
+        )
+        if response.status_code != 200:
+            raise RuntimeError(f"{response.status_code} - {response.text}")
+
+
+class WebhookNotifier(Notifier):
+    """通用 Webhook：POST JSON {title, text, account, success, stats}"""
+    name = "Webhook"
+
+    def __init__(self, url: str, timeout: float = DEFAULT_TIMEOUT):
+        super().__init__(timeout)
+        self.url = url
+        self.session = requests.Session()
+
+    def warmup_targets(self) -> List[Tuple[str, requests.Session, str]]:
+        return [(self.name, self.session, self.url)]
+
+    def send(self, notification: Notification):
+        response = self.session.post(self.url, json={
+            "title": notification.title,
+            "text": notification.plain_text,
+            "account": notification.account,
+            "success": notification.success,
+            "stats": notification.stats,
+        }, timeout=self.timeout)
+        if response.status_code >= 300:
+            raise RuntimeError(f"{response.status_code} - {response.text[:200]}")
+
+
+class SmtpNotifier(Notifier):
+    """SMTP 邮件通知"""
+    name = "SMTP"
+
+    def __init__(self, host: str, port: int, sender: str, recipients: List[str], username: str = None,
+                 password: str = None, use_ssl: bool = False, starttls: bool = False,
+                 timeout: float = DEFAULT_TIMEOUT):
+        """
+        :param host: SMTP 服务器
+        :param port: 端口
+        :param sender: 发件人
+        :param recipients: 收件人列表
+        :param username: 登录用户名（可选）
+        :param password: 登录密码（可选）
+        :param use_ssl: 使用 SMTP over SSL（通常是 465 端口）
+        :param starttls: 连接后升级为 TLS（通常是 587 端口）
+        """
+        super().__init__(timeout)
+        self.host = host
+        self.port = port
+        self.sender = sender
+        self.recipients = recipients
+        self.username = username
+        self.password = password
+        self.use_ssl = use_ssl
+        self.starttls = starttls
+
+    def send(self, notification: Notification):
+        mail = MIMEText(notification.plain_text, "plain", "utf-8")
+        mail["Subject"] = Header(notification.title, "utf-8")
+        mail["From"] = self.sender
+        mail["To"] = ", ".join(self.recipients)
+
+        smtp_class = smtplib.SMTP_SSL if self.use_ssl else smtplib.SMTP
+        with smtp_class(self.host, self.port, timeout=self.timeout) as smtp:
+            if self.starttls:
+                smtp.starttls()
+            if self.username:
+                smtp.login(self.username, self.password or "")
+            smtp.sendmail(self.sender, self.recipients, mail.as_string())
+
+
+def _report(name: str, error: Optional[str]):
+    """输出一次发送的结果并计入指标"""
+    if error is None:
+        log.info(f"✅ {name}通知发送成功")
+        NOTIFICATIONS.inc(channel=name, result="sent", shard=SHARD)
+    else:
+        log.error(f"❌ {name}通知发送失败: {error}")
+        NOTIFICATIONS.inc(channel=name, result="failed", shard=SHARD)
+
+
+class _ChannelQueue:
+    """
+    一个通知渠道的后台发送队列
+
+    守护线程按提交顺序逐条发送（同一渠道的连接不会被并发使用），第一次提交时才启动。
+    """
+
+    def __init__(self, notifier: Notifier):
+        self.notifier = notifier
+        self.pending = 0  # 已提交、尚未发送完成的条数
+        self._queue: "queue.SimpleQueue" = queue.SimpleQueue()
+        self._idle = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+
+    def put(self, notification: Notification):
+        with self._idle:
+            self.pending += 1
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name=f"hifini-notify-{self.notifier.name}",
+                                                daemon=True)
+                self._thread.start()
+        self._queue.put(notification)
+
+    def _run(self):
+        while True:
+            notification = self._queue.get()
+            with log_context(notification.account or "cookie", phase="notify"):
+                try:
+                    self.notifier.send(notification)
+                    _report(self.notifier.name, None)
+                except Exception as e:
+                    _report(self.notifier.name, str(e) or e.__class__.__name__)
+            with self._idle:
+                self.pending -= 1
+                self._idle.notify_all()
+
+    def wait(self, deadline: float) -> bool:
+        """等待队列发送完，直到 deadline（time.monotonic）；返回是否已全部完成"""
+        with self._idle:
+            while self.pending:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._idle.wait(remaining)
+            return True
+
+    def drop_queued(self) -> int:
+        """丢弃还没开始发送的条目，返回丢弃的条数（正在发送的一条不受影响）"""
+        dropped = 0
+        while True:
+            try:
+                self._queue.get_nowait()
+            except queue.Empty:
+                break
+            dropped += 1
+        if dropped:
+            with self._idle:
+                self.pending -= dropped
+                self._idle.notify_all()
+        return dropped
+
+
+class NotificationDispatcher:
+    """
+    并发发送到所有通知渠道
+
+    dispatch()：每个渠道在独立的守护线程中发送，最多等待各渠道超时中的最大值；
+    超时未返回的渠道不再等待（守护线程也不会阻止进程退出）。
+    submit() / flush()：批量签到使用，通知放进各渠道的后台队列后立即返回，
+    签到线程不等待；批量结束时 flush() 统一等待一次，超过期限仍未发送的通知放弃。
+    """
+
+    def __init__(self, notifiers: List[Notifier]):
+        self.notifiers = list(notifiers)
+        self._queues = [_ChannelQueue(notifier) for notifier in self.notifiers]
+
+    @property
+    def names(self) -> List[str]:
+        return [notifier.name for notifier in self.notifiers]
+
+    def warmup_targets(self) -> List[Tuple[str, requests.Session, str]]:
+        """所有渠道可以提前建立连接的目标"""
+        return [target for notifier in self.notifiers for target in notifier.warmup_targets()]
+
+    def dispatch(self, notification: Notification) -> Dict[str, Optional[str]]:
+        """
+        发送通知
+        :return: {渠道名称: None 表示成功，否则为错误信息}
+        """
+        results: "queue.SimpleQueue" = queue.SimpleQueue()
+
+        def send(notifier: Notifier):
+            try:
+                notifier.send(notification)
+                results.put((notifier.name, None))
+            except Exception as e:
+                results.put((notifier.name, str(e) or e.__class__.__name__))
+
+        for notifier in self.notifiers:
+            threading.Thread(target=send, args=(notifier,), name=f"hifini-notify-{notifier.name}",
+                             daemon=True).start()
+
+        outcome: Dict[str, Optional[str]] = {}
+        deadline = time.monotonic() + max((notifier.timeout for notifier in self.notifiers), default=0)
+        while len(outcome) < len(self.notifiers):
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                name, error = results.get(timeout=remaining)
+            except queue.Empty:
+                break
+            outcome[name] = error
+            _report(name, error)
+
+        for notifier in self.notifiers:
+            if notifier.name not in outcome:
+                outcome[notifier.name] = "timeout"
+                log.warning(f"⏱️  {notifier.name}通知超过 {notifier.timeout:g} 秒未完成，不再等待")
+                NOTIFICATIONS.inc(channel=notifier.name, result="timeout", shard=SHARD)
+        return outcome
+
+    def submit(self, notification: Notification):
+        """把通知放进所有渠道的后台发送队列，立即返回"""
+        for channel in self._queues:
+            channel.put(notification)
+
+    def flush(self, timeout: float = None) -> int:
+        """
+        等待已提交的通知发送完（所有渠道共用一个期限）
+        :param timeout: 最长等待秒数，默认为各渠道超时中的最大值
+        :return: 期限内未发送完成的条数（未开始的被放弃，正在发送的不再等待）
+        """
+        if timeout is None:
+            timeout = max((notifier.timeout for notifier in self.notifiers), default=0)
+        deadline = time.monotonic() + timeout
+        unfinished = 0
+        for channel in self._queues:
+            if channel.wait(deadline):
+                continue
+            dropped = channel.drop_queued()
+            in_flight = channel.pending
+            unfinished += dropped + in_flight
+            log.warning(f"⏱️  {channel.notifier.name}通知在批量签到结束后 {timeout:g} 秒内未发送完："
+                        f"放弃 {dropped} 条，{in_flight} 条仍在发送，不再等待")
+            if dropped:
+                NOTIFICATIONS.inc(dropped, channel=channel.notifier.name, result="timeout", shard=SHARD)
+        return unfinished
+
+
+def load_notifiers(environ=os.environ) -> List[Notifier]:
+    """
+    根据环境变量创建通知渠道
+    - TG_BOT_TOKEN / TG_CHAT_ID（TG_API_BASE 可指向替身站点）
+    - HIFINI_WEBHOOK_URL
+    - HIFINI_SMTP_HOST / HIFINI_SMTP_PORT / HIFINI_SMTP_USER / HIFINI_SMTP_PASSWORD /
+      HIFINI_SMTP_FROM / HIFINI_SMTP_TO（逗号分隔）/ HIFINI_SMTP_SECURITY（ssl / starttls / none）
+    - HIFINI_NOTIFY_TIMEOUT：每个渠道的超时秒数
+    """
+    timeout = float(environ.get("HIFINI_NOTIFY_TIMEOUT") or DEFAULT_TIMEOUT)
+    notifiers: List[Notifier] = []
+
+    if environ.get("TG_BOT_TOKEN") and environ.get("TG_CHAT_ID"):
+        notifiers.append(TelegramNotifier(environ["TG_BOT_TOKEN"], environ["TG_CHAT_ID"],
+                                          api_base=environ.get("TG_API_BASE") or "https://api.telegram.org",
+                                          timeout=timeout))
+
+    if environ.get("HIFINI_WEBHOOK_URL"):
+        notifiers.append(WebhookNotifier(environ["HIFINI_WEBHOOK_URL"], timeout=timeout))
+
+    if environ.get("HIFINI_SMTP_HOST") and environ.get("HIFINI_SMTP_TO"):
+        security = (environ.get("HIFINI_SMTP_SECURITY") or "ssl").lower()
+        default_port = {"ssl": 465, "starttls": 587}.get(security, 25)
+        username = environ.get("HIFINI_SMTP_USER")
+        notifiers.append(SmtpNotifier(
+            environ["HIFINI_SMTP_HOST"],
+            int(environ.get("HIFINI_SMTP_PORT") or default_port),
+            sender=environ.get("HIFINI_SMTP_FROM") or username or "hifini@localhost",
+            recipients=[item.strip() for item in environ["HIFINI_SMTP_TO"].split(",") if item.strip()],
+            username=username,
+            password=environ.get("HIFINI_SMTP_PASSWORD"),
+            use_ssl=security == "ssl",
+            starttls=security == "starttls",
+            timeout=timeout,
+        ))
+    return notifiers
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+HiFiNi 签到性能分析
+按阶段（login / checkin / notify 等）分别收集 cProfile 数据和 tracemalloc 内存分配，
+运行结束后把每个阶段的 .prof 文件、耗时排行和内存分配排行写入目录
+"""
+
+import os
+import io
+import time
+import pstats
+import cProfile
+import threading
+import tracemalloc
+from collections import defaultdict
+from typing import Dict, Optional
+
+# 内存快照中忽略的帧（分析工具自身和导入机制）
+_SNAPSHOT_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+)
+
+
+def _safe_name(phase: str) -> str:
+    """阶段名转为文件名"""
+    return "".join(ch if ch.isalnum() or ch in "-_" else "_" for ch in phase)
+
+
+class PhaseProfiler:
+    """
+    分阶段的 CPU / 内存分析器
+
+    同一时刻只启用当前阶段的 cProfile.Profile，阶段切换时停用旧的、启用新的；
+    切换时对比 tracemalloc 快照，把这段时间的净内存分配累加到旧阶段。
+    cProfile 只能可靠地分析单个线程，因此 switch() 只接受启动分析器的线程的调用，
+    批量签到在分析模式下会改为在当前线程中顺序执行。
+    """
+
+    def __init__(self, out_dir: str, top: int = 25, frames: int = 1):
+        """
+        :param out_dir: 输出目录
+        :param top: 排行输出的条目数
+        :param frames: tracemalloc 保存的调用栈深度
+        """
+        self.out_dir = out_dir
+        self.top = top
+        self.frames = frames
+
+        self._thread_id: Optional[int] = None
+        self._profiles: Dict[str, cProfile.Profile] = {}
+        self._wall: Dict[str, float] = defaultdict(float)
+        self._entries: Dict[str, int] = defaultdict(int)
+        self._alloc: Dict[str, Dict[str, list]] = defaultdict(dict)
+        self._current: Optional[str] = None
+        self._since = 0.0
+        self._snapshot: Optional[tracemalloc.Snapshot] = None
+        self._started_tracemalloc = False
+
+    def start(self, phase: str = "startup"):
+        """开始分析（在要分析的线程上调用）"""
+        self._thread_id = threading.get_ident()
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+            self._started_tracemalloc = True
+        self._snapshot = self._take_snapshot()
+        self._enter(phase)
+
+    def switch(self, phase: str):
+        """
+        切换到新阶段；非分析线程的调用直接忽略
+        :param phase: 阶段名称
+        """
+        if threading.get_ident() != self._thread_id or phase == self._current:
+            return
+        self._leave()
+        self._enter(phase)
+
+    def stop(self) -> str:
+        """
+        结束分析并写出报告
+        :return: 输出目录
+        """
+        if self._thread_id is None:
+            return self.out_dir
+        self._leave()
+        peak = tracemalloc.get_traced_memory()[1]
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+        self._thread_id = None
+        self._write_reports(peak)
+        return self.out_dir
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+    # ---- 内部实现 ----
+
+    def _take_snapshot(self) -> tracemalloc.Snapshot:
+        return tracemalloc.take_snapshot().filter_traces(_SNAPSHOT_FILTERS)
+
+    def _enter(self, phase: str):
+        self._current = phase
+        self._entries[phase] += 1
+        self._since = time.perf_counter()
+        profile = self._profiles.get(phase)
+        if profile is None:
+            profile = self._profiles[phase] = cProfile.Profile()
+        profile.enable()
+
+    def _leave(self):
+        phase = self._current
+        if phase is None:
+            return
+        self._profiles[phase].disable()
+        self._wall[phase] += time.perf_counter() - self._since
+
+        # 与上一个快照比较，把净分配累加到该阶段
+        snapshot = self._take_snapshot()
+        stats = self._alloc[phase]
+        for diff in snapshot.compare_to(self._snapshot, "lineno"):
+            if not diff.size_diff and not diff.count_diff:
+                continue
+            key = str(diff.traceback)
+            total = stats.get(key)
+            if total is None:
+                stats[key] = [diff.size_diff, diff.count_diff]
+            else:
+                total[0] += diff.size_diff
+                total[1] += diff.count_diff
+        self._snapshot = snapshot
+        self._current = None
+
+    def _write_reports(self, peak: int):
+        os.makedirs(self.out_dir, exist_ok=True)
+        summary = [f"{'阶段':<16}{'进入次数':>8}{'耗时(秒)':>12}{'净分配(KiB)':>14}"]
+
+        for phase, profile in sorted(self._profiles.items()):
+            name = _safe_name(phase)
+            profile.dump_stats(os.path.join(self.out_dir, f"cpu-{name}.prof"))
+
+            buffer = io.StringIO()
+            stats = pstats.Stats(profile, stream=buffer)
+            stats.sort_stats("cumulative").print_stats(self.top)
+            with open(os.path.join(self.out_dir, f"cpu-{name}.txt"), 'w', encoding='utf-8') as f:
+                f.write(buffer.getvalue())
+
+            allocations = sorted(self._alloc[phase].items(), key=lambda item: item[1][0], reverse=True)
+            net = sum(size for size, _ in self._alloc[phase].values())
+            with open(os.path.join(self.out_dir, f"alloc-{name}.txt"), 'w', encoding='utf-8') as f:
+                f.write(f"# 阶段 {phase} 的净内存分配排行（前 {self.top} 项）\n")
+                for location, (size, count) in allocations[:self.top]:
+                    f.write(f"{size / 1024:10.1f} KiB {count:8d} 块  {location}\n")
+
+            summary.append(f"{phase:<16}{self._entries[phase]:>8}{self._wall[phase]:>12.3f}{net / 1024:>14.1f}")
+
+        summary.append(f"\n内存峰值: {peak / 1024 / 1024:.2f} MiB")
+        with open(os.path.join(self.out_dir, "summary.txt"), 'w', encoding='utf-8') as f:
+            f.write("\n".join(summary) + "\n")
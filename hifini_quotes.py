@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+HiFiNi 每日一言缓存
+每日一言保存在本地的有界缓存文件中，构建通知时只从缓存取（不再每次同步请求外部 API）；
+未使用的条目不足时在后台批量补充。取出的条目标记为已使用，全部用过之前不会重复，
+超出容量时优先淘汰最久之前使用过的条目。一次批量签到的所有账号共用同一个缓存
+"""
+
+import os
+import time
+import random
+import threading
+from typing import Dict, List, Optional
+
+import requests
+
+from hifini_logging import get_logger
+from hifini_storage import get_group_writer, read_json
+
+log = get_logger()
+
+# HIFINI_QUOTES_API 可指向本地替身站点（hifini_standin.py 的 /hitokoto）
+DAILY_QUOTES_API = os.environ.get("HIFINI_QUOTES_API") or "https://v1.hitokoto.cn/?encode=json&c=k"
+
+# 缓存容量；未使用的条目少于 LOW_WATERMARK 时在后台补充，每次最多请求 REFILL_BATCH 条
+CACHE_SIZE = 100
+LOW_WATERMARK = 10
+REFILL_BATCH = 20
+# 补充时连续失败该次数就停止（API 不可用时不反复重试）
+MAX_FAILURES = 2
+REQUEST_TIMEOUT = 5
+
+# 缓存为空（首次运行且 API 不可用）时使用的内置格言，也作为缓存的初始内容
+BUILTIN_QUOTES = (
+    "音乐是比一切智慧、一切哲学更高的启示。 —— 贝多芬",
+    "音乐表达的是无法用语言描述，却又不可能对其保持沉默的东西。 —— 维克多·雨果",
+    "没有音乐，生命是没有价值的。 —— 尼采",
+    "音乐是人类的第二语言。 —— 马克思",
+    "音乐应当使人类的精神爆发出火花。 —— 贝多芬",
+    "不要等待，时机永远不会恰到好处。 —— 拿破仑·希尔",
+    "合理安排时间，就等于节约时间。 —— 培根",
+    "行动是治愈恐惧的良药。 —— 戴尔·卡耐基",
+)
+
+# 请求每日一言的会话：不走代理，所有账号和补充请求共用连接
+QUOTE_SESSION = requests.Session()
+QUOTE_SESSION.trust_env = False
+QUOTE_SESSION.verify = False
+
+
+def get_quotes_path(base_dir: str) -> str:
+    """每日一言缓存文件路径"""
+    return os.path.join(base_dir, ".hifini_quotes.json")
+
+
+def _empty_cache() -> dict:
+    """初始缓存：只有内置格言"""
+    return {"quotes": [{"text": text, "fetched": 0, "used": 0} for text in BUILTIN_QUOTES]}
+
+
+def _evict(entries: List[dict], size: int) -> List[dict]:
+    """超出容量时淘汰：先淘汰最久之前使用过的条目，没有用过的条目按获取时间从旧到新淘汰"""
+    if len(entries) <= size:
+        return entries
+    ranked = sorted(entries, key=lambda entry: (entry["used"] == 0, entry["used"] or entry["fetched"]))
+    evicted = {id(entry) for entry in ranked[:len(entries) - size]}
+    return [entry for entry in entries if id(entry) not in evicted]
+
+
+def fetch_quote(session: requests.Session = QUOTE_SESSION) -> str:
+    """请求一条每日一言（失败时抛出异常）"""
+    response = session.get(DAILY_QUOTES_API, timeout=REQUEST_TIMEOUT)
+    if response.status_code != 200:
+        raise RuntimeError(f"API返回状态码: {response.status_code}")
+    data = response.json()
+    return f"{data.get('hitokoto', '')} —— {data.get('from_who', '佚名') or '佚名'}"
+
+
+class QuoteCache:
+    """
+    持久化的每日一言缓存
+
+    take() 只读内存，不发网络请求；refill_async() 在后台线程批量补充；
+    save() 通过组提交写入器合并到文件（多个进程/分片同时签到时不会互相覆盖）。
+    """
+
+    def __init__(self, path: str, size: int = CACHE_SIZE, session: requests.Session = QUOTE_SESSION):
+        """
+        :param path: 缓存文件路径
+        :param size: 缓存容量
+        :param session: 请求每日一言的会话
+        """
+        self.path = path
+        self.size = size
+        self.session = session
+        self._lock = threading.Lock()
+        self._entries: Dict[str, dict] = {entry["text"]: entry
+                                          for entry in read_json(path, _empty_cache).get("quotes", [])}
+        self._refill_thread: Optional[threading.Thread] = None
+
+    @property
+    def unused(self) -> int:
+        """未使用的条目数"""
+        with self._lock:
+            return sum(1 for entry in self._entries.values() if not entry["used"])
+
+    def take(self) -> str:
+        """
+        取一条每日一言并标记为已使用：优先随机取未使用的条目，全部用过时取最久之前使用的条目
+        """
+        with self._lock:
+            unused = [entry for entry in self._entries.values() if not entry["used"]]
+            if unused:
+                entry = random.choice(unused)
+            elif self._entries:
+                entry = min(self._entries.values(), key=lambda item: item["used"])
+            else:
+                return random.choice(BUILTIN_QUOTES)
+            entry["used"] = time.time()
+            return entry["text"]
+
+    def refill(self, count: int = REFILL_BATCH) -> int:
+        """
+        同步补充每日一言（补到容量为止，最多请求 count 次）
+        :return: 新增的条数
+        """
+        added = failures = 0
+        for _ in range(count):
+            with self._lock:
+                if sum(1 for entry in self._entries.values() if not entry["used"]) >= self.size:
+                    break
+            try:
+                text = fetch_quote(self.session)
+            except Exception as e:
+                failures += 1
+                log.detail(f"🧊 补充每日一言失败: {str(e)}")
+                if failures >= MAX_FAILURES:
+                    break
+                continue
+            failures = 0
+            with self._lock:
+                if text not in self._entries:
+                    self._entries[text] = {"text": text, "fetched": time.time(), "used": 0}
+                    added += 1
+                    entries = _evict(list(self._entries.values()), self.size)
+                    self._entries = {entry["text"]: entry for entry in entries}
+        return added
+
+    def refill_async(self, low_watermark: int = LOW_WATERMARK) -> bool:
+        """
+        未使用的条目不足时在后台线程补充（不阻塞签到）
+        :return: 是否启动了补充
+        """
+        if self.unused >= low_watermark or (self._refill_thread and self._refill_thread.is_alive()):
+            return False
+        self._refill_thread = threading.Thread(target=self.refill, name="hifini-quotes", daemon=True)
+        self._refill_thread.start()
+        return True
+
+    def save(self, wait: float = REQUEST_TIMEOUT):
+        """
+        把本次获取的条目和使用标记合并写入文件
+        :param wait: 等待后台补充完成的最长时间（秒），超时未完成的部分下次运行再补
+        """
+        if self._refill_thread is not None:
+            self._refill_thread.join(wait)
+        with self._lock:
+            snapshot = {text: dict(entry) for text, entry in self._entries.items()}
+
+        def merge(cache: dict):
+            merged = {entry["text"]: entry for entry in cache.get("quotes", [])}
+            for text, entry in snapshot.items():
+                current = merged.get(text)
+                if current is None:
+                    merged[text] = entry
+                else:
+                    current["used"] = max(current["used"], entry["used"])
+            cache["quotes"] = _evict(list(merged.values()), self.size)
+
+        get_group_writer(self.path, _empty_cache).submit(merge)
@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+HiFiNi 签到记录分片存储
+每个账号的签到记录按月拆分为 records/YYYY-MM.json，另有一个很小的 records/summary.json 保存累计数据；
+每天签到只改写当月分片和汇总文件，读取统计也只需要这两个文件，不再随历史增长整体重写
+"""
+
+import os
+import copy
+from calendar import monthrange
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+from hifini_storage import file_lock, get_group_writer, read_json
+
+RECORDS_DIR = "records"
+SUMMARY_FILE = "summary.json"
+# 迁移完成后旧的整体记录文件改名为该后缀（已加入 .gitignore，仓库中只保留分片）
+MIGRATED_SUFFIX = ".migrated"
+
+# 记录写入后的回调（例如作废状态服务的响应缓存），参数为写入的 RecordStore
+_write_listeners: List[Callable[["RecordStore"], None]] = []
+
+
+def add_write_listener(callback: Callable[["RecordStore"], None]):
+    """注册签到记录写入后的回调"""
+    _write_listeners.append(callback)
+
+
+def remove_write_listener(callback: Callable[["RecordStore"], None]):
+    """取消注册写入回调"""
+    if callback in _write_listeners:
+        _write_listeners.remove(callback)
+
+
+def _empty_month(month: str) -> dict:
+    """空的月度分片"""
+    year, month_number = (int(part) for part in month.split("-"))
+    return {"total": 0, "days": [], "points": 0, "days_in_month": monthrange(year, month_number)[1]}
+
+
+def _empty_summary() -> dict:
+    """空的汇总结构"""
+    return {"total": 0, "total_points": 0, "years": {}, "months": {}}
+
+
+def _add_to_summary(summary: dict, month: str, days: int, points: int):
+    """把某月新增的天数和金币累加到汇总中"""
+    year = month[:4]
+    summary["total"] += days
+    summary["total_points"] += points
+    year_entry = summary["years"].setdefault(year, {"total": 0, "points": 0})
+    year_entry["total"] += days
+    year_entry["points"] += points
+    month_entry = summary["months"].setdefault(month, {"total": 0, "points": 0})
+    month_entry["total"] += days
+    month_entry["points"] += points
+
+
+def _merge_legacy_month(shard: dict, month_data: dict):
+    """把旧版记录中某月的数据合并进分片：签到日期取并集，金币取较大值，其他字段以分片为准"""
+    for key, value in month_data.items():
+        shard.setdefault(key, value)
+    shard["days"] = sorted(set(shard.get("days", [])) | set(month_data.get("days", [])))
+    shard["total"] = len(shard["days"])
+    shard["points"] = max(shard.get("points", 0), month_data.get("points", 0))
+
+
+class RecordStore:
+    """
+    单个账号的分片签到记录
+
+    record_file 是旧版整体记录文件的路径（hifini_checkin_record.json），分片目录在它旁边的 records/ 下；
+    旧文件存在时在第一次写入签到记录时自动拆分迁移，此前的读取直接合并旧文件的数据。
+    """
+
+    def __init__(self, record_file: str):
+        """
+        :param record_file: 旧版整体记录文件路径（决定分片目录的位置）
+        """
+        self.legacy_file = record_file
+        self.directory = os.path.join(os.path.dirname(record_file), RECORDS_DIR)
+        self.summary_file = os.path.join(self.directory, SUMMARY_FILE)
+
+    def month_file(self, month: str) -> str:
+        """月度分片文件路径"""
+        return os.path.join(self.directory, f"{month}.json")
+
+    # ---- 迁移 ----
+
+    def _legacy_months(self) -> Dict[str, dict]:
+        """旧版整体记录文件中的月度数据 {YYYY-MM: 月度数据}（只读取，不写入）"""
+        legacy = read_json(self.legacy_file, _empty_summary)
+        return {month: month_data
+                for year_data in legacy.get("years", {}).values()
+                for month, month_data in year_data.get("months", {}).items()}
+
+    def migrate(self) -> bool:
+        """
+        把旧版整体记录文件拆分为月度分片和汇总文件
+        分片和汇总都通过各自的组提交写入器合并（与 add_day 共用文件锁），迁移期间的并发签到不会被覆盖；
+        只在写入签到记录时（add_day）或 repair 子命令中调用，读取统计不会触发迁移
+        :return: 是否执行了迁移
+        """
+        if not os.path.exists(self.legacy_file):
+            return False
+        with file_lock(self.legacy_file):
+            if not os.path.exists(self.legacy_file):
+                return False
+
+            deltas = []
+            for month, month_data in self._legacy_months().items():
+                def merge(shard: dict, month_data=month_data) -> Tuple[int, int]:
+                    before_days, before_points = len(shard.get("days", [])), shard.get("points", 0)
+                    _merge_legacy_month(shard, month_data)
+                    return shard["total"] - before_days, shard["points"] - before_points
+
+                writer = get_group_writer(self.month_file(month), lambda month=month: _empty_month(month))
+                deltas.append((month, *writer.submit(merge)))
+
+            # 汇总只累加分片中新增的天数和金币，与并发的 add_day 一样是增量修改
+            def apply_summary(summary: dict):
+                for month, days, points in deltas:
+                    if days or points:
+                        _add_to_summary(summary, month, days, points)
+
+            get_group_writer(self.summary_file, _empty_summary).submit(apply_summary)
+            os.replace(self.legacy_file, self.legacy_file + MIGRATED_SUFFIX)
+        self._notify_written()
+        return True
+
+    def _notify_written(self):
+        for callback in list(_write_listeners):
+            callback(self)
+
+    def _ensure_migrated(self):
+        if os.path.exists(self.legacy_file):
+            self.migrate()
+
+    # ---- 读取 ----
+    # 旧版记录文件尚未迁移时，读取在内存中合并旧文件的数据，不改写任何文件
+
+    def load_month(self, month: str) -> dict:
+        """读取某月分片（不存在时返回空分片）"""
+        shard = read_json(self.month_file(month), lambda: _empty_month(month))
+        if os.path.exists(self.legacy_file):
+            legacy_month = self._legacy_months().get(month)
+            if legacy_month:
+                _merge_legacy_month(shard, legacy_month)
+        return shard
+
+    def load_summary(self) -> dict:
+        """读取汇总文件"""
+        if os.path.exists(self.legacy_file):
+            return self._summarize_shards()
+        return read_json(self.summary_file, _empty_summary)
+
+    def months(self) -> List[str]:
+        """所有有分片的月份（升序）"""
+        months = set()
+        if os.path.isdir(self.directory):
+            months.update(name[:-5] for name in os.listdir(self.directory)
+                          if name.endswith(".json") and name != SUMMARY_FILE)
+        if os.path.exists(self.legacy_file):
+            months.update(self._legacy_months())
+        return sorted(months)
+
+    def has_day(self, moment: datetime) -> bool:
+        """某天是否已签到（只读取当月分片）"""
+        return moment.strftime('%Y-%m-%d') in self.load_month(moment.strftime('%Y-%m'))["days"]
+
+    def statistics(self, moment: datetime) -> Dict[str, int]:
+        """
+        通知中使用的签到统计（只读取汇总文件和当月分片）
+        :param moment: 当前北京时间
+        """
+        summary = self.load_summary()
+        month = self.load_month(moment.strftime('%Y-%m'))
+        return {
+            "total_days": summary.get("total", 0),
+            "month_days": len(month.get("days", [])),
+            "days_in_month": month.get("days_in_month", 30),
+            "month_points": month.get("points", 0),
+            "year_points": summary.get("years", {}).get(moment.strftime('%Y'), {}).get("points", 0),
+            "total_points": summary.get("total_points", 0),
+            "is_first_today": moment.strftime('%Y-%m-%d') in month.get("days", []),
+        }
+
+    def _summarize_shards(self) -> dict:
+        """根据所有月度分片计算汇总"""
+        summary = _empty_summary()
+        for month in self.months():
+            shard = self.load_month(month)
+            _add_to_summary(summary, month, len(shard.get("days", [])), shard.get("points", 0))
+        return summary
+
+    # ---- 写入 ----
+
+    def add_day(self, moment: datetime, points: Optional[int] = None) -> Tuple[bool, dict, dict]:
+        """
+        记录某天签到成功：先写当月分片，只有新增日期时才更新汇总
+        :param moment: 签到时间（北京时间）
+        :param points: 本次获得的金币
+        :return: (是否为新增日期, 当月分片, 汇总)
+        """
+        self._ensure_migrated()
+        day = moment.strftime('%Y-%m-%d')
+        month = moment.strftime('%Y-%m')
+        points = points or 0
+
+        def apply_month(shard: dict) -> Tuple[bool, dict]:
+            shard.setdefault("days", [])
+            shard["days_in_month"] = monthrange(moment.year, moment.month)[1]
+            added = day not in shard["days"]
+            if added:
+                shard["days"].append(day)
+                shard["total"] = shard.get("total", 0) + 1
+                shard["points"] = shard.get("points", 0) + points
+                # 每日金币供按星期等维度统计（旧记录只有月度金币）
+                if points:
+                    shard.setdefault("daily_points", {})[day] = points
+            return added, copy.deepcopy(shard)
+
+        def apply_summary(summary: dict) -> dict:
+            _add_to_summary(summary, month, 1, points)
+            return copy.deepcopy(summary)
+
+        added, shard = get_group_writer(self.month_file(month), lambda: _empty_month(month)).submit(apply_month)
+        if added:
+            summary = get_group_writer(self.summary_file, _empty_summary).submit(apply_summary)
+            self._notify_written()
+        else:
+            summary = self.load_summary()
+        return added, shard, summary
+
+    def rebuild_summary(self) -> dict:
+        """根据所有月度分片重新生成汇总文件（汇总损坏或与分片不一致时使用，见 repair 子命令）"""
+        self._ensure_migrated()
+
+        def rebuild(summary: dict) -> dict:
+            summary.clear()
+            summary.update(self._summarize_shards())
+            return copy.deepcopy(summary)
+
+        summary = get_group_writer(self.summary_file, _empty_summary).submit(rebuild)
+        self._notify_written()
+        return summary
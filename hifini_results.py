@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+HiFiNi 批量签到结果流
+每个账号处理完成时立即把结果（状态、耗时、金币、登录方式）追加写入 JSON Lines 或 CSV 文件，
+汇总由增量的 ResultSummary 计算，内存占用与账号数量无关；运行中途也可以读取文件得到部分结果的汇总
+"""
+
+import os
+import csv
+import json
+import time
+import bisect
+import threading
+from typing import Dict, Iterable, List, Optional
+
+FORMAT_JSONL = "jsonl"
+FORMAT_CSV = "csv"
+
+# 每行的字段（CSV 表头的顺序）
+FIELDS = ("ts", "run", "account", "outcome", "status", "message", "lane", "login_method",
+          "duration_ms", "sign_ms", "points", "total_coins", "captcha")
+
+# 耗时分位数使用的固定分桶（毫秒），只保存每个桶的计数
+DURATION_BUCKETS_MS = (50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000, 60000, 120000)
+
+
+def detect_format(path: str) -> str:
+    """按扩展名判断格式：.csv 为 CSV，其余为 JSON Lines"""
+    return FORMAT_CSV if path.lower().endswith(".csv") else FORMAT_JSONL
+
+
+def _to_int(value) -> int:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return 0
+
+
+class ResultSummary:
+    """
+    结果的增量汇总
+
+    add() 每次只更新计数器和固定分桶，不保存单条结果；耗时分位数按分桶估算（取桶的上界）。
+    """
+
+    def __init__(self):
+        self.total = 0
+        self.outcomes: Dict[str, int] = {}
+        self.login_methods: Dict[str, int] = {}
+        self.points = 0
+        self.captchas = 0
+        self.duration_sum_ms = 0.0
+        self.duration_max_ms = 0.0
+        self._timed = 0
+        self._buckets = [0] * (len(DURATION_BUCKETS_MS) + 1)
+        self._lock = threading.Lock()
+
+    def add(self, row: dict):
+        """累加一条结果"""
+        with self._lock:
+            self.total += 1
+            outcome = row.get("outcome") or "unknown"
+            self.outcomes[outcome] = self.outcomes.get(outcome, 0) + 1
+            method = row.get("login_method")
+            if method:
+                self.login_methods[method] = self.login_methods.get(method, 0) + 1
+            self.points += _to_int(row.get("points"))
+            if row.get("captcha") in (True, "true", "True", "1", 1):
+                self.captchas += 1
+            duration = row.get("duration_ms")
+            if duration not in (None, ""):
+                duration = float(duration)
+                self._timed += 1
+                self.duration_sum_ms += duration
+                self.duration_max_ms = max(self.duration_max_ms, duration)
+                self._buckets[bisect.bisect_left(DURATION_BUCKETS_MS, duration)] += 1
+
+    def count(self, outcome: str) -> int:
+        return self.outcomes.get(outcome, 0)
+
+    def percentile(self, q: float) -> Optional[float]:
+        """耗时分位数的估计值（毫秒，所在分桶的上界，不超过最大值），没有计时数据时返回 None"""
+        if not self._timed:
+            return None
+        rank = q * self._timed
+        seen = 0
+        for index, count in enumerate(self._buckets):
+            seen += count
+            if seen >= rank and count:
+                if index < len(DURATION_BUCKETS_MS):
+                    return min(float(DURATION_BUCKETS_MS[index]), round(self.duration_max_ms, 1))
+                return round(self.duration_max_ms, 1)
+        return round(self.duration_max_ms, 1)
+
+    def as_dict(self) -> dict:
+        with self._lock:
+            return {
+                "total": self.total,
+                "outcomes": dict(self.outcomes),
+                "login_methods": dict(self.login_methods),
+                "points": self.points,
+                "captchas": self.captchas,
+                "duration_ms": {
+                    "avg": round(self.duration_sum_ms / self._timed, 1) if self._timed else None,
+                    "p50": self.percentile(0.5),
+                    "p95": self.percentile(0.95),
+                    "max": round(self.duration_max_ms, 1) if self._timed else None,
+                },
+            }
+
+    def format(self) -> str:
+        """一行的文字汇总"""
+        text = (f"共 {self.total} 个账号：成功 {self.count('success')} / 失败 {self.count('failed')} / "
+                f"跳过 {self.count('skipped')}，金币 +{self.points}")
+        if self._timed:
+            text += f"，耗时 p50≤{self.percentile(0.5):g}ms p95≤{self.percentile(0.95):g}ms"
+        return text
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[dict], run: str = None) -> "ResultSummary":
+        """
+        汇总结果行
+        :param rows: 结果行（可以是逐行读取文件的迭代器）
+        :param run: 只汇总该次运行（为 None 时汇总全部）
+        """
+        summary = cls()
+        for row in rows:
+            if run is None or row.get("run") == run:
+                summary.add(row)
+        return summary
+
+
+def read_results(path: str) -> Iterable[dict]:
+    """
+    逐行读取结果文件（运行中的文件也可以读，最后一行写了一半时忽略）
+    """
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        if detect_format(path) == FORMAT_CSV:
+            for row in csv.DictReader(f):
+                if None not in row.values():
+                    yield row
+            return
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                continue
+
+
+def last_run_id(path: str) -> Optional[str]:
+    """结果文件中最后一次运行的标识"""
+    run = None
+    for row in read_results(path):
+        run = row.get("run") or run
+    return run
+
+
+class ResultsWriter:
+    """
+    追加写入的结果文件
+
+    write() 在调用线程上写入一行并 flush，账号结束后结果立即可见；
+    同一行同时累加到 summary（本次运行的增量汇总）。
+    """
+
+    def __init__(self, path: str, run_id: str = None, fmt: str = None):
+        """
+        :param path: 结果文件路径（.csv 为 CSV，其余为 JSON Lines）
+        :param run_id: 本次运行标识（与运行日志一致，便于区分同一文件中的多次运行）
+        :param fmt: 指定格式（jsonl / csv），默认按扩展名判断
+        """
+        self.path = path
+        self.run_id = run_id
+        self.format = fmt or detect_format(path)
+        self.summary = ResultSummary()
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._file = open(path, "a", encoding="utf-8", newline="")
+        self._csv = None
+        if self.format == FORMAT_CSV:
+            self._csv = csv.DictWriter(self._file, fieldnames=FIELDS, extrasaction="ignore")
+            if self._file.tell() == 0:
+                self._csv.writeheader()
+                self._file.flush()
+
+    def write(self, **fields):
+        """追加一个账号的结果（字段见 FIELDS）"""
+        row = {"ts": round(time.time(), 3), "run": self.run_id}
+        row.update(fields)
+        self.summary.add(row)
+        with self._lock:
+            if self._file.closed:
+                return
+            if self._csv is not None:
+                self._csv.writerow(row)
+            else:
+                self._file.write(json.dumps(row, ensure_ascii=False) + "\n")
+            self._file.flush()
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def format_summary_lines(summary: ResultSummary) -> List[str]:
+    """results 子命令输出的多行汇总"""
+    data = summary.as_dict()
+    lines = [f"📊 {summary.format()}"]
+    if data["login_methods"]:
+        lines.append("🔑 登录方式: " + "、".join(f"{method} {count}"
+                                              for method, count in sorted(data["login_methods"].items())))
+    if data["captchas"]:
+        lines.append(f"🧩 触发人机验证: {data['captchas']} 个账号")
+    if data["duration_ms"]["max"] is not None:
+        lines.append(f"⏱️  平均耗时 {data['duration_ms']['avg']:g}ms，最长 {data['duration_ms']['max']:g}ms")
+    return lines
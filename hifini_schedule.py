@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+HiFiNi 签到时段自适应调度
+按北京时间把一天划分为若干时段，滚动记录每次签到请求的耗时和是否触发人机验证，
+据此推荐（或在常驻模式下自动选择）当天剩余时间内耗时最低、验证最少的签到时段
+"""
+
+import os
+import random
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from hifini_storage import get_group_writer, read_json
+
+BEIJING_TZ = timezone(timedelta(hours=8))
+
+# 每个时段的长度（分钟），一天共 48 个时段
+SLOT_MINUTES = 30
+SLOTS_PER_DAY = 24 * 60 // SLOT_MINUTES
+
+# 只保留最近 28 天的样本；越旧的样本权重越低（7 天衰减一半）
+HISTORY_DAYS = 28
+HALF_LIFE_DAYS = 7.0
+
+# 时段样本少于该数量时视为“未知”，只在探索时选择
+MIN_SAMPLES = 3
+# 选择未知时段进行探索的概率（否则永远只会在已知时段签到，历史无法更新）
+EXPLORE_RATE = 0.1
+# 一次人机验证折算的额外耗时（秒）：验证需要额外的请求，也有失败的风险
+CAPTCHA_PENALTY = 10.0
+
+_TIME_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+
+def get_schedule_path(base_dir: str) -> str:
+    """签到时段历史文件路径"""
+    return os.path.join(base_dir, ".hifini_schedule.json")
+
+
+def _empty_history() -> dict:
+    """空的时段历史结构"""
+    return {"samples": []}
+
+
+def slot_of(moment: datetime) -> int:
+    """北京时间所在的时段序号"""
+    moment = moment.astimezone(BEIJING_TZ)
+    return (moment.hour * 60 + moment.minute) // SLOT_MINUTES
+
+
+def slot_start(day: datetime, slot: int) -> datetime:
+    """某天某个时段的开始时间（北京时间）"""
+    midnight = day.astimezone(BEIJING_TZ).replace(hour=0, minute=0, second=0, microsecond=0)
+    return midnight + timedelta(minutes=slot * SLOT_MINUTES)
+
+
+def slot_label(slot: int) -> str:
+    """时段显示名称，例如 08:30-09:00"""
+    start = slot * SLOT_MINUTES
+    end = start + SLOT_MINUTES
+    return f"{start // 60:02d}:{start % 60:02d}-{end // 60 % 24:02d}:{end % 60:02d}"
+
+
+def next_midnight(now: datetime) -> datetime:
+    """下一个北京时间 0 点"""
+    return slot_start(now, 0) + timedelta(days=1)
+
+
+def record_samples(path: str, samples: Iterable[Tuple[datetime, float, bool]]):
+    """
+    把一次运行的签到样本追加到历史文件，并丢弃过期样本
+    :param path: 历史文件路径
+    :param samples: (签到时间, 签到请求耗时秒数, 是否触发人机验证)
+    """
+    entries = [
+        {"at": moment.astimezone(BEIJING_TZ).strftime(_TIME_FORMAT), "latency": round(latency, 3),
+         "captcha": bool(captcha)}
+        for moment, latency, captcha in samples
+    ]
+    if not entries:
+        return
+
+    def append(history: dict):
+        history.setdefault("samples", []).extend(entries)
+        cutoff = (datetime.now(BEIJING_TZ) - timedelta(days=HISTORY_DAYS)).strftime(_TIME_FORMAT)
+        history["samples"] = [item for item in history["samples"] if item["at"] >= cutoff]
+
+    get_group_writer(path, _empty_history).submit(append)
+
+
+def load_history(path: str) -> dict:
+    """读取时段历史"""
+    return read_json(path, _empty_history)
+
+
+class SlotStats:
+    """单个时段的加权统计"""
+    __slots__ = ("slot", "samples", "weight", "latency", "captcha_rate")
+
+    def __init__(self, slot: int):
+        self.slot = slot
+        self.samples = 0
+        self.weight = 0.0
+        self.latency = 0.0
+        self.captcha_rate = 0.0
+
+    @property
+    def known(self) -> bool:
+        return self.samples >= MIN_SAMPLES
+
+    @property
+    def score(self) -> float:
+        """期望代价（秒）：平均签到耗时 + 人机验证比例折算的耗时，越低越好"""
+        return self.latency + self.captcha_rate * CAPTCHA_PENALTY
+
+
+def summarize(history: dict, now: datetime) -> Dict[int, SlotStats]:
+    """
+    按时段汇总历史样本（近期样本权重更高）
+    :return: {时段序号: 统计}，只包含有样本的时段
+    """
+    sums: Dict[int, List[float]] = {}
+    counts: Dict[int, int] = {}
+    for item in history.get("samples", []):
+        try:
+            moment = datetime.strptime(item["at"], _TIME_FORMAT).replace(tzinfo=BEIJING_TZ)
+        except (KeyError, ValueError):
+            continue
+        age_days = max(0.0, (now - moment).total_seconds() / 86400)
+        weight = 0.5 ** (age_days / HALF_LIFE_DAYS)
+        slot = slot_of(moment)
+        total = sums.setdefault(slot, [0.0, 0.0, 0.0])
+        total[0] += weight
+        total[1] += weight * float(item.get("latency", 0))
+        total[2] += weight * (1.0 if item.get("captcha") else 0.0)
+        counts[slot] = counts.get(slot, 0) + 1
+
+    stats = {}
+    for slot, (weight, latency, captcha) in sums.items():
+        entry = SlotStats(slot)
+        entry.samples = counts[slot]
+        entry.weight = weight
+        entry.latency = latency / weight if weight else 0.0
+        entry.captcha_rate = captcha / weight if weight else 0.0
+        stats[slot] = entry
+    return stats
+
+
+class Recommendation:
+    """推荐的签到时段"""
+    __slots__ = ("slot", "start", "end", "stats", "reason")
+
+    def __init__(self, slot: int, start: datetime, end: datetime, stats: Optional[SlotStats], reason: str):
+        self.slot = slot
+        self.start = start
+        self.end = end
+        self.stats = stats
+        self.reason = reason
+
+    def pick_time(self, now: datetime, rng: random.Random = random) -> datetime:
+        """在时段内随机选择一个不早于当前时间的签到时刻（保留原有随机延迟的分散效果）"""
+        earliest = max(self.start, now)
+        span = max(0.0, (self.end - earliest).total_seconds() - 1)
+        return earliest + timedelta(seconds=rng.uniform(0, span))
+
+
+def recommend_window(history: dict, now: datetime, max_wait: Optional[timedelta] = None,
+                     explore_rate: float = EXPLORE_RATE, rng: random.Random = random) -> Recommendation:
+    """
+    在当天剩余的时段中选择期望代价最低的签到时段（不会跨过北京时间 0 点）
+    :param history: 时段历史
+    :param now: 当前时间
+    :param max_wait: 最长等待时间（例如 Actions 任务的时长限制），超出的时段不参与选择
+    :param explore_rate: 选择未知时段进行探索的概率（只看推荐时设为 0）
+    :param rng: 随机数生成器（探索未知时段时使用）
+    """
+    now = now.astimezone(BEIJING_TZ)
+    stats = summarize(history, now)
+    current = slot_of(now)
+    last = SLOTS_PER_DAY - 1
+    if max_wait is not None and now + max_wait < next_midnight(now):
+        last = slot_of(now + max_wait)
+    candidates = range(current, last + 1)
+
+    def window(slot: int, reason: str) -> Recommendation:
+        start = slot_start(now, slot)
+        end = min(start + timedelta(minutes=SLOT_MINUTES), next_midnight(now))
+        return Recommendation(slot, start, end, stats.get(slot), reason)
+
+    known = [stats[slot] for slot in candidates if slot in stats and stats[slot].known]
+    unknown = [slot for slot in candidates if slot not in stats or not stats[slot].known]
+
+    if not known:
+        return window(current, "历史数据不足，立即签到")
+    if unknown and rng.random() < explore_rate:
+        return window(rng.choice(unknown), "探索样本不足的时段")
+
+    best = min(known, key=lambda entry: entry.score)
+    return window(best.slot, f"历史期望代价最低（{best.score:.2f} 秒）")
+
+
+def format_report(history: dict, now: datetime) -> List[str]:
+    """生成按时段的统计表（推荐模式输出）"""
+    stats = summarize(history, now.astimezone(BEIJING_TZ))
+    lines = [f"{'时段':<14}{'样本':>6}{'平均耗时(秒)':>14}{'验证比例':>10}{'期望代价':>10}"]
+    for slot in sorted(stats):
+        entry = stats[slot]
+        marker = "" if entry.known else "  (样本不足)"
+        lines.append(f"{slot_label(slot):<14}{entry.samples:>6}{entry.latency:>14.3f}"
+                     f"{entry.captcha_rate:>10.0%}{entry.score:>10.2f}{marker}")
+    return lines
+
+
+def to_utc_cron(slot: int) -> str:
+    """北京时间时段开始时刻对应的 UTC cron 表达式（用于调整 GitHub Actions 的定时任务）"""
+    minutes = (slot * SLOT_MINUTES - 8 * 60) % (24 * 60)
+    return f"{minutes % 60} {minutes // 60} * * *"
@@ -0,0 +1,411 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+HiFiNi 本地替身站点
+模拟首页、登录、签到页和人机验证，用于离线复现签到流程（性能分析、压测）；
+同时模拟 Telegram Bot API、Webhook 接收端、SMTP 服务器和每日一言 API，用于测试通知渠道
+
+用法：
+    python hifini_standin.py --port 8999 --latency 0.05 --captcha-rate 0.2
+    HIFINI_BASE_URL=http://127.0.0.1:8999 python hifini_checkin.py
+    TG_API_BASE=http://127.0.0.1:8999 HIFINI_WEBHOOK_URL=http://127.0.0.1:8999/webhook ...
+    HIFINI_QUOTES_API=http://127.0.0.1:8999/hitokoto ...
+"""
+
+import re
+import json
+import time
+import random
+import hashlib
+import secrets
+import argparse
+import threading
+import socketserver
+from email import message_from_bytes
+from email.header import decode_header, make_header
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Set, Tuple
+from urllib.parse import parse_qs, urlparse
+
+VERIFY_SLIDE_PATH = "/a20be899_96a6_40b2_88ba_32f1f75f1552_yanzheng_huadong.php"
+VERIFY_IP_PATH = "/a20be899_96a6_40b2_88ba_32f1f75f1552_yanzheng_ip.php"
+VERIFY_SCRIPT_PATH = "/_guard/verify.js"
+
+HOME_PAGE = "<!DOCTYPE html><html><head><title>HiFiNi 替身站点</title></head><body>首页</body></html>"
+LOGIN_PAGE = ("<!DOCTYPE html><html><head><title>用户登录</title></head><body>"
+              "<form method=\"post\" action=\"user-login.htm?from=form\">"
+              "<input type=\"hidden\" name=\"formhash\" value=\"{formhash}\">"
+              "<input name=\"email\" type=\"text\"><input name=\"password\" type=\"password\">"
+              "<button type=\"submit\">登录</button></form></body></html>")
+# 旧版登录页：表单由脚本渲染，页面中没有 <form>，登录只需要 email / password
+SCRIPTED_LOGIN_PAGE = ("<!DOCTYPE html><html><head><title>用户登录</title>"
+                       "<script src=\"/view/js/login.js\"></script></head><body><div id=\"login\"></div></body></html>")
+LOGIN_REDIRECT_PAGE = ("<!DOCTYPE html><html><head><meta http-equiv=\"refresh\" content=\"0;url=/?login=done\">"
+                       "</head><body>正在跳转...</body></html>")
+LOGIN_ERROR_PAGE = ("<!DOCTYPE html><html><head><title>用户登录</title></head><body>"
+                    "<div class=\"alert alert-danger\">用户名或密码错误</div></body></html>")
+SIGN_PAGE = "<!DOCTYPE html><html><head><title>每日签到</title></head><body>签到页面</body></html>"
+SIGN_PAGE_ANONYMOUS = ("<!DOCTYPE html><html><body>请先登录 "
+                       "<a href=\"user-login.htm\">user-login.htm</a></body></html>")
+CAPTCHA_PAGE = ("<!DOCTYPE html><html><head><title>人机身份验证</title>"
+                f"<script type=\"text/javascript\" src=\"{VERIFY_SCRIPT_PATH}\"></script></head>"
+                "<body>请完成人机身份验证</body></html>")
+
+
+def _beijing_today() -> str:
+    return datetime.now(timezone(timedelta(hours=8))).strftime('%Y-%m-%d')
+
+
+class StandinState:
+    """替身站点的内存状态"""
+
+    def __init__(self, password: Optional[str] = None, latency: float = 0.0,
+                 captcha_rate: float = 0.0, points: int = 5, seed: Optional[int] = None,
+                 login_captcha_rate: float = 0.0, login_form: bool = True):
+        """
+        :param password: 只接受该密码（默认接受任意账号密码）
+        :param latency: 每个请求的模拟延迟（秒）
+        :param captcha_rate: 签到请求触发人机验证的概率
+        :param login_captcha_rate: 打开登录页面触发人机验证的概率
+        :param points: 每次签到获得的金币
+        :param seed: 随机数种子（便于复现）
+        :param login_form: 登录页面是否带表单和表单令牌（False 时模拟脚本渲染的旧版登录页）
+        """
+        self.password_md5 = hashlib.md5(password.encode()).hexdigest() if password else None
+        self.latency = latency
+        self.captcha_rate = captcha_rate
+        self.login_captcha_rate = login_captcha_rate
+        self.points = points
+        self.login_form = login_form
+        self.random = random.Random(seed)
+
+        self.lock = threading.Lock()
+        self.sessions: Dict[str, str] = {}                  # token -> 账号
+        self.formhashes: Set[str] = set()                   # 登录页面下发的表单令牌（只能使用一次）
+        self.challenges: Dict[str, Tuple[str, str]] = {}    # 访客 -> (key, 验证值明文)
+        self.verified: Set[str] = set()                     # 已通过人机验证的访客（登录 token 或访客 sid）
+        self.signed: Set[Tuple[str, str]] = set()           # (账号, 日期)
+        self.coins: Dict[str, int] = {}                     # 账号 -> 总金币
+        self.notifications: List[dict] = []                 # 收到的 Telegram / Webhook 通知
+        self.quote_requests = 0                             # 每日一言 API 的请求次数
+        self.requests = 0
+
+
+class StandinHandler(BaseHTTPRequestHandler):
+    """替身站点请求处理器"""
+
+    server_version = "HiFiNiStandin/1.0"
+    state: StandinState = None
+
+    # ---- 工具方法 ----
+
+    def _token(self) -> Optional[str]:
+        cookie_header = self.headers.get("Cookie", "")
+        match = re.search(r'bbs_token=([^;\s]+)', cookie_header)
+        return match.group(1) if match else None
+
+    def _visitor(self) -> Optional[str]:
+        """人机验证的对象：已登录时为登录 token，否则为首页下发的访客 sid"""
+        match = re.search(r'bbs_sid=([^;\s]+)', self.headers.get("Cookie", ""))
+        return self._token() or (match.group(1) if match else None)
+
+    def _user(self) -> Optional[str]:
+        token = self._token()
+        with self.state.lock:
+            return self.state.sessions.get(token) if token else None
+
+    def _send(self, status: int, body: str, content_type: str = "text/html; charset=utf-8",
+              headers: Dict[str, str] = None):
+        data = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_json(self, payload: dict):
+        self._send(200, json.dumps(payload, ensure_ascii=False), "application/json; charset=utf-8")
+
+    def _read_form(self) -> Dict[str, str]:
+        length = int(self.headers.get("Content-Length") or 0)
+        raw = self.rfile.read(length).decode("utf-8") if length else ""
+        return {key: values[0] for key, values in parse_qs(raw).items()}
+
+    def _simulate_latency(self):
+        with self.state.lock:
+            self.state.requests += 1
+        if self.state.latency:
+            time.sleep(self.state.latency)
+
+    # ---- 路由 ----
+
+    def do_GET(self):
+        self._simulate_latency()
+        url = urlparse(self.path)
+        if url.path == "/":
+            headers = {} if self._visitor() else {"Set-Cookie": f"bbs_sid={secrets.token_hex(8)}; Path=/"}
+            self._send(200, HOME_PAGE, headers=headers)
+        elif url.path == "/user-login.htm":
+            self._login_page()
+        elif url.path == "/sg_sign.htm":
+            self._send(200, SIGN_PAGE if self._user() else SIGN_PAGE_ANONYMOUS)
+        elif url.path == "/hitokoto":
+            self._quote()
+        elif url.path == "/user-login-done.htm":
+            self._send(200, LOGIN_REDIRECT_PAGE)
+        elif url.path == VERIFY_SCRIPT_PATH:
+            self._verify_script()
+        elif url.path in (VERIFY_SLIDE_PATH, VERIFY_IP_PATH):
+            self._verify(parse_qs(url.query))
+        else:
+            self._send(404, "not found")
+
+    def do_POST(self):
+        self._simulate_latency()
+        url = urlparse(self.path)
+        if url.path == "/user-login.htm":
+            self._login(self._read_form())
+        elif url.path == "/sg_sign.htm":
+            self._read_form()
+            self._sign()
+        elif re.fullmatch(r'/bot[^/]+/sendMessage', url.path):
+            self._notify("telegram", self._read_form())
+        elif url.path == "/webhook":
+            length = int(self.headers.get("Content-Length") or 0)
+            self._notify("webhook", json.loads(self.rfile.read(length) or b"{}"))
+        else:
+            self._send(404, "not found")
+
+    def _challenge(self, visitor: str):
+        """为访客生成人机验证并返回验证页面"""
+        with self.state.lock:
+            self.state.challenges[visitor] = (secrets.token_hex(8), secrets.token_hex(4))
+        self._send(200, CAPTCHA_PAGE)
+
+    def _login_page(self):
+        visitor = self._visitor()
+        with self.state.lock:
+            needs_captcha = (visitor is not None and visitor not in self.state.verified
+                             and self.state.random.random() < self.state.login_captcha_rate)
+        if needs_captcha:
+            self._challenge(visitor)
+            return
+        if not self.state.login_form:
+            self._send(200, SCRIPTED_LOGIN_PAGE)
+            return
+        formhash = secrets.token_hex(8)
+        with self.state.lock:
+            self.state.formhashes.add(formhash)
+        self._send(200, LOGIN_PAGE.format(formhash=formhash))
+
+    def _login(self, form: Dict[str, str]):
+        email = form.get("email", "")
+        password_md5 = form.get("password", "")
+        expected = self.state.password_md5
+        with self.state.lock:
+            formhash_ok = not self.state.login_form or form.get("formhash") in self.state.formhashes
+            self.state.formhashes.discard(form.get("formhash"))
+        if not formhash_ok:
+            self._send(200, LOGIN_ERROR_PAGE.replace("用户名或密码错误", "表单已过期，请刷新后重试"))
+            return
+        if not email or (expected and password_md5 != expected):
+            self._send(200, LOGIN_ERROR_PAGE)
+            return
+
+        token = secrets.token_hex(16)
+        with self.state.lock:
+            self.state.sessions[token] = email
+        # 与真实站点一样先 302，再由页面内的 meta refresh 跳回首页
+        self._send(302, "", headers={"Location": "/user-login-done.htm",
+                                     "Set-Cookie": f"bbs_token={token}; Path=/"})
+
+    def _sign(self):
+        user = self._user()
+        if not user:
+            self._send_json({"code": -1, "message": "请登录后再签到"})
+            return
+
+        token = self._token()
+        with self.state.lock:
+            needs_captcha = (token not in self.state.verified
+                             and self.state.random.random() < self.state.captcha_rate)
+        if needs_captcha:
+            self._challenge(token)
+            return
+
+        today = _beijing_today()
+        with self.state.lock:
+            if (user, today) in self.state.signed:
+                coins = self.state.coins.get(user, 0)
+                payload = {"code": 0, "message": "今天已经签过啦！", "coins": coins}
+            else:
+                self.state.signed.add((user, today))
+                coins = self.state.coins.get(user, 0) + self.state.points
+                self.state.coins[user] = coins
+                payload = {"code": 0, "message": f"签到成功，获得 {self.state.points} 金币", "coins": coins}
+        self._send_json(payload)
+
+    def _quote(self):
+        with self.state.lock:
+            number = self.state.random.randint(1, 500)
+            self.state.quote_requests += 1
+        self._send_json({"hitokoto": f"替身站点的第 {number} 句格言", "from_who": "替身站点"})
+
+    def _notify(self, channel: str, payload: dict):
+        with self.state.lock:
+            self.state.notifications.append({"channel": channel, **payload})
+        self._send_json({"ok": True})
+
+    def _verify_script(self):
+        visitor = self._visitor()
+        with self.state.lock:
+            challenge = self.state.challenges.get(visitor)
+        if not challenge:
+            self._send(404, "no challenge", "application/javascript")
+            return
+        key, plain = challenge
+        script = (f'var key="{key}",value="{plain.encode("utf-8").hex()}";'
+                  f'var url="{VERIFY_SLIDE_PATH}?type=slide&key="+key+"&value="+md5(value);')
+        self._send(200, script, "application/javascript")
+
+    def _verify(self, query: Dict[str, list]):
+        visitor = self._visitor()
+        key = query.get("key", [""])[0]
+        value = query.get("value", [""])[0]
+        with self.state.lock:
+            challenge = self.state.challenges.get(visitor)
+            if challenge and challenge[0] == key and hashlib.md5(challenge[1].encode()).hexdigest() == value:
+                self.state.verified.add(visitor)
+                del self.state.challenges[visitor]
+                ok = True
+            else:
+                ok = False
+        if ok:
+            self._send(200, "ok", "text/plain; charset=utf-8")
+        else:
+            self._send(403, "verification failed", "text/plain; charset=utf-8")
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_standin(port: int = 0, host: str = "127.0.0.1", **state_options) -> ThreadingHTTPServer:
+    """
+    在后台线程启动替身站点
+    :param port: 端口（0 表示随机空闲端口）
+    :param host: 监听地址
+    :param state_options: 传给 StandinState 的参数
+    :return: 服务器实例，server.server_address 为实际地址，调用 shutdown() 停止
+    """
+    handler = type("BoundStandinHandler", (StandinHandler,), {"state": StandinState(**state_options)})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, name="hifini-standin", daemon=True)
+    thread.start()
+    return server
+
+
+class _SmtpHandler(socketserver.StreamRequestHandler):
+    """最小的 SMTP 会话：接受任意登录，把邮件保存到 server.messages"""
+
+    def _reply(self, line: str):
+        self.wfile.write((line + "\r\n").encode("utf-8"))
+
+    def handle(self):
+        if self.server.delay:
+            time.sleep(self.server.delay)
+        self._reply("220 hifini-standin ESMTP")
+        sender, recipients = None, []
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            command = line.decode("utf-8", errors="replace").strip()
+            verb = command.split(" ", 1)[0].upper()
+            if verb in ("EHLO", "HELO"):
+                self.wfile.write(b"250-hifini-standin\r\n250 AUTH PLAIN LOGIN\r\n")
+            elif verb == "AUTH":
+                self._reply("235 Authentication successful")
+            elif verb == "MAIL":
+                sender, recipients = command.split(":", 1)[1].strip(" <>"), []
+                self._reply("250 OK")
+            elif verb == "RCPT":
+                recipients.append(command.split(":", 1)[1].strip(" <>"))
+                self._reply("250 OK")
+            elif verb == "DATA":
+                self._reply("354 End data with <CR><LF>.<CR><LF>")
+                data = []
+                for data_line in iter(self.rfile.readline, b""):
+                    if data_line in (b".\r\n", b".\n"):
+                        break
+                    data.append(data_line[1:] if data_line.startswith(b"..") else data_line)
+                mail = message_from_bytes(b"".join(data))
+                with self.server.lock:
+                    self.server.messages.append({
+                        "from": sender,
+                        "to": recipients,
+                        "subject": str(make_header(decode_header(mail.get("Subject", "")))),
+                        "body": mail.get_payload(decode=True).decode(mail.get_content_charset() or "utf-8"),
+                    })
+                self._reply("250 OK")
+            elif verb == "QUIT":
+                self._reply("221 Bye")
+                return
+            else:
+                self._reply("250 OK")
+
+
+def start_smtp_standin(port: int = 0, host: str = "127.0.0.1", delay: float = 0.0) -> socketserver.ThreadingTCPServer:
+    """
+    在后台线程启动 SMTP 替身服务器（明文，不支持 SSL）
+    :param port: 端口（0 表示随机空闲端口）
+    :param host: 监听地址
+    :param delay: 每个连接在问候前的模拟延迟（秒），用于测试慢渠道的超时
+    :return: 服务器实例，server.messages 为收到的邮件，调用 shutdown() 停止
+    """
+    server = socketserver.ThreadingTCPServer((host, port), _SmtpHandler)
+    server.daemon_threads = True
+    server.messages = []
+    server.lock = threading.Lock()
+    server.delay = delay
+    thread = threading.Thread(target=server.serve_forever, name="hifini-smtp-standin", daemon=True)
+    thread.start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="HiFiNi 本地替身站点")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8999)
+    parser.add_argument("--password", help="只接受该密码（默认接受任意账号密码）")
+    parser.add_argument("--latency", type=float, default=0.0, help="每个请求的模拟延迟（秒）")
+    parser.add_argument("--captcha-rate", type=float, default=0.0, help="签到触发人机验证的概率")
+    parser.add_argument("--login-captcha-rate", type=float, default=0.0, help="打开登录页面触发人机验证的概率")
+    parser.add_argument("--seed", type=int, help="随机数种子")
+    parser.add_argument("--no-login-form", action="store_true", help="登录页面不带表单（模拟脚本渲染的旧版登录页）")
+    parser.add_argument("--smtp-port", type=int, default=0, help="同时启动 SMTP 替身服务器的端口（0 表示不启动）")
+    args = parser.parse_args()
+
+    server = start_standin(args.port, args.host, password=args.password, latency=args.latency,
+                           captcha_rate=args.captcha_rate, login_captcha_rate=args.login_captcha_rate,
+                           seed=args.seed, login_form=not args.no_login_form)
+    host, port = server.server_address[:2]
+    print(f"🧪 替身站点已启动: http://{host}:{port}")
+    print(f"   HIFINI_BASE_URL=http://{host}:{port} python hifini_checkin.py")
+    print(f"   通知：TG_API_BASE=http://{host}:{port}  HIFINI_WEBHOOK_URL=http://{host}:{port}/webhook")
+    print(f"   每日一言：HIFINI_QUOTES_API=http://{host}:{port}/hitokoto")
+    if args.smtp_port:
+        smtp = start_smtp_standin(args.smtp_port, args.host)
+        print(f"   邮件：HIFINI_SMTP_HOST={host} HIFINI_SMTP_PORT={smtp.server_address[1]} HIFINI_SMTP_SECURITY=none")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+HiFiNi 本地只读状态服务
+提供各账号及汇总的签到状态（JSON）。渲染后的响应按路径缓存，并带 ETag / Last-Modified；
+本进程签到写入记录时通过 RecordStore 的写入回调立即作废，其他进程的写入通过记录文件的修改时间发现，
+仪表盘频繁轮询时不必每次重新解析签到历史
+"""
+
+import os
+import json
+import time
+import hashlib
+import threading
+from datetime import datetime, timedelta, timezone
+from email.utils import formatdate, parsedate_to_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import unquote
+
+from hifini_analytics import CheckinCalendar, summarize_calendar
+from hifini_records import RecordStore, add_write_listener, remove_write_listener
+
+BEIJING_TZ = timezone(timedelta(hours=8))
+
+CONTENT_TYPE = "application/json; charset=utf-8"
+
+# 账号列表的缓存时间（秒）：列出账号要读取配置并遍历 accounts/ 目录，不必每个请求都做
+STORES_REFRESH_SECONDS = 60
+
+
+def _store_signature(store: RecordStore, today: str) -> Tuple:
+    """账号记录的版本签名：汇总文件和当月分片的修改时间（只做 stat，不读取内容）"""
+    signature = []
+    for path in (store.summary_file, store.month_file(today[:7]), store.legacy_file):
+        try:
+            signature.append(os.stat(path).st_mtime_ns)
+        except OSError:
+            signature.append(0)
+    return tuple(signature)
+
+
+class _CachedResponse:
+    """一条缓存的响应"""
+    __slots__ = ("signature", "directories", "body", "etag", "last_modified")
+
+    def __init__(self, signature: Tuple, directories: frozenset, body: bytes, last_modified: float):
+        self.signature = signature
+        self.directories = directories
+        self.body = body
+        self.etag = '"' + hashlib.sha1(body).hexdigest()[:20] + '"'
+        self.last_modified = last_modified
+
+
+class StatusService:
+    """
+    状态数据与响应缓存
+
+    缓存项以 (路径, 北京日期) 为键，记录所依赖账号的分片目录和文件签名；
+    RecordStore 写入时按目录作废相关缓存项，签名不一致时（其他进程写入）重新渲染。
+    账号列表缓存 STORES_REFRESH_SECONDS 秒，本进程写入了列表以外的账号时立即刷新；
+    北京日期变化后，前一天的缓存项全部清除。
+    """
+
+    def __init__(self, stores_provider: Callable[[], List[tuple]]):
+        """
+        :param stores_provider: 返回 [(账号名称, 账号哈希, RecordStore)] 的函数
+        """
+        self.stores_provider = stores_provider
+        self._lock = threading.Lock()
+        self._cache: Dict[Tuple[str, str], _CachedResponse] = {}
+        self._day: Optional[str] = None
+        self._stores: Optional[List[tuple]] = None
+        self._stores_loaded = 0.0
+        self.hits = 0
+        self.renders = 0
+
+    # ---- 缓存 ----
+
+    def invalidate(self, directory: Optional[str] = None):
+        """作废依赖该分片目录的缓存项（为 None 时全部作废）"""
+        with self._lock:
+            if directory is None:
+                self._cache.clear()
+                self._stores = None
+                return
+            for key in [key for key, entry in self._cache.items() if directory in entry.directories]:
+                del self._cache[key]
+
+    def _on_write(self, store: RecordStore):
+        with self._lock:
+            if self._stores is not None and all(store.directory != item.directory for _, _, item in self._stores):
+                # 新账号第一次写入记录，下次请求重新列出账号
+                self._stores = None
+        self.invalidate(store.directory)
+
+    def _roll_day(self, day: str):
+        """北京日期变化时清除前一天的缓存项（调用方持有锁）"""
+        if self._day == day:
+            return
+        for key in [key for key in self._cache if key[1] != day]:
+            del self._cache[key]
+        self._stores = None
+        self._day = day
+
+    def _get_stores(self, day: str) -> List[tuple]:
+        """缓存的账号列表（过期或被作废时重新调用 stores_provider）"""
+        now = time.monotonic()
+        with self._lock:
+            self._roll_day(day)
+            if self._stores is not None and now - self._stores_loaded < STORES_REFRESH_SECONDS:
+                return self._stores
+        stores = self.stores_provider()
+        with self._lock:
+            self._stores = stores
+            self._stores_loaded = now
+        return stores
+
+    def attach(self):
+        """订阅签到记录的写入"""
+        add_write_listener(self._on_write)
+
+    def detach(self):
+        remove_write_listener(self._on_write)
+
+    def get(self, path: str) -> Optional[_CachedResponse]:
+        """
+        取得路径对应的响应（命中缓存时不读取任何记录内容）
+        :return: 缓存的响应；路径不存在时返回 None
+        """
+        today = datetime.now(BEIJING_TZ).date()
+        day = today.isoformat()
+        stores = self._select(path, day)
+        if stores is None:
+            return None
+        signature = tuple(_store_signature(store, day) for _, _, store in stores)
+
+        key = (path, day)
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is not None and entry.signature == signature:
+                self.hits += 1
+                return entry
+
+        payload = self._render(path, stores, today)
+        body = (json.dumps(payload, ensure_ascii=False, indent=2) + "\n").encode("utf-8")
+        last_modified = max((mtime for item in signature for mtime in item), default=0) / 1e9
+        entry = _CachedResponse(signature, frozenset(store.directory for _, _, store in stores), body,
+                                last_modified)
+        with self._lock:
+            self._cache[key] = entry
+            self.renders += 1
+        return entry
+
+    # ---- 数据 ----
+
+    def _select(self, path: str, day: str) -> Optional[List[tuple]]:
+        """路径涉及的账号：/status 为全部账号，/status/<账号名称或哈希> 为单个账号"""
+        stores = self._get_stores(day)
+        if path in ("/", "/status"):
+            return stores
+        if path.startswith("/status/"):
+            account = unquote(path[len("/status/"):])
+            selected = [entry for entry in stores if account in (entry[0], entry[1])]
+            return selected or None
+        return None
+
+    @staticmethod
+    def _account_status(label: str, account_id: str, store: RecordStore, today) -> dict:
+        calendar = CheckinCalendar.from_store(store, today)
+        return {
+            "account": label,
+            "account_id": account_id,
+            "checked_in_today": calendar.has_day(today),
+            **summarize_calendar(calendar, today),
+        }
+
+    def _render(self, path: str, stores: List[tuple], today) -> dict:
+        accounts = [self._account_status(label, account_id, store, today) for label, account_id, store in stores]
+        if path.startswith("/status/"):
+            return {"date": today.isoformat(), **accounts[0]}
+        return {
+            "date": today.isoformat(),
+            "accounts": len(accounts),
+            "checked_in_today": sum(1 for item in accounts if item["checked_in_today"]),
+            "total_days": sum(item["total_days"] for item in accounts),
+            "total_points": sum(item["total_points"] for item in accounts),
+            "items": [{key: item[key] for key in ("account", "account_id", "checked_in_today", "total_days",
+                                                  "current_streak", "longest_streak", "total_points")}
+                      for item in accounts],
+        }
+
+
+class _StatusHandler(BaseHTTPRequestHandler):
+    """只读状态接口：GET /status、GET /status/<账号>，支持条件请求"""
+
+    service: StatusService = None
+
+    def _respond(self, send_body: bool):
+        entry = self.service.get(self.path.split("?", 1)[0].rstrip("/") or "/")
+        if entry is None:
+            self.send_error(404)
+            return
+
+        if self._not_modified(entry):
+            self.send_response(304)
+            self._send_cache_headers(entry)
+            self.end_headers()
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(entry.body)))
+        self._send_cache_headers(entry)
+        self.end_headers()
+        if send_body:
+            self.wfile.write(entry.body)
+
+    def _not_modified(self, entry: _CachedResponse) -> bool:
+        """If-None-Match 优先；没有时才比较 If-Modified-Since"""
+        if_none_match = self.headers.get("If-None-Match")
+        if if_none_match is not None:
+            tags = [tag.strip() for tag in if_none_match.split(",")]
+            return "*" in tags or entry.etag in tags or f"W/{entry.etag}" in tags
+        if_modified_since = self.headers.get("If-Modified-Since")
+        if if_modified_since and entry.last_modified:
+            try:
+                return int(entry.last_modified) <= parsedate_to_datetime(if_modified_since).timestamp()
+            except (TypeError, ValueError):
+                return False
+        return False
+
+    def _send_cache_headers(self, entry: _CachedResponse):
+        self.send_header("ETag", entry.etag)
+        if entry.last_modified:
+            self.send_header("Last-Modified", formatdate(entry.last_modified, usegmt=True))
+        self.send_header("Cache-Control", "no-cache")
+
+    def do_GET(self):
+        self._respond(send_body=True)
+
+    def do_HEAD(self):
+        self._respond(send_body=False)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve_status(port: int, stores_provider: Callable[[], List[tuple]],
+                 host: str = "127.0.0.1") -> ThreadingHTTPServer:
+    """
+    在后台线程启动状态服务
+    :param port: 端口（0 表示随机空闲端口）
+    :param stores_provider: 返回 [(账号名称, 账号哈希, RecordStore)] 的函数
+    :param host: 监听地址（默认只监听本机）
+    :return: 服务器实例，server.service 为状态数据与缓存，调用 shutdown() 停止
+    """
+    service = StatusService(stores_provider)
+    service.attach()
+    handler = type("BoundStatusHandler", (_StatusHandler,), {"service": service})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    server.service = service
+    thread = threading.Thread(target=server.serve_forever, name="hifini-status", daemon=True)
+    thread.start()
+    return server
@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+HiFiNi 签到数据文件存储
+提供文件锁、原子写入（临时文件 + rename）以及多线程写入的组提交
+"""
+
+import os
+import copy
+import json
+import stat
+import time
+import tempfile
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List, Optional
+
+# 文件锁：POSIX 使用 fcntl，Windows 使用 msvcrt
+try:
+    import fcntl
+    _LOCK_BACKEND = "fcntl"
+except ImportError:  # pragma: no cover - Windows
+    import msvcrt
+    _LOCK_BACKEND = "msvcrt"
+
+
+@contextmanager
+def file_lock(path: str):
+    """
+    获取文件的独占锁（跨进程）
+    锁加在旁路文件 <path>.lock 上，避免 rename 替换目标文件后锁失效
+    :param path: 需要保护的数据文件路径
+    """
+    lock_path = f"{path}.lock"
+    lock_dir = os.path.dirname(os.path.abspath(lock_path))
+    os.makedirs(lock_dir, exist_ok=True)
+
+    fd = os.open(lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        if _LOCK_BACKEND == "fcntl":
+            fcntl.flock(fd, fcntl.LOCK_EX)
+        else:  # pragma: no cover - Windows
+            msvcrt.locking(fd, msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if _LOCK_BACKEND == "fcntl":
+                fcntl.flock(fd, fcntl.LOCK_UN)
+            else:  # pragma: no cover - Windows
+                os.lseek(fd, 0, os.SEEK_SET)
+                msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+    finally:
+        os.close(fd)
+
+
+def _current_umask() -> int:
+    mask = os.umask(0)
+    os.umask(mask)
+    return mask
+
+
+# 新建文件的权限（与 open() 新建时一致）；mkstemp 创建的临时文件是 0600
+_NEW_FILE_MODE = 0o666 & ~_current_umask()
+
+
+def atomic_write_text(path: str, text: str):
+    """
+    原子写入文本文件：先写同目录临时文件并 fsync，再 rename 覆盖目标
+    进程中途退出时目标文件要么是旧内容，要么是新内容，不会被截断；
+    目标文件已存在时沿用它的权限，否则按 umask 使用普通新建文件的权限
+    :param path: 目标文件路径
+    :param text: 文件内容
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+
+    try:
+        mode = stat.S_IMODE(os.stat(path).st_mode)
+    except FileNotFoundError:
+        mode = _NEW_FILE_MODE
+
+    fd, tmp_path = tempfile.mkstemp(prefix=f".{os.path.basename(path)}.", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.chmod(tmp_path, mode)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def locked_atomic_write_text(path: str, text: str):
+    """在文件锁保护下原子写入文本文件"""
+    with file_lock(path):
+        atomic_write_text(path, text)
+
+
+def read_json(path: str, default_factory: Callable[[], Any]) -> Any:
+    """
+    读取JSON文件，文件不存在或内容损坏时返回默认值
+    :param path: 文件路径
+    :param default_factory: 生成默认值的函数
+    """
+    if not os.path.exists(path):
+        return default_factory()
+    with open(path, 'r', encoding='utf-8') as f:
+        try:
+            return json.load(f)
+        except json.JSONDecodeError:
+            return default_factory()
+
+
+# leader 连续提交的最长时间（秒），超过后把 leader 交给队首的等待线程，避免一个线程在繁忙的文件上一直被占住
+LEADER_MAX_SECONDS = 0.2
+
+
+class _PendingWrite:
+    """组提交队列中的一次待写入修改"""
+    __slots__ = ("mutate", "done", "result", "error", "lead")
+
+    def __init__(self, mutate: Callable[[Any], Any]):
+        self.mutate = mutate
+        self.done = threading.Event()
+        self.result = None
+        self.error: Optional[BaseException] = None
+        self.lead = False  # 被上一个 leader 指定为接任的 leader
+
+
+class GroupCommitWriter:
+    """
+    JSON文件的组提交写入器
+
+    并发的写入方各自提交一个修改函数（read-modify-write 中的 modify 部分），
+    第一个到达的线程成为 leader：加文件锁、读取一次文件、按提交顺序应用队列中
+    所有修改，然后只原子写入一次；其余线程等待自己的修改被提交。
+    这样并行签到时不会互相覆盖，也不会因为逐个加锁写文件而串行化。
+    每批修改之前复制一次文件内容作为回滚点，修改原地应用；某个修改抛出异常时
+    回滚到该批开始时的内容，跳过它重新应用其余修改，不会留下改了一半的内容；
+    leader 连续提交超过 LEADER_MAX_SECONDS 后交给队首的等待线程继续。
+    """
+
+    def __init__(self, path: str, default_factory: Callable[[], Any]):
+        """
+        :param path: JSON文件路径
+        :param default_factory: 文件不存在或损坏时的默认内容
+        """
+        self.path = path
+        self.default_factory = default_factory
+        self._mutex = threading.Lock()
+        self._queue: List[_PendingWrite] = []
+        self._leader_active = False
+
+    def submit(self, mutate: Callable[[Any], Any]) -> Any:
+        """
+        提交一次修改并等待其落盘
+        :param mutate: 接收当前文件内容（可原地修改）的函数，返回值会原样返回给调用方
+        :return: mutate 的返回值
+        """
+        pending = _PendingWrite(mutate)
+        with self._mutex:
+            self._queue.append(pending)
+            is_leader = not self._leader_active
+            if is_leader:
+                self._leader_active = True
+
+        if is_leader:
+            self._lead()
+        else:
+            pending.done.wait()
+            if pending.lead:
+                # 上一个 leader 已达到时间上限，由本线程接着提交（本次修改仍在队列中）
+                self._lead()
+
+        if pending.error is not None:
+            raise pending.error
+        return pending.result
+
+    def _lead(self):
+        """作为 leader 循环提交队列，直到队列为空或达到时间上限"""
+        deadline = time.monotonic() + LEADER_MAX_SECONDS
+        while True:
+            with self._mutex:
+                batch = self._queue
+                self._queue = []
+                if not batch:
+                    self._leader_active = False
+                    return
+            self._commit(batch)
+            if time.monotonic() >= deadline:
+                with self._mutex:
+                    if not self._queue:
+                        self._leader_active = False
+                        return
+                    successor = self._queue[0]
+                    successor.lead = True
+                successor.done.set()
+                return
+
+    @staticmethod
+    def _apply(data: Any, batch: List[_PendingWrite]) -> Any:
+        """
+        按顺序把一批修改原地应用到 data 上
+        修改抛出异常时记下错误，回滚到批次开始时的副本，再重新应用其余修改
+        （修改函数只应改动传入的内容，重新应用的结果与第一次相同）
+        """
+        base = copy.deepcopy(data)
+        while True:
+            for pending in batch:
+                if pending.error is not None:
+                    continue
+                try:
+                    pending.result = pending.mutate(data)
+                except Exception as e:
+                    pending.error = e
+                    break
+            else:
+                return data
+            data = copy.deepcopy(base)
+
+    def _commit(self, batch: List[_PendingWrite]):
+        """在文件锁下应用一批修改并写入一次"""
+        try:
+            with file_lock(self.path):
+                data = self._apply(read_json(self.path, self.default_factory), batch)
+                atomic_write_text(self.path, json.dumps(data, ensure_ascii=False, indent=2))
+        except Exception as e:
+            for pending in batch:
+                if pending.error is None:
+                    pending.error = e
+        finally:
+            for pending in batch:
+                pending.done.set()
+
+
+_writers: Dict[str, GroupCommitWriter] = {}
+_writers_lock = threading.Lock()
+
+
+def get_group_writer(path: str, default_factory: Callable[[], Any]) -> GroupCommitWriter:
+    """
+    获取某个文件的共享组提交写入器（同一路径在进程内只有一个实例）
+    :param path: JSON文件路径
+    :param default_factory: 文件不存在或损坏时的默认内容
+    """
+    key = os.path.abspath(path)
+    with _writers_lock:
+        writer = _writers.get(key)
+        if writer is None:
+            writer = GroupCommitWriter(key, default_factory)
+            _writers[key] = writer
+        return writer
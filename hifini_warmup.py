@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+HiFiNi 连接预热
+在后台线程中提前完成 DNS 解析和 TCP/TLS 握手，把建立好的连接放回 requests 会话的连接池（不发送任何请求），
+与 PBKDF2 密钥派生、Cookie 解密这类 CPU 密集的启动工作并行；之后第一个真实请求直接复用已建立的连接
+"""
+
+import time
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import requests
+
+from hifini_logging import get_logger
+
+log = get_logger()
+
+# 单个连接预热的超时（秒）；预热失败不影响后续请求，只是失去预热效果
+WARMUP_TIMEOUT = 5.0
+
+
+def _connection_pool(session: requests.Session, url: str):
+    """取得会话发送该地址请求时会使用的 urllib3 连接池（与 requests 的选择逻辑一致，包括代理和证书校验）"""
+    adapter = session.get_adapter(url)
+    settings = session.merge_environment_settings(url, {}, None, session.verify, session.cert)
+    if hasattr(adapter, "get_connection_with_tls_context"):
+        request = requests.Request("GET", url).prepare()
+        return adapter.get_connection_with_tls_context(request, settings["verify"], settings["proxies"],
+                                                       settings["cert"])
+    pool = adapter.get_connection(url, settings["proxies"])
+    adapter.cert_verify(pool, url, settings["verify"], settings["cert"])
+    return pool
+
+
+def warm_connection(session: requests.Session, url: str, timeout: float = WARMUP_TIMEOUT) -> Optional[float]:
+    """
+    在会话的连接池中预先建立到 url 所在主机的连接
+    :param session: requests 会话
+    :param url: 目标地址（只使用协议、主机和端口）
+    :param timeout: 连接超时
+    :return: 建立连接的耗时（秒）；传输层不访问网络（如录制带回放）时返回 None
+    """
+    if getattr(session.get_adapter(url), "offline", False):
+        return None
+    start = time.perf_counter()
+    pool = _connection_pool(session, url)
+    conn = pool._get_conn()
+    try:
+        if conn.sock is None:
+            conn.timeout = timeout
+            conn.connect()
+    except Exception:
+        conn.close()
+        pool._put_conn(conn)
+        raise
+    pool._put_conn(conn)
+    return time.perf_counter() - start
+
+
+class Warmup:
+    """
+    一组并行的连接预热
+
+    每个目标一个守护线程；join() 最多等待 timeout 秒，未完成的预热不再等待（线程也不会阻止进程退出）。
+    """
+
+    def __init__(self, targets: Iterable[Tuple[str, requests.Session, str]], timeout: float = WARMUP_TIMEOUT):
+        """
+        :param targets: [(名称, 会话, 地址)]
+        :param timeout: 单个连接的超时
+        """
+        self.targets: List[Tuple[str, requests.Session, str]] = list(targets)
+        self.timeout = timeout
+        self.results: Dict[str, Optional[float]] = {}
+        self._threads: List[threading.Thread] = []
+
+    def _warm(self, name: str, session: requests.Session, url: str):
+        try:
+            self.results[name] = warm_connection(session, url, self.timeout)
+        except Exception as e:
+            self.results[name] = None
+            log.detail(f"🧊 预热 {name} 连接失败: {str(e)}")
+
+    def start(self) -> "Warmup":
+        for name, session, url in self.targets:
+            thread = threading.Thread(target=self._warm, args=(name, session, url), name=f"hifini-warmup-{name}",
+                                      daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        return self
+
+    def join(self, timeout: Optional[float] = None) -> Dict[str, Optional[float]]:
+        """
+        等待预热完成
+        :return: {名称: 建立连接的耗时（秒），失败、未完成或无需预热时为 None}
+        """
+        deadline = time.monotonic() + (self.timeout if timeout is None else timeout)
+        for thread in self._threads:
+            thread.join(max(0.0, deadline - time.monotonic()))
+        return {name: self.results.get(name) for name, _, _ in self.targets}
@@ -0,0 +1,7 @@
+# -*- coding: utf-8 -*-
+"""测试公共配置：脚本都在仓库根目录，按模块名直接导入"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,39 @@
+# -*- coding: utf-8 -*-
+"""从环境变量读取账号配置"""
+
+from hifini_checkin import AccountState, load_accounts
+
+
+def test_accounts_are_deduplicated_after_strip(monkeypatch):
+    monkeypatch.setenv("HIFINI_USERNAME", " alice@example.com ")
+    monkeypatch.setenv("HIFINI_PASSWORD", "p1")
+    monkeypatch.delenv("HIFINI_COOKIE", raising=False)
+    monkeypatch.setenv("HIFINI_ACCOUNTS", "\n".join([
+        "alice@example.com:p2",
+        "bob@example.com:p3",
+        "  bob@example.com  :p4",
+        "# 注释",
+        " :p5",
+        "carol@example.com:p6",
+    ]))
+    accounts = load_accounts()
+    assert [(a.username, a.password, a.primary) for a in accounts] == [
+        ("alice@example.com", "p1", True),
+        ("bob@example.com", "p3", False),
+        ("carol@example.com", "p6", False),
+    ]
+
+
+def test_reset_clears_previous_run():
+    run = AccountState(username="alice@example.com", password="p1", primary=False)
+    run.relogin = True
+    run.lane = "browser"
+    run.started_at = 12.5
+    run.failures = 3
+    run.captchas = 1
+    run.result = {"success": False, "message": "昨天的结果"}
+    context = object()
+    run.reset(context)
+    assert run.context is context
+    assert (run.relogin, run.lane, run.started_at, run.failures, run.captchas, run.result, run.client) == \
+        (False, None, 0.0, 0, 0, None, None)
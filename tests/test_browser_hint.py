@@ -0,0 +1,17 @@
+# -*- coding: utf-8 -*-
+"""“需要浏览器登录”提示"""
+
+from hifini_browser_hint import load_browser_hint, update_browser_hint
+
+
+def test_hint_added_cleared_and_expired(tmp_path):
+    base_dir = str(tmp_path)
+    update_browser_hint(base_dir, "2026-10-01", added=["a", "b"], cleared=[])
+    assert load_browser_hint(base_dir, "2026-10-02") == {"a", "b"}
+
+    # 不需要浏览器就成功的账号被去掉；已有的账号保留原加入日期
+    update_browser_hint(base_dir, "2026-10-05", added=["a", "c"], cleared=["b"])
+    assert load_browser_hint(base_dir, "2026-10-05") == {"a", "c"}
+
+    # 过期（7 天）后重新尝试快速通道
+    assert load_browser_hint(base_dir, "2026-10-08") == {"c"}
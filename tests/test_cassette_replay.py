@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+"""
+离线回放 tests/fixtures 中的录制带（由 hifini_standin.py 替身站点录制）
+"""
+
+import os
+
+import pytest
+
+from hifini_cassette import MODE_RECORD, MODE_REPLAY, CassetteMiss, open_cassette
+from hifini_checkin import DEFAULT_BASE_URL, HiFiNiCheckin, is_simulated_traffic
+
+FIXTURE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "standin_checkin.json")
+USERNAME = "alice@example.com"
+PASSWORD = "standin-pass"
+
+
+@pytest.fixture
+def replay(monkeypatch):
+    """回放录制带；站点地址保持真实站点，回放传输不会访问网络"""
+    monkeypatch.setattr(HiFiNiCheckin, "base_url", DEFAULT_BASE_URL)
+    monkeypatch.setattr(HiFiNiCheckin, "cassette", open_cassette(FIXTURE, MODE_REPLAY))
+    return HiFiNiCheckin.cassette
+
+
+def _client(tmp_path) -> HiFiNiCheckin:
+    return HiFiNiCheckin(USERNAME, PASSWORD,
+                         record_file=str(tmp_path / "hifini_checkin_record.json"),
+                         cookie_file=str(tmp_path / ".hifini_session.enc"))
+
+
+def test_replay_login_and_checkin(replay, tmp_path):
+    assert replay.interactions > 0
+    client = _client(tmp_path)
+    try:
+        login = client.login()
+        assert login["success"], login["message"]
+        result = client.checkin()
+        assert result["success"], result["message"]
+        assert result["status"] == "success"
+        assert client.points_gained == "5"
+    finally:
+        client.close()
+    # 回放属于模拟流量：不保存加密Cookie，不写签到记录
+    assert is_simulated_traffic()
+    assert os.listdir(tmp_path) == []
+
+
+def test_replay_does_not_load_saved_cookie(replay, tmp_path, monkeypatch):
+    client = _client(tmp_path)
+    (tmp_path / ".hifini_session.enc").write_text("not-a-real-cookie", encoding="utf-8")
+    monkeypatch.setattr(HiFiNiCheckin, "_decrypt_cookie", lambda self, text: pytest.fail("回放时读取了本地Cookie"))
+    assert client._load_encrypted_cookie() is None
+    client.close()
+
+
+def test_replay_miss_is_reported(replay, tmp_path):
+    client = _client(tmp_path)
+    try:
+        with pytest.raises(CassetteMiss):
+            client.session.get(f"{DEFAULT_BASE_URL}/not-recorded.htm")
+    finally:
+        client.close()
+
+
+def test_record_mode_is_live_traffic(monkeypatch, tmp_path):
+    monkeypatch.setattr(HiFiNiCheckin, "base_url", DEFAULT_BASE_URL)
+    monkeypatch.setattr(HiFiNiCheckin, "cassette", open_cassette(str(tmp_path / "new.json"), MODE_RECORD))
+    assert not is_simulated_traffic()
+    monkeypatch.setattr(HiFiNiCheckin, "cassette", None)
+    assert not is_simulated_traffic()
+    monkeypatch.setattr(HiFiNiCheckin, "base_url", "http://127.0.0.1:8999")
+    assert is_simulated_traffic()
@@ -0,0 +1,25 @@
+# -*- coding: utf-8 -*-
+"""纯文本日志的账号前缀"""
+
+import io
+
+from hifini_logging import get_logger, log_context, setup_logging, shutdown_logging
+
+
+def test_text_format_prefixes_account():
+    stream = io.StringIO()
+    setup_logging("DETAIL", "text", stream)
+    log = get_logger()
+    try:
+        log.info("开始")
+        with log_context("alice@example.com"):
+            log.info("\n🔍 检查Cookie")
+            log.info("签到成功")
+    finally:
+        shutdown_logging()
+    assert stream.getvalue().splitlines() == [
+        "开始",
+        "",
+        "[alice@example.com] 🔍 检查Cookie",
+        "[alice@example.com] 签到成功",
+    ]
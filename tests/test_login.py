@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+"""纯 HTTP 登录（替身站点）"""
+
+import pytest
+
+from hifini_checkin import HiFiNiCheckin
+from hifini_standin import start_standin
+
+PASSWORD = "standin-pass"
+
+
+@pytest.fixture(params=[True, False], ids=["form", "no-form"])
+def standin(request, monkeypatch):
+    server = start_standin(password=PASSWORD, login_form=request.param)
+    host, port = server.server_address[:2]
+    monkeypatch.setattr(HiFiNiCheckin, "base_url", f"http://{host}:{port}")
+    monkeypatch.setattr(HiFiNiCheckin, "cassette", None)
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _client(tmp_path, password=PASSWORD) -> HiFiNiCheckin:
+    return HiFiNiCheckin("alice@example.com", password,
+                         record_file=str(tmp_path / "hifini_checkin_record.json"),
+                         cookie_file=str(tmp_path / ".hifini_session.enc"))
+
+
+def test_login_and_checkin(standin, tmp_path, monkeypatch):
+    monkeypatch.setattr("time.sleep", lambda seconds: None)
+    client = _client(tmp_path)
+    try:
+        login = client.login()
+        assert login["success"], login["message"]
+        result = client.checkin()
+        assert result["success"], result["message"]
+    finally:
+        client.close()
+
+
+def test_wrong_password_is_rejected(standin, tmp_path, monkeypatch):
+    monkeypatch.setattr("time.sleep", lambda seconds: None)
+    client = _client(tmp_path, password="wrong")
+    try:
+        assert not client.login()["success"]
+    finally:
+        client.close()
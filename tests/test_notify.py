@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+"""通知渠道：Telegram / Webhook / SMTP 发送到本地替身站点"""
+
+import time
+
+import pytest
+
+from hifini_notify import Notification, NotificationDispatcher, load_notifiers
+from hifini_standin import start_smtp_standin, start_standin
+
+
+def _notification(account: str = "alice@example.com") -> Notification:
+    return Notification("HiFiNi音乐磁场每日签到", "*签到成功*，获得 5 金币", account=account,
+                        success=True, stats={"total_days": 3})
+
+
+@pytest.fixture
+def standin():
+    server = start_standin()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _smtp(delay: float = 0.0):
+    return start_smtp_standin(delay=delay)
+
+
+def _notifiers(standin, smtp, timeout: float = 5):
+    host, port = standin.server_address[:2]
+    return load_notifiers({
+        "TG_BOT_TOKEN": "123:token",
+        "TG_CHAT_ID": "42",
+        "TG_API_BASE": f"http://{host}:{port}",
+        "HIFINI_WEBHOOK_URL": f"http://{host}:{port}/webhook",
+        "HIFINI_SMTP_HOST": smtp.server_address[0],
+        "HIFINI_SMTP_PORT": str(smtp.server_address[1]),
+        "HIFINI_SMTP_SECURITY": "none",
+        "HIFINI_SMTP_TO": "a@example.com, b@example.com",
+        "HIFINI_NOTIFY_TIMEOUT": str(timeout),
+    })
+
+
+def test_dispatch_sends_to_every_backend(standin):
+    smtp = _smtp()
+    try:
+        dispatcher = NotificationDispatcher(_notifiers(standin, smtp))
+        assert dispatcher.names == ["Telegram", "Webhook", "SMTP"]
+        assert dispatcher.dispatch(_notification()) == {"Telegram": None, "Webhook": None, "SMTP": None}
+    finally:
+        smtp.shutdown()
+        smtp.server_close()
+
+    received = {item["channel"]: item for item in standin.RequestHandlerClass.state.notifications}
+    assert received["telegram"]["chat_id"] == "42"
+    assert received["telegram"]["text"] == "*签到成功*，获得 5 金币"
+    assert received["webhook"]["text"] == "签到成功，获得 5 金币"
+    assert received["webhook"]["account"] == "alice@example.com"
+    assert received["webhook"]["stats"] == {"total_days": 3}
+    [mail] = smtp.messages
+    assert mail["to"] == ["a@example.com", "b@example.com"]
+    assert mail["subject"] == "HiFiNi音乐磁场每日签到"
+    assert mail["body"] == "签到成功，获得 5 金币"
+
+
+def test_submit_returns_immediately_and_flush_waits(standin):
+    smtp = _smtp(delay=0.3)
+    try:
+        dispatcher = NotificationDispatcher(_notifiers(standin, smtp))
+        started = time.monotonic()
+        for index in range(3):
+            dispatcher.submit(_notification(f"user{index}@example.com"))
+        assert time.monotonic() - started < 0.2
+        assert dispatcher.flush() == 0
+    finally:
+        smtp.shutdown()
+        smtp.server_close()
+    assert len(smtp.messages) == 3
+    assert len(standin.RequestHandlerClass.state.notifications) == 6
+
+
+def test_flush_deadline_gives_up_on_slow_backend(standin):
+    smtp = _smtp(delay=1.0)
+    try:
+        dispatcher = NotificationDispatcher(_notifiers(standin, smtp))
+        for index in range(3):
+            dispatcher.submit(_notification(f"user{index}@example.com"))
+        started = time.monotonic()
+        # SMTP 一条正在发送、两条排队；Telegram 和 Webhook 按时发完
+        assert dispatcher.flush(timeout=0.5) == 3
+        assert time.monotonic() - started < 0.9
+        assert len(standin.RequestHandlerClass.state.notifications) == 6
+    finally:
+        smtp.shutdown()
+        smtp.server_close()
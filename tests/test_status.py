@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+"""状态服务的账号列表缓存与跨天清理"""
+
+import hifini_status
+from hifini_records import RecordStore
+from hifini_status import StatusService
+
+
+class _Provider:
+    def __init__(self, stores):
+        self.stores = stores
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return list(self.stores)
+
+
+def _store(tmp_path, name):
+    directory = tmp_path / name
+    directory.mkdir()
+    return RecordStore(str(directory / "hifini_checkin_record.json"))
+
+
+def test_store_list_is_cached(tmp_path):
+    provider = _Provider([("alice", "a1", _store(tmp_path, "a"))])
+    service = StatusService(provider)
+    for _ in range(3):
+        assert service.get("/status") is not None
+    assert service.get("/status/alice") is not None
+    assert provider.calls == 1
+    assert service.renders == 2 and service.hits == 2
+
+
+def test_write_from_unknown_account_refreshes_list(tmp_path):
+    provider = _Provider([("alice", "a1", _store(tmp_path, "a"))])
+    service = StatusService(provider)
+    service.get("/status")
+    service._on_write(provider.stores[0][2])
+    service.get("/status")
+    assert provider.calls == 1
+
+    bob = _store(tmp_path, "b")
+    provider.stores.append(("bob", "b1", bob))
+    service._on_write(bob)
+    assert service.get("/status/bob") is not None
+    assert provider.calls == 2
+
+
+def test_previous_day_entries_are_evicted(tmp_path):
+    provider = _Provider([("alice", "a1", _store(tmp_path, "a"))])
+    service = StatusService(provider)
+    service.get("/status")
+    # 模拟昨天渲染的缓存项
+    service._cache = {(path, "2000-01-01"): entry for (path, _), entry in service._cache.items()}
+    service._day = "2000-01-01"
+    service.get("/status")
+    assert [day for _, day in service._cache] == [service._day]
+    assert service._day != "2000-01-01"
+    assert provider.calls == 2
+
+
+def test_store_list_expires(tmp_path, monkeypatch):
+    provider = _Provider([("alice", "a1", _store(tmp_path, "a"))])
+    service = StatusService(provider)
+    service.get("/status")
+    monkeypatch.setattr(hifini_status, "STORES_REFRESH_SECONDS", 0)
+    service.get("/status")
+    assert provider.calls == 2
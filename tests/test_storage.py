@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+"""原子写入与组提交"""
+
+import json
+import os
+import stat
+
+import pytest
+
+from hifini_storage import GroupCommitWriter, _PendingWrite, atomic_write_text
+
+
+def test_atomic_write_keeps_existing_mode(tmp_path):
+    path = tmp_path / "data.json"
+    path.write_text("{}", encoding="utf-8")
+    os.chmod(path, 0o640)
+    atomic_write_text(str(path), '{"a": 1}')
+    assert stat.S_IMODE(os.stat(path).st_mode) == 0o640
+    assert json.loads(path.read_text(encoding="utf-8")) == {"a": 1}
+
+
+def test_atomic_write_new_file_is_not_private(tmp_path):
+    path = tmp_path / "new.json"
+    umask = os.umask(0)
+    os.umask(umask)
+    atomic_write_text(str(path), "{}")
+    assert stat.S_IMODE(os.stat(path).st_mode) == 0o666 & ~umask
+
+
+def test_failed_mutation_is_rolled_back(tmp_path):
+    path = str(tmp_path / "doc.json")
+    writer = GroupCommitWriter(path, dict)
+
+    def add(key):
+        def mutate(doc):
+            doc[key] = doc.get("n", 0)
+            doc["n"] = doc.get("n", 0) + 1
+            return key
+        return mutate
+
+    def broken(doc):
+        doc["half"] = True
+        raise ValueError("坏的修改")
+
+    batch = [_PendingWrite(add("a")), _PendingWrite(broken), _PendingWrite(add("b"))]
+    writer._commit(batch)
+    assert [pending.result for pending in batch] == ["a", None, "b"]
+    assert isinstance(batch[1].error, ValueError)
+    assert batch[0].error is None and batch[2].error is None
+    with open(path, encoding="utf-8") as f:
+        assert json.load(f) == {"a": 0, "b": 1, "n": 2}
+
+
+def test_submit_raises_mutation_error(tmp_path):
+    writer = GroupCommitWriter(str(tmp_path / "doc.json"), dict)
+    with pytest.raises(KeyError):
+        writer.submit(lambda doc: doc["missing"])
+    assert writer.submit(lambda doc: doc.setdefault("ok", 1)) == 1